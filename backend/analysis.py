@@ -1,9 +1,11 @@
 import json
 import os
 import time
-from datetime import datetime, timedelta
+from datetime import timedelta
 import google.generativeai as genai
 import yfinance as yf
+from news_store import NewsStore
+from timestamps import normalize_article, to_ist
 
 # Load Env (or rely on system env)
 # In production, use python-dotenv. Here we assume exported vars.
@@ -17,15 +19,14 @@ def init_gemini():
     genai.configure(api_key=api_key)
     return genai.GenerativeModel('gemini-2.5-flash')
 
+# Shared with the scraper: saves append just the analysed articles
+NEWS_STORE = NewsStore(JSON_FILE)
+
 def load_news():
-    if os.path.exists(JSON_FILE):
-        with open(JSON_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    return [normalize_article(item) for item in NEWS_STORE.load()]
 
 def save_news(news_list):
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(news_list, f, indent=4, ensure_ascii=False)
+    NEWS_STORE.save(news_list)
 
 def extract_ticker(model, headline):
     prompt = f"""
@@ -47,13 +48,13 @@ def extract_ticker(model, headline):
         print(f"Gemini Error: {e}")
         return {"ticker": None, "short_question": None}
 
-def calculate_impact(ticker_symbol, news_timestamp_str):
+def calculate_impact(ticker_symbol, published_at):
     try:
-        # timestamp format: "YYYY-MM-DD HH:MM:SS"
-        news_time = datetime.strptime(news_timestamp_str, "%Y-%m-%d %H:%M:%S")
+        # NSE trading days are IST dates
+        news_time = to_ist(published_at)
         
         # If news is after market close (3:30 PM), look at next day
-        if news_time.hour >= 15 and news_time.minute >= 30:
+        if (news_time.hour, news_time.minute) >= (15, 30):
             start_date = news_time + timedelta(days=1)
         else:
             start_date = news_time
@@ -110,7 +111,7 @@ def main():
         impact = None
         if ticker:
             print(f"  -> Found Ticker: {ticker} | Q: {question}")
-            impact = calculate_impact(ticker, item['timestamp'])
+            impact = calculate_impact(ticker, item['published_at']) if item.get('published_at') is not None else None
             if impact is not None:
                 print(f"  -> Impact: {impact}%")
             else:
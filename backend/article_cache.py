@@ -0,0 +1,140 @@
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+# What the scraper remembers about an article between cycles
+CACHE_FIELDS = ("image_url", "published_at", "sentiment", "sentiment_score", "description", "full_content", "simhash", "duplicate_of")
+# Repeated across thousands of articles; one shared string each
+LABEL_FIELDS = ("category", "sentiment")
+
+# Default bound on the cache, bodies compressed (a 1000-article dataset takes ~3 MB)
+MAX_CACHE_BYTES = 32 * 1024 * 1024
+BODY_COMPRESSION_LEVEL = 6
+# Per-entry bookkeeping of the OrderedDict (node, hash table slot), roughly
+_ENTRY_OVERHEAD = 100
+
+def intern_labels(item):
+    """Interns an article's category and sentiment labels in place."""
+    for field in LABEL_FIELDS:
+        value = item.get(field)
+        if type(value) is str:
+            item[field] = sys.intern(value)
+    return item
+
+class CachedArticle:
+    """
+    One ARTICLE_CACHE entry: the CACHE_FIELDS of an article in slots, with
+    the body zlib-compressed and only decompressed when it is read.
+    get() mirrors dict.get so call sites read it like the old dict entries.
+    """
+    __slots__ = ("image_url", "published_at", "sentiment", "sentiment_score", "description",
+                 "simhash", "duplicate_of", "_body", "_body_crc", "size")
+
+    def __init__(self, item):
+        self.image_url = item.get("image_url")
+        self.published_at = item.get("published_at")
+        sentiment = item.get("sentiment")
+        self.sentiment = sys.intern(sentiment) if type(sentiment) is str else sentiment
+        self.sentiment_score = item.get("sentiment_score")
+        self.description = item.get("description")
+        self.simhash = item.get("simhash")
+        self.duplicate_of = item.get("duplicate_of")
+        body = item.get("full_content")
+        data = body.encode("utf-8") if body else None
+        self._body = zlib.compress(data, BODY_COMPRESSION_LEVEL) if data else None
+        self._body_crc = zlib.crc32(data) if data else None
+        # Approximate footprint, for the cache's byte bound: the fields, the link key and its OrderedDict node
+        self.size = sys.getsizeof(self) + _ENTRY_OVERHEAD + sum(
+            sys.getsizeof(value) for value in (item.get("link"), self.image_url, self.description, self.simhash,
+                                               self.duplicate_of, self._body)
+            if value is not None
+        )
+
+    @property
+    def full_content(self):
+        return zlib.decompress(self._body).decode("utf-8") if self._body is not None else None
+
+    @property
+    def has_body(self):
+        return self._body is not None
+
+    def matches(self, item):
+        """True if `item` holds exactly what this entry does (checked without decompressing)."""
+        if any(getattr(self, field) != item.get(field) for field in CACHE_FIELDS if field != "full_content"):
+            return False
+        body = item.get("full_content")
+        return (zlib.crc32(body.encode("utf-8")) if body else None) == self._body_crc
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in CACHE_FIELDS else None
+        return default if value is None else value
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in CACHE_FIELDS}
+
+class ArticleCache:
+    """
+    link -> CachedArticle, least recently used first out once the entries'
+    approximate size passes max_bytes. Thread-safe (the scrape pipeline's
+    parse workers write to it concurrently). Assigning a dict stores its
+    CACHE_FIELDS.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evicted = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, link):
+        return link in self._entries
+
+    def get(self, link, default=None):
+        with self._lock:
+            entry = self._entries.get(link)
+            if entry is None:
+                return default
+            self._entries.move_to_end(link)
+            return entry
+
+    def __getitem__(self, link):
+        entry = self.get(link)
+        if entry is None:
+            raise KeyError(link)
+        return entry
+
+    def __setitem__(self, link, item):
+        entry = item if isinstance(item, CachedArticle) else CachedArticle(item)
+        with self._lock:
+            old = self._entries.pop(link, None)
+            if old is not None:
+                self.bytes -= old.size
+            self._entries[link] = entry
+            self.bytes += entry.size
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= evicted.size
+                self.evicted += 1
+
+    def update(self, items):
+        """Stores a dataset's articles; unchanged entries are only moved up, not recompressed."""
+        for item in items:
+            link = item.get("link")
+            if not link:
+                continue
+            entry = self.get(link)
+            if entry is None or not entry.matches(item):
+                self[link] = item
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "bytes": self.bytes, "max_bytes": self.max_bytes, "evicted": self.evicted}
@@ -0,0 +1,119 @@
+import json
+
+from html_backend import ArticlePage
+
+NO_CONTENT = "Could not extract article content."
+
+# Paragraphs containing these are promotional/link noise, not article text
+NOISE_PHRASES = ["read also", "click here", "read more", "follow us on", "download", "whatsapp channel"]
+
+def ld_objects(page):
+    """Every JSON-LD object on the page, in document order (top-level lists flattened)."""
+    objects = []
+    for script in page.ld_json:
+        try:
+            data = json.loads(script)
+        except json.JSONDecodeError:
+            continue
+        for obj in data if isinstance(data, list) else [data]:
+            if isinstance(obj, dict):
+                objects.append(obj)
+    return objects
+
+def _ld_image(image):
+    if isinstance(image, dict):
+        return image.get("url")
+    if isinstance(image, str):
+        return image
+    if isinstance(image, list) and image:
+        return _ld_image(image[0])
+    return None
+
+def extract_metadata(page, objects=None):
+    """
+    Image, publish time, description and the other JSON-LD article fields.
+    `timestamp` is the raw string as found on the page.
+    """
+    if objects is None:
+        objects = ld_objects(page)
+    article = next((obj for obj in objects if "articleBody" in obj or "datePublished" in obj), {})
+
+    # High-quality image from the OG tag, then JSON-LD
+    image_url = page.meta(property="og:image")
+    if not image_url:
+        image_url = next((_ld_image(obj["image"]) for obj in objects if obj.get("image")), None)
+
+    # JSON-LD is the most reliable date for MoneyControl, then the meta tags
+    timestamp = next((obj["datePublished"] for obj in objects if obj.get("datePublished")), None)
+    if not timestamp:
+        timestamp = page.meta(property="article:published_time") or \
+                    page.meta(property="og:article:published_time") or \
+                    page.meta(name="datePublished") or \
+                    page.meta(property="og:published_time")
+    if not timestamp:
+        # MoneyControl often has publish time in span with class "article_schedule"
+        timestamp = page.time_text()
+
+    author = article.get("author")
+    if isinstance(author, list):
+        author = ", ".join(a.get("name", "") if isinstance(a, dict) else str(a) for a in author) or None
+    elif isinstance(author, dict):
+        author = author.get("name")
+
+    return {
+        "image_url": image_url,
+        "timestamp": timestamp,
+        "description": article.get("description") or page.meta(property="og:description") or page.meta(name="description"),
+        "headline": article.get("headline"),
+        "author": author,
+        "keywords": article.get("keywords"),
+        "section": article.get("articleSection"),
+        "date_modified": article.get("dateModified"),
+    }
+
+def extract_body(page, objects=None):
+    """
+    Full article text: JSON-LD articleBody, else the paragraphs of the
+    content container. Strips scripts/ads from the page, so run it last.
+    """
+    if objects is None:
+        objects = ld_objects(page)
+    for obj in objects:
+        text = obj.get("articleBody")
+        if isinstance(text, str) and len(text) > 100:
+            return text
+
+    # Fallback to scraping paragraphs from the common text containers
+    paragraphs = page.paragraphs()
+    if paragraphs is None:
+        return NO_CONTENT
+
+    clean_text = []
+    for text in paragraphs:
+        # Filter out garbage commonly causing hallucinations
+        if len(text) < 30: continue # Skip tiny fragments
+
+        text_lower = text.lower()
+        # Stop phrases that indicate the end of the article
+        if "disclaimer" in text_lower and len(text) < 100: break
+        if "copyright" in text_lower and "all rights reserved" in text_lower: break
+
+        if any(phrase in text_lower for phrase in NOISE_PHRASES):
+            continue
+
+        clean_text.append(text)
+
+    return "\n\n".join(clean_text)
+
+def extract_article(html, backend=None):
+    """
+    Everything deep fetch needs from an article page, from a single parse:
+    metadata (see extract_metadata) plus "full_content".
+    With the lxml backend the page is parsed by libxml2 and only the
+    nodes the extractor needs are read.
+    """
+    page = ArticlePage(html, backend)
+    objects = ld_objects(page)
+    article = extract_metadata(page, objects)
+    article["full_content"] = extract_body(page, objects)
+    return article
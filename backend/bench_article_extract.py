@@ -0,0 +1,42 @@
+"""
+Deep fetch cost per article on the bundled fixtures: the old two-pass
+flow (parse once for metadata, download and parse again for the body)
+vs the single-pass extractor.
+
+Usage: python bench_article_extract.py [rounds]
+"""
+import sys
+import time
+
+from article_extractor import extract_article, extract_body, extract_metadata
+from html_backend import ArticlePage
+
+FIXTURES = ["moneycontrol_sample.html", "debug_html.txt"]
+
+def two_pass(html):
+    # What fetch_details_single + scrape_article_content used to do, minus the network
+    article = extract_metadata(ArticlePage(html, "bs4"))
+    article["full_content"] = extract_body(ArticlePage(html, "bs4"))
+    return article
+
+def measure(fn, html, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(html)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for path in FIXTURES:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        old, old_ms = measure(two_pass, html, rounds)
+        new, new_ms = measure(lambda html: extract_article(html, "bs4"), html, rounds)
+        assert old == new, f"{path}: outputs differ"
+        print(f"{path} ({len(html) / 1024:.0f} KB)")
+        print(f"  two-pass    {old_ms:9.2f} ms/article  2 requests, 2 parses")
+        print(f"  single-pass {new_ms:9.2f} ms/article  1 request,  1 parse   (-{(1 - new_ms / old_ms) * 100:.0f}%)")
+        print(f"  timestamp={new['timestamp']!r} image={'yes' if new['image_url'] else 'no'} body={len(new['full_content'] or '')} chars")
+
+if __name__ == "__main__":
+    main()
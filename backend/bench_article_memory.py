@@ -0,0 +1,107 @@
+"""
+Memory of ARTICLE_CACHE at 1k, 10k and 100k articles (the bundled
+moneycontrol_news.json repeated with unique links and bodies): the old
+dict-per-article cache, which kept every article ever scraped with its
+body as a plain string, against the slotted, compressed ArticleCache,
+unbounded and at its default bound. Also what interning the category and
+sentiment labels saves on the dataset's own dicts.
+
+Each case runs in a fresh process with the articles streamed in one at a
+time: tracemalloc counts what the structure keeps alive, RSS is the
+process's growth minus that of generating the articles alone (noisier).
+
+Usage: python bench_article_memory.py [sizes, default 1000,10000,100000]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from article_cache import CACHE_FIELDS, ArticleCache, intern_labels
+from timestamps import normalize_article
+
+JSON_FILE = "moneycontrol_news.json"
+# "input" builds nothing: its RSS is what generating the articles alone leaves behind
+CASES = ("input", "dict", "lru", "lru-bounded", "labels", "labels-interned")
+
+def rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def articles(n):
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        base = [normalize_article(item) for item in json.load(f)]
+    for i in range(n):
+        item = dict(base[i % len(base)])
+        item["link"] = f"{item['link']}?copy={i}"
+        if item.get("full_content"):
+            # A distinct string per article, as after many scrapes
+            item["full_content"] = f"{item['full_content']} #{i}"
+        # Labels as json.loads returns them: a new string per article
+        for field in ("category", "sentiment"):
+            if item.get(field):
+                item[field] = json.loads(json.dumps(item[field]))
+        yield item
+
+def build(case, items):
+    if case == "input":
+        for _ in items:
+            pass
+        return []
+    if case == "dict":
+        cache = {}
+        for item in items:
+            cache[item["link"]] = {field: item.get(field) for field in CACHE_FIELDS}
+        return cache
+    if case in ("lru", "lru-bounded"):
+        cache = ArticleCache() if case == "lru-bounded" else ArticleCache(max_bytes=float("inf"))
+        for item in items:
+            cache[item["link"]] = item
+        return cache
+    # Only the label strings are new here: everything else is shared with the input
+    kept = [{"category": item.get("category"), "sentiment": item.get("sentiment")} for item in items]
+    if case == "labels-interned":
+        for item in kept:
+            intern_labels(item)
+    return kept
+
+def measure(case, n):
+    import gc
+    import tracemalloc
+    gc.collect()
+    rss_before = rss_bytes()
+    tracemalloc.start()
+    start = time.perf_counter()
+    # Articles stream in as scrapes do; what stays allocated is what the structure keeps alive
+    result = build(case, articles(n))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {"case": case, "n": n, "entries": len(result), "traced": traced,
+            "rss": rss_bytes() - rss_before, "seconds": elapsed}
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == "--one":
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]))))
+        return
+    sizes = [int(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "1000,10000,100000").split(",")]
+    print(f"{'articles':>9} {'case':<16} {'entries':>8} {'tracemalloc':>12} {'RSS growth':>11} {'time':>8}")
+    for n in sizes:
+        baseline = 0
+        for case in CASES:
+            out = subprocess.run([sys.executable, __file__, "--one", case, str(n)], capture_output=True, text=True, check=True)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            if case == "input":
+                baseline = r["rss"]
+                continue
+            print(f"{n:>9} {case:<16} {r['entries']:>8} {r['traced'] / 2**20:>9.1f} MB "
+                  f"{(r['rss'] - baseline) / 2**20:>8.1f} MB {r['seconds']:>7.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Cold start on the bundled moneycontrol_news.json: what a fresh process
+does before it can serve /news from memory, once from the JSON store
+(parse, normalize, tag, fingerprint, tokenize every article) and once
+from the binary snapshot (map, decode, reconcile). Also checks that the
+restored search index answers queries exactly like the rebuilt one.
+Works on copies in a temp dir.
+
+Usage: python bench_cold_start.py [rounds]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from dedup import DuplicateIndex, fingerprint
+from entity_tagger import tag_article
+from news_index import NewsIndex, article_id
+from news_snapshot import NewsSnapshot
+from news_store import NewsStore
+from search_index import SearchIndex
+from timestamps import normalize_article
+
+JSON_FILE = "moneycontrol_news.json"
+QUERIES = ["sensex", "nifty bank", '"stock market"', "rel", "rbi rate*", "tata motors q3"]
+
+def from_json(store):
+    news = [normalize_article(item) for item in store.load()]
+    duplicates, search = DuplicateIndex(), SearchIndex()
+    for item in news:
+        item["simhash"] = fingerprint(item)
+        item["duplicate_of"] = duplicates.claim(item)
+        tag_article(item)
+        item["id"] = article_id(item["link"])
+    index = NewsIndex(news)
+    search.update(news)
+    return news, index, search, duplicates
+
+def from_snapshot(snapshot, store):
+    header, sections = snapshot.load(store.version())
+    news = sections["items"]
+    duplicates, search = DuplicateIndex(), SearchIndex()
+    search.restore(sections["search"])
+    duplicates.restore(sections["duplicates"])
+    index = NewsIndex(news)
+    reindexed = search.update(news)
+    return news, index, search, reindexed
+
+def timed(fn, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    work = tempfile.mkdtemp()
+    try:
+        shutil.copy(JSON_FILE, os.path.join(work, JSON_FILE))
+        json_ms, (news, _, search, duplicates) = timed(lambda: from_json(NewsStore(os.path.join(work, JSON_FILE))), rounds)
+
+        store = NewsStore(os.path.join(work, JSON_FILE))
+        snapshot = NewsSnapshot(os.path.join(work, "moneycontrol_news.snapshot"))
+        snapshot.schedule(lambda: (
+            {"store_version": store.version(), "scrape_time": time.time()},
+            {"items": news, "search": search.export(), "duplicates": duplicates.export()},
+        ))
+        snapshot.flush()
+        size_kb = os.path.getsize(snapshot.path) // 1024
+
+        snap_ms, (restored, _, restored_search, reindexed) = timed(lambda: from_snapshot(snapshot, store), rounds)
+        assert [item["link"] for item in restored] == [item["link"] for item in news]
+        assert reindexed == 0, f"{reindexed} articles re-tokenized after restore"
+        for q in QUERIES:
+            assert restored_search.search(q) == search.search(q), f"results differ for {q!r}"
+
+        print(f"{len(news)} articles, snapshot {size_kb} KB")
+        print(f"  ready to serve  JSON store {json_ms:7.1f} ms   snapshot {snap_ms:7.1f} ms")
+        print(f"  restored search index matches the rebuilt one on {len(QUERIES)} queries")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
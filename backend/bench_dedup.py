@@ -0,0 +1,67 @@
+"""
+Near-duplicate detection over the bundled moneycontrol_news.json, as
+publish_news runs it on a dataset scraped before dedup existed: how many
+copies are found by story id and by SimHash, what fingerprinting costs,
+and how close the nearest distinct stories come to the threshold.
+Every duplicate skips the sentiment model and the embedding.
+
+Usage: python bench_dedup.py [shown]
+"""
+import itertools
+import json
+import sys
+import time
+
+from dedup import MAX_DISTANCE, DuplicateIndex, fingerprint, story_key
+from timestamps import normalize_article
+
+JSON_FILE = "moneycontrol_news.json"
+
+def main():
+    shown = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        news = [normalize_article(item) for item in json.load(f)]
+
+    start = time.perf_counter()
+    for item in news:
+        item["simhash"] = fingerprint(item)
+    fingerprint_ms = (time.perf_counter() - start) * 1000
+
+    index = DuplicateIndex()
+    start = time.perf_counter()
+    for item in news:
+        item["duplicate_of"] = index.claim(item)
+    claim_ms = (time.perf_counter() - start) * 1000
+
+    by_link = {item["link"]: item for item in news}
+    duplicates = [item for item in news if item["duplicate_of"]]
+    by_key = [d for d in duplicates if story_key(d["link"]) == story_key(d["duplicate_of"])]
+    printed = [item for item in news if item["simhash"]]
+    # The story id hides how often the text alone would have given the copy away
+    by_text = [
+        d for d in duplicates if d["simhash"] and by_link[d["duplicate_of"]]["simhash"]
+        and (int(d["simhash"], 16) ^ int(by_link[d["duplicate_of"]]["simhash"], 16)).bit_count() <= MAX_DISTANCE
+    ]
+
+    # Closest pairs that were *not* judged duplicates: the margin below the threshold
+    values = [(item, int(item["simhash"], 16)) for item in printed]
+    distinct = sorted(
+        (a_value ^ b_value).bit_count()
+        for (a, a_value), (b, b_value) in itertools.combinations(values, 2)
+        if a.get("duplicate_of") != b["link"] and b.get("duplicate_of") != a["link"]
+        and not (a.get("duplicate_of") and a.get("duplicate_of") == b.get("duplicate_of"))
+        and story_key(a["link"]) != story_key(b["link"])
+    )
+
+    print(f"{len(news)} articles, {len(printed)} with a fingerprint "
+          f"({fingerprint_ms / max(len(printed), 1):.2f} ms each), claims {claim_ms:.1f} ms total")
+    print(f"  duplicates: {len(duplicates)} ({len(by_key)} same story id, {len(duplicates) - len(by_key)} by SimHash <= {MAX_DISTANCE} bits); "
+          f"SimHash alone finds {len(by_text)} of them")
+    print(f"  model calls and embeddings saved: {len(duplicates)}; feed shows {len(news) - len(duplicates)} stories")
+    print(f"  closest distinct stories: {distinct[:5]} bits apart")
+    for item in duplicates[:shown]:
+        canonical = by_link[item["duplicate_of"]]
+        print(f"    {item['category'][:12]:<12} {item['headline'][:50]:<50} -> {canonical['category'][:12]:<12} {canonical['headline'][:50]}")
+
+if __name__ == "__main__":
+    main()
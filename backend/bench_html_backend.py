@@ -0,0 +1,52 @@
+"""
+HTML parser backends on the bundled fixtures: BeautifulSoup (html.parser)
+vs lxml, for article extraction and for a generated category listing.
+Both backends must produce identical output.
+
+Usage: python bench_html_backend.py [rounds]
+"""
+import sys
+import time
+
+from article_extractor import extract_article
+from html_backend import HAS_LXML, listing_entries
+
+FIXTURES = ["moneycontrol_sample.html", "debug_html.txt"]
+
+def listing_page(n=60):
+    # Shaped like a MoneyControl category page: chrome around a list of li.clearfix entries
+    items = "".join(
+        f'<li class="clearfix" id="newslist-{i}"><div class="thumbnail"><a href="https://www.moneycontrol.com/news/business/story-{i}.html">'
+        f'<img src="https://images.moneycontrol.com/{i}.jpg"></a></div>'
+        f'<h2><a href="https://www.moneycontrol.com/news/business/story-{i}.html">Sensex  &amp; Nifty headline {i} </a></h2>'
+        f'<span> {i % 23 + 1} hours ago </span><p>Summary paragraph for story {i}, a sentence or two long.</p></li>'
+        for i in range(n)
+    )
+    nav = "".join(f'<li class="menu"><a href="/section/{i}">Section {i}</a></li>' for i in range(200))
+    return f"<html><head><title>Business News</title></head><body><ul>{nav}</ul><ul id='cagetory'>{items}</ul></body></html>"
+
+def measure(fn, arg, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(arg)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+def compare(label, fn, arg, rounds):
+    slow, slow_ms = measure(lambda a: fn(a, "bs4"), arg, rounds)
+    fast, fast_ms = measure(lambda a: fn(a, "lxml"), arg, rounds)
+    assert slow == fast, f"{label}: backends disagree"
+    print(f"{label} ({len(arg) / 1024:.0f} KB)")
+    print(f"  bs4   {slow_ms:9.2f} ms")
+    print(f"  lxml  {fast_ms:9.2f} ms   ({slow_ms / fast_ms:.1f}x)")
+
+def main():
+    if not HAS_LXML:
+        sys.exit("lxml is not installed")
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for path in FIXTURES:
+        with open(path, "r", encoding="utf-8") as f:
+            compare(f"extract_article {path}", extract_article, f.read(), rounds)
+    compare("listing_entries generated", listing_entries, listing_page(), rounds)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Payload size and serialization time of a /news page: whole articles
+(the old response) vs the compact LIST_FIELDS projection.
+
+Usage: python bench_news_payload.py [limit]
+"""
+import json
+import sys
+import time
+
+from news_index import NewsIndex, LIST_FIELDS, project, article_id
+
+try:
+    from fastapi.encoders import jsonable_encoder
+except ImportError:
+    jsonable_encoder = None
+
+JSON_FILE = "moneycontrol_news.json"
+ROUNDS = 200
+
+def serialize(items):
+    # Same two steps FastAPI performs for a dict returned from an endpoint
+    payload = {"items": items, "total": len(items), "page": 1, "pages": 1}
+    if jsonable_encoder:
+        payload = jsonable_encoder(payload)
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+def measure(label, page, fields):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        body = serialize([project(item, fields) for item in page])
+    elapsed_ms = (time.perf_counter() - start) / ROUNDS * 1000
+    print(f"{label:<10} {len(body) / 1024:9.1f} KB {elapsed_ms:9.3f} ms/page")
+    return len(body), elapsed_ms
+
+def main():
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 24
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        news = json.load(f)
+    for item in news:
+        item["id"] = article_id(item["link"])
+        item["views"] = 0
+
+    page = NewsIndex(news).query()[:limit]
+    print(f"{len(news)} articles, page of {len(page)} (encoder: {'fastapi' if jsonable_encoder else 'json only'})")
+    full_size, full_ms = measure("full", page, None)
+    slim_size, slim_ms = measure("slim", page, LIST_FIELDS)
+    print(f"payload -{(1 - slim_size / full_size) * 100:.0f}%, serialization -{(1 - slim_ms / full_ms) * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
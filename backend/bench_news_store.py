@@ -0,0 +1,76 @@
+"""
+Saving the dataset after a scrape: the old whole-file JSON rewrite vs
+the snapshot + append-only log store, on a copy of the bundled
+moneycontrol_news.json where each "scrape" changes a few articles.
+
+Usage: python bench_news_store.py [scrapes] [changed_per_scrape]
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from news_store import NewsStore
+
+JSON_FILE = "moneycontrol_news.json"
+
+def rewrite(path, news_list):
+    # What scraper.save_news / analysis.save_news used to do
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(news_list, f, indent=4, ensure_ascii=False)
+
+def scrape(news_list, round_no, changed):
+    # A few new articles at the top, the same number aged out at the bottom
+    fresh = [dict(news_list[i], link=f"{news_list[i]['link']}?r={round_no}", headline=f"Fresh {round_no}-{i}") for i in range(changed)]
+    return fresh + news_list[:-changed]
+
+def main():
+    scrapes = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    changed = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        news = json.load(f)
+    work = tempfile.mkdtemp()
+    try:
+        old_path = os.path.join(work, "old.json")
+        new_path = os.path.join(work, "new.json")
+        shutil.copy(JSON_FILE, old_path)
+        shutil.copy(JSON_FILE, new_path)
+        store = NewsStore(new_path)
+        store.load()
+
+        old_s = new_s = 0.0
+        old_bytes = new_bytes = 0
+        current = news
+        for r in range(scrapes):
+            current = scrape(current, r, changed)
+            start = time.perf_counter()
+            rewrite(old_path, current)
+            old_s += time.perf_counter() - start
+            old_bytes += os.path.getsize(old_path)
+
+            before = os.path.getsize(store.log_path) if os.path.exists(store.log_path) else 0
+            start = time.perf_counter()
+            store.save(current)
+            new_s += time.perf_counter() - start
+            after = os.path.getsize(store.log_path)
+            new_bytes += after - before if after >= before else after + os.path.getsize(new_path)
+
+        start = time.perf_counter()
+        with open(old_path, "r", encoding="utf-8") as f:
+            old_loaded = json.load(f)
+        old_load = time.perf_counter() - start
+        start = time.perf_counter()
+        new_loaded = NewsStore(new_path).load()
+        new_load = time.perf_counter() - start
+        assert {item["link"]: item for item in old_loaded} == {item["link"]: item for item in new_loaded}, "stores disagree"
+
+        print(f"{len(news)} articles, {scrapes} saves with {changed} new + {changed} dropped each")
+        print(f"  rewrite   {old_s / scrapes * 1000:8.2f} ms/save  {old_bytes / scrapes / 1024:8.0f} KB written/save  load {old_load * 1000:.1f} ms")
+        print(f"  log store {new_s / scrapes * 1000:8.2f} ms/save  {new_bytes / scrapes / 1024:8.0f} KB written/save  load {new_load * 1000:.1f} ms")
+    finally:
+        shutil.rmtree(work)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Scrape cycle against a local HTTP stand-in for MoneyControl: the old
+thread pools (one connection per request) vs the asyncio engine
+(one pooled session). The stand-in serves generated category listings
+whose articles are the bundled fixture pages, adds a little latency,
+and counts the TCP connections it accepts. Listings carry an ETag, so
+later asyncio cycles show the content-hash skip and then conditional GETs
+answered with 304.
+
+Usage: python bench_scrape_engine.py [categories] [articles_per_category]
+"""
+import concurrent.futures
+import hashlib
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from curl_cffi import requests
+
+import scraper
+from dedup import DuplicateIndex
+from news_index import NewsIndex
+from scrape_engine import ScrapeEngine
+from sentiment import analyze_sentiment
+
+FIXTURES = ["moneycontrol_sample.html", "debug_html.txt"]
+LATENCY_SECONDS = 0.02
+
+class StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, per_category):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.per_category = per_category
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.pages = []
+        for path in FIXTURES:
+            with open(path, "rb") as f:
+                self.pages.append(f.read())
+
+    def base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self):
+        with self.lock:
+            self.connections = self.requests = 0
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(LATENCY_SECONDS)
+        parts = self.path.strip("/").split("/")
+        if parts[0] == "category":
+            items = "".join(
+                f'<li class="clearfix"><a href="{self.server.base()}/article/{parts[1]}-{i}.html">'
+                f'<h2>Fixture headline {parts[1]}-{i}</h2></a></li>'
+                for i in range(self.server.per_category)
+            )
+            body = f"<html><body><ul>{items}</ul></body></html>".encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+        elif parts[0] == "article":
+            n = int(parts[1].split("-")[1].split(".")[0])
+            body = self.server.pages[n % len(self.server.pages)]
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        if parts[0] == "category":
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+def fetch_details_single(link, basic_data):
+    # The old per-article fetch: a fresh connection each time, sentiment scored one headline at a time
+    html = None
+    try:
+        response = requests.get(link, headers=scraper.HEADERS, timeout=scraper.ARTICLE_TIMEOUT_SECONDS, impersonate="chrome")
+        if response.status_code == 200:
+            html = response.text
+    except Exception as e:
+        print(f"Error fetching article details for {link}: {e}")
+    details = scraper.page_details(link, basic_data, html)
+    try:
+        result = analyze_sentiment(basic_data.get("headline", ""))
+    except Exception as e:
+        print(f"Sentiment analysis failed for {link}: {e}")
+        result = {"label": "neutral", "score": 0.0}
+    details["sentiment"] = result["label"]
+    details["sentiment_score"] = result["score"]
+    return details
+
+def deep_fetch_metadata(news_list):
+    # The old deep fetch, its own pool of 10 threads
+    to_fetch = [item for item in news_list if item.get("needs_deep_fetch")]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        future_to_item = {executor.submit(fetch_details_single, item["link"], item): item for item in to_fetch}
+        for future in concurrent.futures.as_completed(future_to_item):
+            item = future_to_item[future]
+            try:
+                details = future.result()
+                item.update(details)
+                item.pop("needs_deep_fetch", None)
+                scraper.ARTICLE_CACHE[item["link"]] = details
+            except Exception as e:
+                print(f"Deep fetch failed for {item['link']}: {e}")
+    return news_list
+
+def thread_pool_cycle(categories):
+    # The old flow: scrape_moneycontrol() then deep_fetch_metadata(), each with its own pool
+    news = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        for items in executor.map(lambda kv: scraper.scrape_category(kv[1], kv[0]), categories.items()):
+            news.extend(items)
+    return deep_fetch_metadata(news)
+
+def run(label, server, fn, clear_cache=True):
+    if clear_cache:
+        scraper.ARTICLE_CACHE.clear()
+        # Each run starts from a fresh index, or every article would be a copy of the last run's
+        scraper.DUPLICATES = DuplicateIndex()
+        scraper.NEWS_INDEX = NewsIndex()
+    server.reset()
+    start = time.perf_counter()
+    news = fn()
+    elapsed = time.perf_counter() - start
+    fetched = sum(1 for item in news if item.get("full_content"))
+    print(f"{label:<12} {elapsed:6.2f} s  {server.requests:4d} requests  {server.connections:4d} connections  {fetched}/{len(news)} bodies")
+    if news:
+        # Stands in for publish_news (no store, no database): what the next cycle checks listings against
+        scraper.NEWS_INDEX = NewsIndex(news)
+
+def main():
+    n_categories = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_category = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+
+    server = StandIn(per_category)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scraper.ARTICLE_HOST = "127.0.0.1"
+    scraper.ARCHIVE_ENABLED = False  # keep stand-in pages out of the HTML archive
+    scraper.ingest_news_articles = lambda items: None  # ... and out of the chroma_db vector store
+    categories = {f"Cat{c}": f"{server.base()}/category/{c}" for c in range(n_categories)}
+
+    run("threads", server, lambda: thread_pool_cycle(categories))
+    engine = lambda: ScrapeEngine(headers=scraper.HEADERS, rate=1000, burst=1000)
+    states = {}  # listing state kept here rather than in the database
+    run("asyncio", server, lambda: scraper.scrape_cycle(categories, engine(), states))
+    # Nothing changed on the stand-in: the listings' content hash matches, nothing is deep-fetched.
+    # Every article now has its body, so this cycle keeps the ETags...
+    run("asyncio 2nd", server, lambda: scraper.scrape_cycle(categories, engine(), states), clear_cache=False)
+    # ...and from here on listings come back 304, nothing is parsed
+    run("asyncio 3rd", server, lambda: scraper.scrape_cycle(categories, engine(), states), clear_cache=False)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Simulated day of publishing: the old fixed 5-minute refresh of every
+category vs the adaptive scheduler. Articles arrive per category as a
+Poisson process (busy in market hours, quiet at night); a poll finds
+whatever arrived since the previous one. Reports listing requests and
+how long new articles waited to be discovered.
+
+Usage: python bench_scrape_scheduler.py [days] [seed]
+"""
+import random
+import sys
+from datetime import datetime, timedelta
+
+from scrape_scheduler import DEFAULT_POLL_SECONDS, TICK_SECONDS, due_categories, plan
+
+# Articles per hour during market hours; a quarter of that outside them
+RATES = {
+    "Stocks": 30, "Companies": 14, "Economy": 6, "Banking": 4, "Technical Analysis": 4, "IPO": 3,
+    "Earnings": 3, "Personal Finance": 2, "Mutual Funds": 1.5, "Startup": 1.5, "Commodities": 1,
+    "Currency": 1, "Equity Research": 1, "Real Estate": 0.5, "Gold Rate": 0.4, "Silver Rate": 0.2, "AQI": 0.1,
+}
+
+def arrivals(rng, start, days):
+    times = {}
+    for name, rate in RATES.items():
+        t, out = start, []
+        end = start + timedelta(days=days)
+        while t < end:
+            busy = 9 <= t.hour < 16
+            t += timedelta(hours=rng.expovariate(rate if busy else rate / 4))
+            out.append(t)
+        times[name] = out
+    return times
+
+def simulate(published, start, days, adaptive):
+    categories = {name: name for name in RATES}
+    states = {name: {} for name in RATES}
+    pending = {name: list(times) for name, times in published.items()}
+    requests, waits = 0, []
+    now, end = start, start + timedelta(days=days)
+    while now < end:
+        if adaptive:
+            due = due_categories(states, categories, now)
+        else:
+            due = categories if (now - start).total_seconds() % DEFAULT_POLL_SECONDS < TICK_SECONDS else {}
+        found = {}
+        for name in due:
+            requests += 1
+            queue = pending[name]
+            n = 0
+            while queue and queue[0] <= now:
+                waits.append((now - queue.pop(0)).total_seconds())
+                n += 1
+            found[name] = n
+        if adaptive and found:
+            plan(states, found, categories, now)
+        now += timedelta(seconds=TICK_SECONDS)
+    return requests, waits, states
+
+def report(label, days, requests, waits):
+    waits = sorted(waits)
+    mean = sum(waits) / len(waits) / 60
+    p90 = waits[int(len(waits) * 0.9)] / 60
+    print(f"{label:<10} {requests / days:7.0f} requests/day   wait mean {mean:5.1f} min  p90 {p90:5.1f} min  ({len(waits)} articles)")
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    rng = random.Random(int(sys.argv[2]) if len(sys.argv) > 2 else 7)
+    start = datetime(2026, 1, 5)
+    published = arrivals(rng, start, days)
+    fixed = simulate(published, start, days, adaptive=False)
+    adaptive = simulate(published, start, days, adaptive=True)
+    report("fixed 5m", days, *fixed[:2])
+    report("adaptive", days, *adaptive[:2])
+    states = adaptive[2]
+    print("learned intervals at the end (min):", ", ".join(
+        f"{name} {states[name]['poll_interval'] / 60:.0f}" for name in sorted(RATES, key=RATES.get, reverse=True)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Timestamp handling on the bundled moneycontrol_news.json: the old
+display-string parsing (strptime on every filter and sort) vs the
+precompiled parser run once at ingest plus epoch comparisons afterwards.
+Also checks that every stored string survives parse -> format unchanged.
+
+Usage: python bench_timestamps.py [rounds]
+"""
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+
+from news_index import NewsIndex
+from timestamps import DISPLAY_FORMAT, age_cutoff, format_timestamp, normalize_article, parse_timestamp
+
+JSON_FILE = "moneycontrol_news.json"
+
+def old_merge_filter(news):
+    # What merge_news did on every publish: strptime to filter, strptime again to sort
+    cutoff = datetime.now() - timedelta(days=3650)
+    kept = [a for a in news if a.get("timestamp") and datetime.strptime(a["timestamp"], DISPLAY_FORMAT) >= cutoff]
+    kept.sort(key=lambda x: datetime.strptime(x["timestamp"], DISPLAY_FORMAT), reverse=True)
+    return kept
+
+def new_merge_filter(news):
+    cutoff = age_cutoff(3650)
+    kept = [a for a in news if a.get("published_at") is not None and a["published_at"] >= cutoff]
+    kept.sort(key=lambda x: x["published_at"], reverse=True)
+    return kept
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    with open(JSON_FILE, "r", encoding="utf-8") as f:
+        legacy = json.load(f)
+    strings = [item["timestamp"] for item in legacy if item.get("timestamp")]
+
+    mismatched = [s for s in strings if format_timestamp(parse_timestamp(s)) != s]
+    assert not mismatched, f"round trip changed {len(mismatched)} timestamps, e.g. {mismatched[:3]}"
+
+    strptime_ms, _ = timed(lambda: [datetime.strptime(s, DISPLAY_FORMAT) for s in strings], rounds)
+    parser_ms, _ = timed(lambda: [parse_timestamp(s) for s in strings], rounds)
+    normalized = [normalize_article(dict(item)) for item in legacy]
+    old_ms, old_kept = timed(lambda: old_merge_filter(legacy), rounds)
+    new_ms, new_kept = timed(lambda: new_merge_filter(normalized), rounds)
+    assert [a["link"] for a in old_kept] == [a["link"] for a in new_kept], "filters disagree"
+    index_ms, _ = timed(lambda: NewsIndex(normalized), rounds)
+
+    print(f"{len(strings)} timestamps, all round-trip unchanged")
+    print(f"  parse once    strptime {strptime_ms:6.2f} ms   precompiled parser {parser_ms:6.2f} ms")
+    print(f"  merge filter  strings  {old_ms:6.2f} ms   epochs             {new_ms:6.2f} ms")
+    print(f"  index build (no parsing left) {index_ms:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,12 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, DateTime, Float, Text
+from sqlalchemy import create_engine, Column, Integer, String, Date, ForeignKey, DateTime, Float, Text, Index, inspect, text, update, or_, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import bcrypt
+from search_index import parse_query
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Robust DB Path: Always look in the same directory as this file (backend/)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -42,6 +44,18 @@ class NewsAnalytics(Base):
     news_link = Column(String, unique=True, index=True)
     views = Column(Integer, default=0)
 
+class NewsViewLog(Base):
+    """
+    View deltas as each flush wrote them, so every process can replay the
+    views the others recorded (trending scores). Pruned once too old to matter.
+    """
+    __tablename__ = "news_view_log"
+
+    id = Column(Integer, primary_key=True) # replay position
+    news_link = Column(String)
+    views = Column(Integer)
+    viewed_at = Column(DateTime, index=True) # flush time, naive UTC
+
 class SentNotification(Base):
     __tablename__ = "sent_notifications"
 
@@ -59,18 +73,368 @@ class NewsItem(Base):
     __tablename__ = "news_items"
 
     id = Column(Integer, primary_key=True, index=True)
+    article_id = Column(String, unique=True, index=True) # public id, see news_index.article_id
     title = Column(String)
     description = Column(Text, nullable=True)
     link = Column(String, unique=True, index=True)
     image_url = Column(String, nullable=True)
     source = Column(String, default="Moneycontrol")
-    timestamp = Column(DateTime, index=True)
+    timestamp = Column(DateTime, index=True) # publish time, naive UTC (timestamps.to_db)
     category = Column(String, index=True)
     sentiment = Column(String, nullable=True)
     sentiment_score = Column(Float, nullable=True)
+    full_content = Column(Text, nullable=True)
+    # Link of the canonical article when this is a copy of the same story (see dedup)
+    duplicate_of = Column(String, nullable=True, index=True)
+
+    __table_args__ = (
+        # Feed order: newest first, link as tie-breaker
+        Index("ix_news_items_timestamp_link", "timestamp", "link"),
+        # The category filter compares lower(category), so it stays case-insensitive and indexed
+        Index("ix_news_items_category_lower", func.lower(category)),
+    )
+
+class NewsItemSymbol(Base):
+    __tablename__ = "news_item_symbols"
+
+    id = Column(Integer, primary_key=True, index=True)
+    news_id = Column(Integer, ForeignKey("news_items.id"), index=True)
+    symbol = Column(String, index=True) # lowercase
+
+class CategoryListingState(Base):
+    """Conditional-GET validators and change-detection state per category listing page."""
+    __tablename__ = "category_listing_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    category = Column(String, unique=True, index=True)
+    url = Column(String)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String, nullable=True) # sha1 of the parsed (headline, link) list
+    hits = Column(Integer, default=0) # cycles where the listing had not changed
+    not_modified = Column(Integer, default=0) # ... of which answered with a 304
+    misses = Column(Integer, default=0) # cycles where it changed and was processed
+    last_checked = Column(DateTime, nullable=True)
+    # Adaptive polling (scrape_scheduler.py): decayed new-link count over decayed hours observed
+    arrivals = Column(Float, default=0.0)
+    exposure_hours = Column(Float, default=0.0)
+    new_links = Column(Integer, nullable=True) # new links seen on the last poll
+    poll_interval = Column(Float, nullable=True) # seconds
+    last_polled = Column(DateTime, nullable=True)
+    next_poll = Column(DateTime, nullable=True)
+
+class ArchivedPage(Base):
+    """One fetch of an article page; the HTML itself is a gzip blob in the archive directory, named by digest."""
+    __tablename__ = "html_archive"
+
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, index=True)
+    fetched_at = Column(DateTime, index=True)
+    digest = Column(String, index=True) # sha256 of the UTF-8 HTML
+    size = Column(Integer) # bytes before compression
+    stored_size = Column(Integer) # bytes on disk
+
+class JobStatus(Base):
+    """
+    Last run of each background job (jobs.py), shared by every process:
+    the row is the lock that keeps runs from overlapping, and the record
+    of how long they take.
+    """
+    __tablename__ = "job_status"
+
+    name = Column(String, primary_key=True)
+    state = Column(String, default="idle") # idle / running / ok / failed
+    owner = Column(String, nullable=True) # host:pid that claimed the current or last run
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    last_duration = Column(Float, nullable=True) # seconds
+    max_duration = Column(Float, default=0.0)
+    total_duration = Column(Float, default=0.0)
+    runs = Column(Integer, default=0)
+    failures = Column(Integer, default=0)
+    skipped = Column(Integer, default=0) # ticks that found it running, or already run this interval
+    last_error = Column(Text, nullable=True)
+
+_LISTING_STATE_FIELDS = ("url", "etag", "last_modified", "content_hash", "hits", "not_modified", "misses", "last_checked",
+                         "arrivals", "exposure_hours", "new_links", "poll_interval", "last_polled", "next_poll")
+
+def get_listing_states(db):
+    """{category: {field: value}} for every category seen so far."""
+    return {
+        row.category: {field: getattr(row, field) for field in _LISTING_STATE_FIELDS}
+        for row in db.query(CategoryListingState)
+    }
+
+def save_listing_states(db, states):
+    """Upserts {category: {field: value}} in one batched statement."""
+    if not states:
+        return
+    stmt = sqlite_insert(CategoryListingState)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CategoryListingState.category],
+        set_={field: stmt.excluded[field] for field in _LISTING_STATE_FIELDS}
+    )
+    db.execute(stmt, [
+        {"category": category, **{field: state.get(field) for field in _LISTING_STATE_FIELDS}}
+        for category, state in states.items()
+    ])
+    db.commit()
+
+def _add_missing_columns():
+    """
+    create_all() only creates missing tables, it never alters existing ones.
+    Add any columns introduced since a table was created (SQLite ADD COLUMN).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for col in table.columns:
+                if col.name not in existing:
+                    col_type = col.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}'))
+                    print(f"Added column {table.name}.{col.name}")
+            # ADD COLUMN can't carry constraints; indexes (incl. unique ones) are created separately,
+            # as are indexes declared since the table was created. Names come from sqlite_master:
+            # reflection (checkfirst) skips expression indexes
+            indexes = {name for (name,) in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"), {"table": table.name}
+            )}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(conn)
+
+# Full-text index over article text. External-content FTS5 table: it stores only
+# the index and reads column values from news_items; triggers keep it in sync.
+_FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+        title, description, full_content,
+        content='news_items', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS news_items_fts_ai AFTER INSERT ON news_items BEGIN
+        INSERT INTO news_fts(rowid, title, description, full_content)
+        VALUES (new.id, new.title, new.description, new.full_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_items_fts_ad AFTER DELETE ON news_items BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, description, full_content)
+        VALUES ('delete', old.id, old.title, old.description, old.full_content);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS news_items_fts_au AFTER UPDATE ON news_items BEGIN
+        INSERT INTO news_fts(news_fts, rowid, title, description, full_content)
+        VALUES ('delete', old.id, old.title, old.description, old.full_content);
+        INSERT INTO news_fts(rowid, title, description, full_content)
+        VALUES (new.id, new.title, new.description, new.full_content);
+    END""",
+)
+
+def _init_fts():
+    with engine.begin() as conn:
+        existed = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'news_fts'")).first()
+        for ddl in _FTS_DDL:
+            conn.execute(text(ddl))
+        if not existed:
+            # Index rows stored before the FTS table existed
+            conn.execute(text("INSERT INTO news_fts(news_fts) VALUES ('rebuild')"))
+
+def to_fts_query(q):
+    """
+    Turns user input into a safe FTS5 MATCH expression, with the same syntax
+    as the in-memory search: quoted phrases, trailing * for prefixes, AND
+    between terms. Returns None if nothing searchable is left.
+    """
+    parts = []
+    for kind, value in parse_query(q):
+        if kind == "phrase":
+            parts.append('"' + " ".join(value) + '"')
+        elif kind == "prefix":
+            parts.append(f'"{value}"*')
+        else:
+            parts.append(f'"{value}"')
+    return " ".join(parts) or None
+
+def to_fts_title_query(words):
+    """
+    FTS5 MATCH for titles containing any of `words` (each as a phrase:
+    whole words, any case). Returns None if nothing searchable is left.
+    """
+    phrases = [to_fts_query('"' + word.replace('"', " ") + '"') for word in words]
+    return " OR ".join(f"title : {phrase}" for phrase in phrases if phrase) or None
+
+def title_mentions(title, words):
+    """
+    SQL clause: `title` contains one of `words` as a whole word, any case,
+    like the \\b...\\b headline regex of the in-memory index. Unlike an FTS
+    match it doesn't stem ("bank" isn't "banks"), so use it to narrow FTS hits.
+    """
+    lowered = func.lower(title)
+    clauses = []
+    for word in words:
+        # GLOB metacharacters in the word match literally
+        word = "".join(f"[{c}]" if c in "*?[" else c for c in word.lower())
+        clauses += [
+            lowered.op("GLOB")(word),
+            lowered.op("GLOB")(f"{word}[^a-z0-9_]*"),
+            lowered.op("GLOB")(f"*[^a-z0-9_]{word}"),
+            lowered.op("GLOB")(f"*[^a-z0-9_]{word}[^a-z0-9_]*"),
+        ]
+    return or_(*clauses)
 
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    _migrate_timestamps_to_utc()
+    _init_fts()
+
+# PRAGMA user_version once news_items.timestamp holds UTC
+_UTC_TIMESTAMPS_VERSION = 1
+
+def _migrate_timestamps_to_utc():
+    """
+    news_items.timestamp used to hold IST wall-clock times; it now holds
+    UTC like every other stored instant. Shifts old rows once, in the
+    format SQLAlchemy writes, so range and cursor comparisons still match.
+    """
+    with engine.begin() as conn:
+        if conn.execute(text("PRAGMA user_version")).scalar() >= _UTC_TIMESTAMPS_VERSION:
+            return
+        shifted = conn.execute(text(
+            "UPDATE news_items SET timestamp = strftime('%Y-%m-%d %H:%M:%f', timestamp, '-330 minutes') || '000' "
+            "WHERE timestamp IS NOT NULL"
+        )).rowcount
+        conn.execute(text(f"PRAGMA user_version = {_UTC_TIMESTAMPS_VERSION}"))
+    if shifted:
+        print(f"Converted {shifted} news_items timestamps from IST to UTC.")
+
+# Columns compared to decide whether an upsert actually needs to rewrite a row
+_NEWS_ITEM_FIELDS = ("article_id", "title", "description", "image_url", "timestamp", "category", "sentiment", "sentiment_score", "full_content", "duplicate_of")
+
+def upsert_news_items(db, rows, chunk_size=500):
+    """
+    Inserts or updates news_items by link. Rows whose stored values are
+    unchanged are skipped, so a re-publish only writes what changed.
+    `rows` are dicts with NewsItem column names plus an optional "symbols" list.
+    Returns the number of rows written.
+    """
+    if not rows:
+        return 0
+
+    # 1. Diff against what is stored
+    links = [row["link"] for row in rows]
+    stored = {}
+    for i in range(0, len(links), chunk_size):
+        columns = [getattr(NewsItem, field) for field in _NEWS_ITEM_FIELDS]
+        for link, *values in db.query(NewsItem.link, *columns).filter(NewsItem.link.in_(links[i:i + chunk_size])):
+            stored[link] = tuple(values)
+    changed = [row for row in rows if stored.get(row["link"]) != tuple(row.get(f) for f in _NEWS_ITEM_FIELDS)]
+    if not changed:
+        return 0
+
+    # 2. One batched INSERT ... ON CONFLICT(link) DO UPDATE for the changed rows
+    stmt = sqlite_insert(NewsItem)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NewsItem.link],
+        set_={field: stmt.excluded[field] for field in _NEWS_ITEM_FIELDS}
+    )
+    db.execute(stmt, [
+        {"link": row["link"], **{field: row.get(field) for field in _NEWS_ITEM_FIELDS}}
+        for row in changed
+    ])
+
+    # 3. Replace symbol tags of the rows we touched
+    tagged = [row for row in changed if "symbols" in row]
+    if tagged:
+        ids = dict(db.query(NewsItem.link, NewsItem.id).filter(NewsItem.link.in_([row["link"] for row in tagged])))
+        db.query(NewsItemSymbol).filter(NewsItemSymbol.news_id.in_(ids.values())).delete(synchronize_session=False)
+        db.add_all(
+            NewsItemSymbol(news_id=ids[row["link"]], symbol=symbol.lower())
+            for row in tagged for symbol in row["symbols"]
+        )
+
+    db.commit()
+    return len(changed)
+
+def count_news_items(db, links, chunk_size=500):
+    """How many of `links` have a news_items row."""
+    links = list(links)
+    return sum(
+        db.query(func.count(NewsItem.id)).filter(NewsItem.link.in_(links[i:i + chunk_size])).scalar()
+        for i in range(0, len(links), chunk_size)
+    )
+
+def claim_job(db, name, owner, min_interval, max_runtime):
+    """
+    Marks job `name` running for `owner` if no run is in progress (or the
+    running one is older than max_runtime seconds, i.e. its process died)
+    and the last one started at least min_interval seconds ago. One
+    conditional UPDATE, so only one process can win. Returns True if it did.
+    """
+    now = datetime.utcnow()
+    db.execute(sqlite_insert(JobStatus).values(name=name).on_conflict_do_nothing(index_elements=[JobStatus.name]))
+    claimed = db.execute(
+        update(JobStatus)
+        .where(
+            JobStatus.name == name,
+            or_(JobStatus.state != "running", JobStatus.started_at < now - timedelta(seconds=max_runtime)),
+            or_(JobStatus.started_at.is_(None), JobStatus.started_at <= now - timedelta(seconds=min_interval)),
+        )
+        .values(state="running", owner=owner, started_at=now)
+    ).rowcount == 1
+    if not claimed:
+        db.execute(update(JobStatus).where(JobStatus.name == name).values(skipped=JobStatus.skipped + 1))
+    db.commit()
+    return claimed
+
+def finish_job(db, name, owner, duration, error=None):
+    """Records the end of a run claimed by `owner` (a run taken over as stale is left to its new owner)."""
+    db.execute(
+        update(JobStatus)
+        .where(JobStatus.name == name, JobStatus.owner == owner, JobStatus.state == "running")
+        .values(
+            state="failed" if error else "ok",
+            finished_at=datetime.utcnow(),
+            last_duration=duration,
+            max_duration=func.max(JobStatus.max_duration, duration),
+            total_duration=JobStatus.total_duration + duration,
+            runs=JobStatus.runs + 1,
+            failures=JobStatus.failures + (1 if error else 0),
+            last_error=error,
+        )
+    )
+    db.commit()
+
+def add_views(db, deltas, keep_seconds=None):
+    """
+    Adds {link: n} view deltas in one batched
+    INSERT ... ON CONFLICT(news_link) DO UPDATE SET views = views + n.
+    The increment happens inside SQLite, so concurrent writers never lose counts.
+    The deltas are appended to news_view_log in the same transaction; with
+    keep_seconds, log entries older than that are dropped.
+    """
+    if not deltas:
+        return
+    stmt = sqlite_insert(NewsAnalytics)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[NewsAnalytics.news_link],
+        set_={"views": NewsAnalytics.views + stmt.excluded.views}
+    )
+    db.execute(stmt, [{"news_link": link, "views": n} for link, n in deltas.items()])
+    now = datetime.utcnow()
+    db.execute(sqlite_insert(NewsViewLog), [
+        {"news_link": link, "views": n, "viewed_at": now} for link, n in deltas.items()
+    ])
+    if keep_seconds is not None:
+        db.query(NewsViewLog).filter(NewsViewLog.viewed_at < now - timedelta(seconds=keep_seconds)).delete(synchronize_session=False)
+    db.commit()
+
+def get_view_log(db, after_id=0, since=None):
+    """View log entries [(id, link, views, viewed_at)] past `after_id` (and newer than `since`), oldest first."""
+    query = db.query(NewsViewLog.id, NewsViewLog.news_link, NewsViewLog.views, NewsViewLog.viewed_at).filter(NewsViewLog.id > after_id)
+    if since is not None:
+        query = query.filter(NewsViewLog.viewed_at >= since)
+    return query.order_by(NewsViewLog.id).all()
 
 def get_db():
     db = SessionLocal()
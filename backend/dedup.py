@@ -0,0 +1,216 @@
+import hashlib
+import re
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only say where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "referral",
+                   "source", "src", "cmpid", "campaign", "igshid", "_ga", "classic"}
+# MoneyControl article URLs end in the story id, which survives slug edits and section moves
+_STORY_ID = re.compile(r"-(\d{6,})\.html$")
+_TOKEN = re.compile(r"\w+")
+
+# SimHash bits that may differ between two copies of one story. Calibrated on the bundled
+# dataset: re-slugged/re-headlined copies differ by <= 7 bits, distinct stories built from
+# the same template (results tables, daily price notes) by >= 8
+MAX_DISTANCE = 7
+# Only articles published this close together can be copies of each other
+DUPLICATE_WINDOW_HOURS = 48
+# Bodies shorter than this don't get a fingerprint (too little text to tell stories apart)
+MIN_BODY_WORDS = 50
+# Entries older than this are dropped from the index (the dataset keeps 30 days)
+KEEP_DAYS = 30
+# ... checked on a claim at most this often
+PRUNE_INTERVAL_SECONDS = 3600
+
+# Bit i of each byte value, for counting set bits column-wise with bytes.translate
+_BIT_TABLES = [bytes((value >> i) & 1 for value in range(256)) for i in range(8)]
+
+def canonical_url(link):
+    """
+    One spelling per article URL: lowercase scheme and host, no fragment,
+    tracking parameters or AMP suffix, remaining parameters sorted.
+    """
+    if not link:
+        return link
+    parts = urlsplit(link.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if path.startswith("/amp/"):
+        path = path[4:]
+    for suffix in ("/amp", "/amp/"):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def story_key(link):
+    """What identifies a story across URLs: MoneyControl's article id, else the canonical URL."""
+    canonical = canonical_url(link)
+    match = _STORY_ID.search(urlsplit(canonical).path) if canonical else None
+    return f"moneycontrol:{match.group(1)}" if match else canonical
+
+def simhash(text):
+    """
+    64-bit SimHash over the word bigrams of `text`: each bit is the
+    majority vote of that bit across the bigrams' hashes, so texts that
+    share most bigrams end up a few bits apart.
+    """
+    words = _TOKEN.findall(text.lower())
+    features = {f"{a} {b}" for a, b in zip(words, words[1:])}
+    if not features:
+        return 0
+    data = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    half = len(features) / 2
+    value = 0
+    for byte in range(8):
+        column = data[byte::8]
+        for bit in range(8):
+            if column.translate(_BIT_TABLES[bit]).count(1) > half:
+                value |= 1 << (byte * 8 + bit)
+    return value
+
+def fingerprint(item):
+    """Hex SimHash of an article's headline and body, None if the body is too short to judge."""
+    body = item.get("full_content") or ""
+    if len(body.split()) < MIN_BODY_WORDS:
+        return None
+    return format(simhash(f"{item.get('headline') or ''}\n{body}"), "016x")
+
+def _day(published):
+    """Bucket of a publish time: whole days since the epoch, None if undated."""
+    return int(published // 86400) if published is not None else None
+
+class DuplicateIndex:
+    """
+    Canonical articles by story key and by SimHash. claim() decides
+    whether an article is a copy of one already seen (same story id, or
+    a fingerprint within MAX_DISTANCE bits, published within
+    DUPLICATE_WINDOW_HOURS) or becomes canonical itself. Fingerprints are
+    bucketed by publish day, so the lookup (xor + bit_count per print)
+    scans only the days within the window, plus undated prints, rather
+    than all KEEP_DAYS of them.
+    Thread-safe: the parse stage claims from several threads.
+    """
+
+    def __init__(self, max_distance=MAX_DISTANCE, window_hours=DUPLICATE_WINDOW_HOURS):
+        self.max_distance = max_distance
+        self.window = window_hours * 3600
+        self._by_key = {}      # story key -> canonical link
+        self._prints = {}      # canonical link -> (simhash int, published_at)
+        self._by_day = {}      # publish day (None: undated) -> {canonical link: simhash int}
+        self._seen = {}        # canonical link -> when it was added, for pruning
+        self._pruned_at = time.time()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def canonical_link(self, link):
+        """The canonical article of the same story under a different URL, if any."""
+        with self._lock:
+            canonical = self._by_key.get(story_key(link))
+        return canonical if canonical != link else None
+
+    def claim(self, item):
+        """
+        Returns the canonical link `item` duplicates, or None after
+        registering `item` as canonical. Articles already marked as
+        duplicates are never registered.
+        """
+        link = item["link"]
+        key = story_key(link)
+        print_hex = item.get("simhash")
+        value = int(print_hex, 16) if print_hex else None
+        published = item.get("published_at")
+        with self._lock:
+            canonical = self._by_key.get(key)
+            if canonical is None and value is not None:
+                canonical = self._nearest(value, published, link)
+            if canonical is not None and canonical != link:
+                return canonical
+            if item.get("duplicate_of"):
+                return item["duplicate_of"]
+            self._by_key.setdefault(key, link)
+            if value is not None:
+                self._add_print(link, value, published)
+            now = time.time()
+            self._seen[link] = published if published is not None else now
+            if now - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                self._prune()
+            return None
+
+    def update(self, items):
+        """Registers the canonical articles of a loaded dataset (duplicates are skipped)."""
+        for item in items:
+            if item.get("link") and not item.get("duplicate_of") and item["link"] not in self._seen:
+                self.claim(item)
+
+    def export(self):
+        """The index as plain values for a snapshot."""
+        with self._lock:
+            return {"by_key": dict(self._by_key), "prints": dict(self._prints), "seen": dict(self._seen)}
+
+    def restore(self, state):
+        with self._lock:
+            self._by_key = dict(state["by_key"])
+            self._prints = {}
+            self._by_day = {}
+            for link, (value, published) in state["prints"].items():
+                self._add_print(link, value, published)
+            self._seen = dict(state["seen"])
+
+    def _add_print(self, link, value, published):
+        self._drop_print(link)
+        self._prints[link] = (value, published)
+        self._by_day.setdefault(_day(published), {})[link] = value
+
+    def _drop_print(self, link):
+        entry = self._prints.pop(link, None)
+        if entry is None:
+            return
+        day = _day(entry[1])
+        bucket = self._by_day[day]
+        del bucket[link]
+        if not bucket:
+            del self._by_day[day]
+
+    def _candidates(self, published):
+        # Prints that may be within the window of `published` (all of them if it is undated)
+        if published is None:
+            return self._prints.items()
+        days = range(_day(published - self.window), _day(published + self.window) + 1)
+        return (
+            (other, (other_value, self._prints[other][1]))
+            for day in (*days, None) for other, other_value in self._by_day.get(day, {}).items()
+        )
+
+    def _nearest(self, value, published, link):
+        best, best_distance = None, self.max_distance + 1
+        for other, (other_value, other_published) in self._candidates(published):
+            if other == link:
+                continue
+            if published is not None and other_published is not None and abs(published - other_published) > self.window:
+                continue
+            distance = (value ^ other_value).bit_count()
+            if distance < best_distance:
+                best, best_distance = other, distance
+        return best
+
+    def _prune(self):
+        self._pruned_at = time.time()
+        cutoff = self._pruned_at - KEEP_DAYS * 86400
+        stale = {link for link, seen in self._seen.items() if seen < cutoff}
+        if not stale:
+            return
+        for link in stale:
+            del self._seen[link]
+            self._drop_print(link)
+        self._by_key = {key: link for key, link in self._by_key.items() if link not in stale}
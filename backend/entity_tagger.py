@@ -0,0 +1,171 @@
+import json
+import os
+import re
+import threading
+from collections import deque
+
+STOCKS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stocks.json")
+
+def _is_word_char(c):
+    # Same notion of a word character as \b in the `re` module
+    return c.isalnum() or c == "_"
+
+def stock_keywords(stock):
+    """
+    Keywords that identify a stock in a headline, lowercased.
+    Same rules the /news watchlist filter has always used:
+      - the symbol itself
+      - the company name, if at least 3 chars
+      - aliases that are at least 3 chars OR contain a digit (e.g. "3m", "20m")
+    """
+    keywords = set()
+    symbol = str(stock.get("symbol") or "").lower()
+    if symbol:
+        keywords.add(symbol)
+    if stock.get("name"):
+        name_clean = stock["name"].lower()
+        if len(name_clean) >= 3:
+            keywords.add(name_clean)
+    for alias in stock.get("aliases") or []:
+        alias_clean = alias.lower().strip()
+        if len(alias_clean) >= 3 or any(c.isdigit() for c in alias_clean):
+            keywords.add(alias_clean)
+    return keywords
+
+class EntityTagger:
+    """
+    Aho-Corasick automaton over every stock name, alias and symbol.
+
+    One pass over a headline finds every keyword occurrence; an occurrence
+    only counts if it sits on word boundaries, matching the old
+    \\b(kw1|kw2|...)\\b regex. Returns the set of symbols mentioned.
+    """
+
+    def __init__(self, stocks):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+        self.keywords = []     # keyword id -> (length, symbols)
+        self.symbols = set()   # lowercase symbols known to the tagger
+
+        kw_symbols = {}
+        for stock in stocks:
+            symbol = stock.get("symbol")
+            if not symbol:
+                continue
+            self.symbols.add(symbol.lower())
+            for kw in stock_keywords(stock):
+                kw_symbols.setdefault(kw, set()).add(symbol)
+
+        for kw, symbols in kw_symbols.items():
+            self._insert(kw, len(self.keywords))
+            self.keywords.append((len(kw), frozenset(symbols)))
+        self._build()
+
+    def _insert(self, kw, kw_id):
+        state = 0
+        for c in kw:
+            nxt = self.goto[state].get(c)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][c] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            state = nxt
+        self.out[state] = self.out[state] + (kw_id,)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(c, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                # Outputs of the longest proper suffix are reachable from here too
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def tag(self, text):
+        """Returns the symbols whose keywords appear in `text` on word boundaries."""
+        text = str(text or "").lower()
+        found = set()
+        goto, fail, out, keywords = self.goto, self.fail, self.out, self.keywords
+        n = len(text)
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(c, 0)
+            for kw_id in out[state]:
+                length, symbols = keywords[kw_id]
+                if symbols <= found:
+                    continue
+                start = i - length + 1
+                # \b at the start: the char before differs in "wordness" from the first char
+                if start > 0 and _is_word_char(text[start - 1]) == _is_word_char(text[start]):
+                    continue
+                # \b at the end
+                if i + 1 < n and _is_word_char(text[i]) == _is_word_char(text[i + 1]):
+                    continue
+                if start == 0 and not _is_word_char(text[0]):
+                    continue
+                if i + 1 == n and not _is_word_char(text[i]):
+                    continue
+                found.update(symbols)
+        return found
+
+def load_stocks(path=STOCKS_FILE):
+    """Reads stocks.json (list or {"companies": {...}} format)."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Entity tagger: could not read {path}: {e}")
+        return []
+    if isinstance(data, dict) and "companies" in data:
+        data = list(data["companies"].values())
+    if not isinstance(data, list):
+        return []
+    return [s for s in data if isinstance(s, dict) and "name" in s and "symbol" in s]
+
+_tagger = None
+_tagger_lock = threading.Lock()
+
+def get_tagger():
+    """Builds the automaton from stocks.json on first use."""
+    global _tagger
+    if _tagger is None:
+        with _tagger_lock:
+            if _tagger is None:
+                stocks = load_stocks()
+                _tagger = EntityTagger(stocks)
+                print(f"Entity tagger built for {len(_tagger.symbols)} stocks ({len(_tagger.keywords)} keywords).")
+    return _tagger
+
+def tag_article(item):
+    """Tags an article in place with the symbols its headline mentions."""
+    item["symbols"] = sorted(get_tagger().tag(item.get("headline")))
+    return item
+
+def symbol_matcher(symbols):
+    """
+    Predicate for "article mentions one of `symbols`" (lowercase), the same
+    rule the /news watchlist filter applies: scrape-time tags, plus a literal
+    headline match for symbols the tagger doesn't know.
+    """
+    requested = set(symbols)
+    unknown = requested - get_tagger().symbols
+    unknown_regex = None
+    if unknown:
+        pattern_str = r'\b(' + '|'.join(re.escape(k) for k in sorted(unknown, key=len, reverse=True)) + r')\b'
+        unknown_regex = re.compile(pattern_str, re.IGNORECASE)
+
+    def matches(item):
+        if requested & {s.lower() for s in item.get("symbols") or ()}:
+            return True
+        return bool(unknown_regex and unknown_regex.search(str(item.get("headline") or "")))
+    return matches
@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func
+
+from database import SessionLocal, ArchivedPage, BASE_DIR
+
+ARCHIVE_DIR = os.getenv("HTML_ARCHIVE_DIR", os.path.join(BASE_DIR, "html_archive"))
+ARCHIVE_MAX_MB = float(os.getenv("HTML_ARCHIVE_MAX_MB", "512"))
+# Set HTML_ARCHIVE=0 to stop archiving fetched pages
+ARCHIVE_ENABLED = os.getenv("HTML_ARCHIVE", "1") != "0"
+# Eviction trims the archive to this fraction of the cap, so it doesn't run on every put
+EVICT_TO = 0.9
+COMPRESS_LEVEL = 6
+
+class HtmlArchive:
+    """
+    Raw article HTML, gzip-compressed and content-addressed: each distinct
+    page body is stored once under its sha256, and every fetch is a row in
+    html_archive (url, fetched_at, digest). When the blobs outgrow the size
+    cap the oldest fetches are dropped, along with blobs nothing points at.
+
+    put() is safe to call from several threads; reading only needs the
+    directory (see read()), so worker processes can share an archive.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR, max_bytes=int(ARCHIVE_MAX_MB * 1024 * 1024), session_factory=SessionLocal):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._total = None  # bytes of blobs on disk, loaded on first put
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest + ".html.gz")
+
+    def read(self, digest):
+        """HTML of a stored blob."""
+        with open(self.path(digest), "rb") as f:
+            return gzip.decompress(f.read()).decode("utf-8")
+
+    def put(self, url, html, fetched_at=None):
+        """Archives one fetch of url. Returns the blob digest."""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        blob = None if os.path.exists(path) else gzip.compress(data, COMPRESS_LEVEL)
+
+        db = self.session_factory()
+        try:
+            with self._lock:
+                if self._total is None:
+                    self._total = self._stored_bytes(db)
+                written = not os.path.exists(path)
+                if written:
+                    if blob is None:  # evicted since we looked
+                        blob = gzip.compress(data, COMPRESS_LEVEL)
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    tmp = f"{path}.{threading.get_ident()}.tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(blob)
+                    os.replace(tmp, path)
+                    self._total += len(blob)
+                db.add(ArchivedPage(
+                    url=url,
+                    fetched_at=fetched_at or datetime.now(),
+                    digest=digest,
+                    size=len(data),
+                    stored_size=len(blob) if written else os.path.getsize(path)
+                ))
+                db.commit()
+                if self._total > self.max_bytes:
+                    self._evict(db)
+        finally:
+            db.close()
+        return digest
+
+    def latest(self, since=None, limit=None):
+        """[(url, fetched_at, digest)] for the newest fetch of each URL, newest first."""
+        db = self.session_factory()
+        try:
+            newest = db.query(ArchivedPage.url, func.max(ArchivedPage.fetched_at).label("fetched_at")).group_by(ArchivedPage.url)
+            if since is not None:
+                newest = newest.filter(ArchivedPage.fetched_at >= since)
+            newest = newest.subquery()
+            query = (
+                db.query(ArchivedPage.url, ArchivedPage.fetched_at, ArchivedPage.digest)
+                .join(newest, (ArchivedPage.url == newest.c.url) & (ArchivedPage.fetched_at == newest.c.fetched_at))
+                .order_by(ArchivedPage.fetched_at.desc(), ArchivedPage.id.desc())
+            )
+            rows, seen = [], set()
+            for url, fetched_at, digest in query:
+                if url not in seen:  # two fetches in the same instant
+                    seen.add(url)
+                    rows.append((url, fetched_at, digest))
+                    if limit and len(rows) >= limit:
+                        break
+            return rows
+        finally:
+            db.close()
+
+    def stats(self):
+        db = self.session_factory()
+        try:
+            fetches, urls, raw = db.query(
+                func.count(ArchivedPage.id), func.count(func.distinct(ArchivedPage.url)), func.sum(ArchivedPage.size)
+            ).one()
+            blobs = db.query(func.count(func.distinct(ArchivedPage.digest))).scalar()
+            return {"fetches": fetches, "urls": urls, "blobs": blobs,
+                    "fetched_bytes": raw or 0, "stored_bytes": self._stored_bytes(db), "max_bytes": self.max_bytes}
+        finally:
+            db.close()
+
+    def _stored_bytes(self, db):
+        per_blob = db.query(func.max(ArchivedPage.stored_size).label("size")).group_by(ArchivedPage.digest).subquery()
+        return db.query(func.coalesce(func.sum(per_blob.c.size), 0)).scalar()
+
+    def _evict(self, db):
+        # Called with the lock held. Oldest fetches go first; a blob goes with its last fetch.
+        rows = db.query(ArchivedPage.id, ArchivedPage.digest, ArchivedPage.stored_size) \
+                 .order_by(ArchivedPage.fetched_at, ArchivedPage.id).all()
+        refs = Counter(digest for _, digest, _ in rows)
+        target = self.max_bytes * EVICT_TO
+        dropped, blobs = [], 0
+        for row_id, digest, stored_size in rows:
+            if self._total <= target:
+                break
+            dropped.append(row_id)
+            refs[digest] -= 1
+            if refs[digest] == 0:
+                try:
+                    os.remove(self.path(digest))
+                except FileNotFoundError:
+                    pass
+                self._total -= stored_size or 0
+                blobs += 1
+        for start in range(0, len(dropped), 500):
+            db.query(ArchivedPage).filter(ArchivedPage.id.in_(dropped[start:start + 500])).delete(synchronize_session=False)
+        db.commit()
+        print(f"HTML archive: evicted {len(dropped)} fetches ({blobs} pages), {self._total / 1024 / 1024:.1f} MB kept.")
+
+ARCHIVE = HtmlArchive()
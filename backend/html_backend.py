@@ -0,0 +1,165 @@
+import os
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+# "lxml" (C parser, default when installed) or "bs4" (BeautifulSoup + html.parser)
+PARSER_BACKEND = os.getenv("HTML_PARSER", "lxml" if HAS_LXML else "bs4").lower()
+if PARSER_BACKEND == "lxml" and not HAS_LXML:
+    print("HTML_PARSER=lxml but lxml is not installed, using bs4.")
+    PARSER_BACKEND = "bs4"
+
+# Only the first this many listing entries are used
+LISTING_LIMIT = 24
+
+_CLEARFIX_LI = "//li[contains(concat(' ', normalize-space(@class), ' '), ' clearfix ')]"
+_LD_JSON = '//script[@type="application/ld+json"]'
+
+def _stripped_text(strings):
+    # Same as BeautifulSoup's get_text(strip=True)
+    return "".join(s.strip() for s in strings if s.strip())
+
+def _strings(element, skip=()):
+    # Text nodes in document order, like bs4's .strings: no comments, `skip` subtrees left out
+    # but their tails kept
+    if element.text:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in skip:
+            yield from _strings(child, skip)
+        if child.tail:
+            yield child.tail
+
+def _iter_outside(element, tag, skip):
+    # Descendants named `tag` that are not inside a `skip` subtree
+    for child in element:
+        if not isinstance(child.tag, str) or child.tag in skip:
+            continue
+        if child.tag == tag:
+            yield child
+        yield from _iter_outside(child, tag, skip)
+
+def _lxml_tree(html):
+    try:
+        return lxml.html.document_fromstring(html)
+    except (ValueError, lxml.etree.ParserError):
+        # e.g. a str with an XML encoding declaration, or an empty page
+        return None
+
+def listing_entries(html, backend=None):
+    """
+    Raw entries of a category listing: (headline, href, span_text) for the
+    first li.clearfix items, None where a tag is missing. Only the li.clearfix
+    subtrees are looked at.
+    """
+    if (backend or PARSER_BACKEND) == "lxml":
+        tree = _lxml_tree(html)
+        if tree is not None:
+            entries = []
+            for li in tree.xpath(_CLEARFIX_LI)[:LISTING_LIMIT]:
+                h2 = li.find(".//h2")
+                a = li.find(".//a")
+                span = li.find(".//span")
+                entries.append((
+                    h2.text_content() if h2 is not None else None,
+                    a.get("href") if a is not None else None,
+                    _stripped_text(_strings(span)) if span is not None else None,
+                ))
+            return entries
+
+    soup = BeautifulSoup(html, "html.parser")
+    entries = []
+    for li in soup.find_all("li", class_="clearfix")[:LISTING_LIMIT]:
+        h2 = li.find("h2")
+        a = li.find("a")
+        span = li.find("span")
+        entries.append((
+            h2.text if h2 else None,
+            a.get("href") if a else None,
+            span.get_text(strip=True) if span else None,
+        ))
+    return entries
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Body containers, most specific first; tags whose text never counts as body
+_CONTAINERS = [f"//div[{_has_class('content_wrapper')}]", f"//div[{_has_class('arti-flow')}]", '//div[@id="article-main"]']
+_NOISE_TAGS = ["script", "style", "aside"]
+
+class ArticlePage:
+    """
+    The parts of an article page the extractor reads: JSON-LD script texts,
+    <meta> attributes, and the fallbacks (publish-time element, paragraphs
+    of the body container). The lxml backend answers these with targeted
+    lookups; the bs4 backend with a BeautifulSoup tree.
+    """
+
+    def __init__(self, html, backend=None):
+        self.html = html
+        self.tree = _lxml_tree(html) if (backend or PARSER_BACKEND) == "lxml" else None
+        self._soup = None
+        if self.tree is not None:
+            self.ld_json = [script.text for script in self.tree.xpath(_LD_JSON) if script.text]
+            self.metas = [dict(meta.attrib) for meta in self.tree.iter("meta")]
+        else:
+            soup = self.soup
+            self.ld_json = [script.string for script in soup.find_all("script", type="application/ld+json") if script.string]
+            self.metas = [dict(meta.attrs) for meta in soup.find_all("meta")]
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.html, "html.parser")
+        return self._soup
+
+    def meta(self, **attrs):
+        """content of the first <meta> matching attrs, like soup.find("meta", ...)["content"]."""
+        for meta in self.metas:
+            if all(meta.get(key) == value for key, value in attrs.items()):
+                return meta.get("content") or None
+        return None
+
+    def time_text(self):
+        """Text of span.article_schedule, else the first <time>'s datetime or text, else None."""
+        if self.tree is not None:
+            span = self.tree.xpath(f"//span[{_has_class('article_schedule')}]")
+            if span:
+                return _stripped_text(_strings(span[0]))
+            time_elem = self.tree.find(".//time")
+            if time_elem is not None:
+                return time_elem.get("datetime") or _stripped_text(_strings(time_elem))
+            return None
+
+        span = self.soup.find("span", class_="article_schedule")
+        if span:
+            return span.get_text(strip=True)
+        time_elem = self.soup.find("time")
+        if time_elem:
+            return time_elem.get("datetime") or time_elem.get_text(strip=True)
+        return None
+
+    def paragraphs(self):
+        """
+        Stripped text of every <p> in the body container, ignoring scripts,
+        styles and asides; None when the page has no container.
+        """
+        if self.tree is not None:
+            container = next((found[0] for found in map(self.tree.xpath, _CONTAINERS) if found), None)
+            if container is None:
+                return None
+            return [_stripped_text(_strings(p, _NOISE_TAGS)) for p in _iter_outside(container, "p", _NOISE_TAGS)]
+
+        soup = self.soup
+        container = soup.find("div", class_="content_wrapper") or \
+                    soup.find("div", class_="arti-flow") or \
+                    soup.find("div", id="article-main")
+        if not container:
+            return None
+        for tag in container(_NOISE_TAGS):
+            tag.decompose()
+        return [p.get_text(strip=True) for p in container.find_all("p")]
@@ -0,0 +1,95 @@
+import concurrent.futures
+import os
+import socket
+import time
+from datetime import datetime
+
+from database import SessionLocal, claim_job, finish_job
+from market_data import get_market_data, get_stock_details, market_open, requested_quotes
+from scrape_scheduler import TICK_SECONDS
+from scraper import scheduled_scrape
+
+# Identifies this process in job_status.owner
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+# A run still marked running after this long is taken to belong to a dead process
+SCRAPE_MAX_RUNTIME = 30 * 60
+NOTIFY_MAX_RUNTIME = 10 * 60
+PREFETCH_MAX_RUNTIME = 2 * 60
+
+NOTIFY_INTERVAL_SECONDS = 60
+PREFETCH_WORKERS = 8
+
+def run_job(name, fn, interval, max_runtime):
+    """
+    Runs fn() as job `name` unless a run is in progress in any process or
+    one already started within this interval (see claim_job), then records
+    how long it took and whether it failed. Returns True if it ran.
+    """
+    db = SessionLocal()
+    try:
+        if not claim_job(db, name, OWNER, interval * 0.5, max_runtime):
+            return False
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    error = None
+    try:
+        fn()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        print(f"Job {name} failed: {error}")
+    duration = time.perf_counter() - start
+
+    db = SessionLocal()
+    try:
+        finish_job(db, name, OWNER, duration, error)
+    finally:
+        db.close()
+    print(f"Job {name}: {'failed' if error else 'done'} in {duration:.1f}s.")
+    return True
+
+# Quotes readers keep reading are refreshed when this old, so the next request finds one cached.
+# Requests still fetch on demand after their TTL; this only fills in when they pause
+PREFETCH_INTERVAL_SECONDS = 30
+# Only quotes some reader asked for this recently are prefetched
+PREFETCH_DEMAND_SECONDS = 10 * 60
+
+def prefetch_market_data():
+    """
+    Refreshes the quotes readers asked for in the last PREFETCH_DEMAND_SECONDS
+    (market overview, stock details), during market hours only: nobody
+    asking, or prices not moving, means no upstream calls.
+    """
+    if not market_open():
+        return
+    market, symbols = requested_quotes(time.time() - PREFETCH_DEMAND_SECONDS)
+    if market:
+        get_market_data(max_age=PREFETCH_INTERVAL_SECONDS, prefetch=True)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=PREFETCH_WORKERS) as executor:
+        list(executor.map(lambda symbol: get_stock_details(symbol, max_age=PREFETCH_INTERVAL_SECONDS, prefetch=True), symbols))
+
+def schedule_jobs(scheduler, notification_manager, prefetch=False, start_now=False):
+    """
+    Adds the background jobs to an APScheduler scheduler: the scrape tick
+    (scraping, sentiment scoring and embeddings all run in its pipeline),
+    watchlist notifications and, with prefetch, the quote cache refresh.
+    max_instances/coalesce stop overlaps within this process, job_status
+    across processes.
+    """
+    # Without an explicit next_run_time the first run is one interval after start
+    first_run = {"next_run_time": datetime.now()} if start_now else {}
+    scheduler.add_job(
+        run_job, 'interval', args=("scrape", scheduled_scrape, TICK_SECONDS, SCRAPE_MAX_RUNTIME),
+        seconds=TICK_SECONDS, max_instances=1, coalesce=True, **first_run,
+    )
+    scheduler.add_job(
+        run_job, 'interval', args=("notifications", notification_manager.check_and_notify, NOTIFY_INTERVAL_SECONDS, NOTIFY_MAX_RUNTIME),
+        seconds=NOTIFY_INTERVAL_SECONDS, max_instances=1, coalesce=True,
+    )
+    if prefetch:
+        scheduler.add_job(
+            run_job, 'interval', args=("market_prefetch", prefetch_market_data, PREFETCH_INTERVAL_SECONDS, PREFETCH_MAX_RUNTIME),
+            seconds=PREFETCH_INTERVAL_SECONDS, max_instances=1, coalesce=True, **first_run,
+        )
@@ -1,20 +1,36 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
+import math
+import time
 import uvicorn
 import os
 import json
+import html
+import re
 import logging
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
+from sqlalchemy import func, text, or_, and_
+from sqlalchemy.orm import Session, aliased, defer
 
 # Import our modules
-from scraper import get_latest_news
+from scraper import get_news_index, get_news_generation, search_news, refresh_if_stale, current_news_index, add_publish_listener, use_scheduled_refresh, pipeline_stats, warm_news, flush_snapshot, sync_shared_news, use_worker_process
+from scrape_scheduler import publish_rate
+from jobs import schedule_jobs
+from timestamps import to_db, from_db
+from news_index import LIST_FIELDS, parse_fields, project, encode_cursor, decode_cursor
+from entity_tagger import get_tagger, symbol_matcher
+from response_cache import ResponseCache, etag_matches
+from news_stream import NewsBroadcaster, Subscriber, HEARTBEAT_SECONDS, RETRY_MS
+from view_counter import ViewCounter, FLUSH_INTERVAL_SECONDS
+from trending import TrendingEngine, TRENDING_MIN_SCORE, HORIZON_SECONDS
 from sentiment import init_model as init_sentiment
 from market_data import get_market_data, get_stock_details, get_stock_history, get_stock_financials
 from chatbot import get_chat_response, init_gemini
-from database import init_db, get_db, User, WatchlistItem, NewsAnalytics, hash_password, verify_password
+from database import init_db, get_db, SessionLocal, User, WatchlistItem, NewsAnalytics, NewsItem, NewsItemSymbol, JobStatus, hash_password, verify_password, to_fts_query, to_fts_title_query, title_mentions, get_listing_states, get_view_log
 
 # Scheduler & Notifications
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -24,16 +40,55 @@ from notification_manager import NotificationManager
 scheduler = BackgroundScheduler()
 notification_manager = None
 
-def run_notification_job():
-    print("Executing scheduled notification job...")
-    if notification_manager:
-        notification_manager.check_and_notify()
-
 # Load env vars
 load_dotenv()
 
 app = FastAPI(title="MarketPulse AI Backend")
 
+# Where /news reads from:
+#   "memory" - the in-process index built from the scraped dataset (default)
+#   "sql"    - indexed queries over the news_items table
+NEWS_BACKEND = os.getenv("NEWS_BACKEND", "memory").lower()
+
+# API_ONLY=1: this process only serves requests. Scraping, notifications and market
+# prefetch run in worker.py; new datasets arrive through the shared snapshot
+API_ONLY = os.getenv("API_ONLY", "0") == "1"
+# How often a process checks the shared snapshot for a dataset another process published
+SYNC_INTERVAL_SECONDS = 5
+
+# Time-decayed popularity behind sort=trending and filter_type=trending
+TRENDING = TrendingEngine()
+add_publish_listener(TRENDING.publish)
+
+def sync_views(full=False):
+    """
+    Replays the views every process has flushed since the last call into
+    TRENDING, with current totals for the articles they were for (all
+    totals with full). Counts and scores come only from the shared tables,
+    so every worker serves the same ones.
+    """
+    db = SessionLocal()
+    try:
+        since = datetime.utcnow() - timedelta(seconds=HORIZON_SECONDS)
+        entries = get_view_log(db, TRENDING.last_view_id, since)
+        totals = db.query(NewsAnalytics.news_link, NewsAnalytics.views)
+        if not full:
+            links = {link for _, link, _, _ in entries}
+            totals = totals.filter(NewsAnalytics.news_link.in_(links)) if links else []
+        totals = dict(totals)
+    finally:
+        db.close()
+    TRENDING.apply_views([(entry_id, link, views, from_db(viewed_at)) for entry_id, link, views, viewed_at in entries], totals)
+
+# Views are buffered in memory and written to news_analytics in batches; each flush
+# is replayed into TRENDING straight away, whether the interval job or a click ran it
+VIEW_COUNTER = ViewCounter(SessionLocal, on_flush=sync_views)
+
+def flush_views():
+    if not VIEW_COUNTER.flush():
+        # Nothing of ours to write: still pick up the views other processes flushed
+        sync_views()
+
 # CORS setup
 app.add_middleware(
     CORSMiddleware,
@@ -120,27 +175,46 @@ async def load_models_background():
 async def startup_event():
     print("Server starting specific tasks...")
     init_db()
+
+    # Totals, and the views of the last HORIZON_SECONDS for the scores; then kept in step by flush_views
+    sync_views(full=True)
     
     # Initialize Notification Manager
     global notification_manager
-    from database import SessionLocal
     notification_manager = NotificationManager(SessionLocal)
     
     # Start Scheduler
     try:
         if not scheduler.running:
-            scheduler.add_job(run_notification_job, 'interval', minutes=1)
+            scheduler.add_job(flush_views, 'interval', seconds=FLUSH_INTERVAL_SECONDS, max_instances=1, coalesce=True)
+            # Live stream and trending see other processes' scrapes without waiting for a read
+            scheduler.add_job(sync_shared_news, 'interval', seconds=SYNC_INTERVAL_SECONDS, max_instances=1, coalesce=True)
+            if API_ONLY:
+                use_worker_process()
+                print("API-only mode: background jobs run in worker.py.")
+            else:
+                # Per-category adaptive polling replaces the refresh-on-read of stale data
+                schedule_jobs(scheduler, notification_manager)
+                use_scheduled_refresh()
+                print("Background jobs scheduled in this process (scrape, 1 min notifications).")
             scheduler.start()
-            print("Notification scheduler started (1 min interval).")
     except Exception as e:
         print(f"Error starting scheduler: {e}")
 
+    # The snapshot (or JSON store) is loaded before traffic, and news_items is
+    # backfilled from it, so either NEWS_BACKEND serves the first /news
+    await asyncio.to_thread(warm_news)
+
     # Offload heavy lifting to background thread
     asyncio.create_task(load_models_background())
     print("Server startup sequence complete (Models loading in background).")
 
 @app.on_event("shutdown")
 def shutdown_event():
+    flush_snapshot()
+    flushed = VIEW_COUNTER.flush()
+    if flushed:
+        print(f"Flushed {flushed} pending views.")
     if scheduler.running:
         scheduler.shutdown()
         print("Scheduler shut down.")
@@ -149,162 +223,498 @@ def shutdown_event():
 def read_root():
     return {"message": "Welcome to MarketPulse AI API"}
 
-def get_paginated_news(db: Session, page: int, limit: int):
-    offset = (page - 1) * limit
-    total_count = db.query(NewsItem).count()
-    news_items = db.query(NewsItem).order_by(NewsItem.timestamp.desc()).offset(offset).limit(limit).all()
-    
+def news_item_to_dict(news_item, views):
+    """Shapes a NewsItem row like the scraped article dicts served by /news (render it with project)."""
     return {
-        "items": news_items,
+        "id": news_item.article_id,
+        "category": news_item.category,
+        "headline": news_item.title,
+        "description": news_item.description,
+        "link": news_item.link,
+        "image_url": news_item.image_url,
+        "published_at": int(from_db(news_item.timestamp)) if news_item.timestamp else None,
+        "sentiment": news_item.sentiment,
+        "sentiment_score": news_item.sentiment_score,
+        "full_content": news_item.full_content,
+        # Persisted count plus this process's pending views (VIEW_COUNTER.generation)
+        "views": (views or 0) + VIEW_COUNTER.pending(news_item.link),
+    }
+
+def page_count(total, limit):
+    """Pages for `total` results: at least 1, so an empty result still has a page, on every endpoint."""
+    return max(1, math.ceil(total / limit)) if limit > 0 else 1
+
+def get_paginated_news(db: Session, page: int, limit: int, q: str = None, categories=None,
+                       symbols=None, since: float = None, trending: bool = False, fields=LIST_FIELDS,
+                       cursor_key=None, ranked=False):
+    """
+    /news as an indexed SQL query over news_items.
+    Views come from a join on news_analytics instead of loading the whole table.
+    With `cursor_key` = (epoch, link) the page is a keyset seek on
+    (timestamp, link) instead of an OFFSET scan. `ranked` orders by the
+    in-memory trending score instead of time.
+    """
+    matched = None
+    if q and q.strip():
+        match = to_fts_query(q)
+        if not match:
+            return {"items": [], "total": 0, "page": page, "pages": 1}
+        matched = text("SELECT rowid FROM news_fts WHERE news_fts MATCH :match").bindparams(match=match)
+    tagged = mentioned = None
+    if symbols:
+        tagged = db.query(NewsItemSymbol.news_id).filter(NewsItemSymbol.symbol.in_(symbols))
+        # Symbols the tagger doesn't know (not in stocks.json) can still match the headline literally,
+        # as in query_news_index: FTS finds the candidates, title_mentions drops stemmed matches
+        unknown = [symbol for symbol in symbols if symbol not in get_tagger().symbols]
+        literal = to_fts_title_query(unknown)
+        if literal:
+            mentioned = text("SELECT rowid FROM news_fts WHERE news_fts MATCH :literal").bindparams(literal=literal)
+    hot = TRENDING.top(min_score=TRENDING_MIN_SCORE) if trending else None
+
+    def filters(row):
+        """The request's filters, on news_items or an alias of it."""
+        clauses = []
+        if categories:
+            # categories are lowercased; matches the lower(category) index
+            clauses.append(func.lower(row.category).in_(categories))
+        if since is not None:
+            clauses.append(row.timestamp > to_db(since))
+        if tagged is not None:
+            if mentioned is not None:
+                clauses.append(or_(row.id.in_(tagged), and_(row.id.in_(mentioned), title_mentions(row.title, unknown))))
+            else:
+                clauses.append(row.id.in_(tagged))
+        if matched is not None:
+            clauses.append(row.id.in_(matched))
+        if hot is not None:
+            clauses.append(row.link.in_(hot))
+        return clauses
+
+    # A copy of a story is collapsed into its canonical article only when that one is listed
+    # too, as the memory index does per category: otherwise the copy stands in for it
+    canonical = aliased(NewsItem)
+    listed_canonical = db.query(canonical.id).filter(canonical.link == NewsItem.duplicate_of, *filters(canonical)).exists()
+
+    views = func.coalesce(NewsAnalytics.views, 0)
+    query = db.query(NewsItem, views.label("views")).outerjoin(
+        NewsAnalytics, NewsAnalytics.news_link == NewsItem.link
+    ).filter(*filters(NewsItem)).filter(or_(NewsItem.duplicate_of.is_(None), ~listed_canonical))
+    if fields is not None and "full_content" not in fields:
+        # Article bodies are several KB each; don't even read them for list views
+        query = query.options(defer(NewsItem.full_content))
+
+    total_count = query.count()
+
+    if ranked:
+        # Rank the matching links in memory, then load just the page: score desc, then
+        # published_at desc, undated last (the sort is stable over the time-ordered rows)
+        links = TRENDING.sort([link for (link,) in query.with_entities(NewsItem.link).order_by(
+            NewsItem.timestamp.desc(), NewsItem.link.desc())], link=lambda link: link)
+        page_links = links[(page - 1) * limit : page * limit]
+        by_link = {news_item.link: (news_item, item_views) for news_item, item_views in query.filter(NewsItem.link.in_(page_links))}
+        return {
+            "items": [project(news_item_to_dict(*by_link[link]), fields) for link in page_links if link in by_link],
+            "total": total_count,
+            "page": page,
+            "pages": page_count(total_count, limit),
+            "next_cursor": None
+        }
+
+    if cursor_key is not None:
+        epoch, link = cursor_key
+        if epoch == float("-inf"):
+            # Already in the undated tail (NULL sorts last in DESC order)
+            query = query.filter(NewsItem.timestamp.is_(None), NewsItem.link < link)
+        else:
+            cursor_dt = to_db(epoch)
+            query = query.filter(or_(
+                NewsItem.timestamp < cursor_dt,
+                and_(NewsItem.timestamp == cursor_dt, NewsItem.link < link),
+                NewsItem.timestamp.is_(None),
+            ))
+
+    query = query.order_by(NewsItem.timestamp.desc(), NewsItem.link.desc())
+    if cursor_key is None:
+        query = query.offset((page - 1) * limit)
+
+    # One extra row tells us whether there is a next page
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1][0]
+        next_cursor = encode_cursor(from_db(last.timestamp) if last.timestamp else float("-inf"), last.link)
+
+    return {
+        "items": [project(news_item_to_dict(news_item, item_views), fields) for news_item, item_views in rows],
         "total": total_count,
         "page": page,
-        "pages": (total_count + limit - 1) // limit
+        "pages": page_count(total_count, limit),
+        "next_cursor": next_cursor
     }
 
+# Matches the previous `(now - ts).days <= 7` check, which admits anything under 8 days old
+WEEK_WINDOW_SECONDS = 8 * 24 * 3600
+
+# Serialized /news responses for the current dataset generation
+NEWS_RESPONSE_CACHE = ResponseCache(maxsize=256)
+
+def week_cutoff():
+    # Rounded to the minute so polls within the same minute share a cache entry
+    return (int(time.time()) // 60) * 60 - WEEK_WINDOW_SECONDS
+
+def serialize_response(content):
+    # Same encoding FastAPI's JSONResponse uses
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+def cached_json_response(request: Request, entry):
+    body, etag = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.get("/news")
 def read_news(
+    request: Request,
     page: int = 1, 
     limit: int = 24, 
     q: str = None, 
     categories: str = None, 
     stocks: str = None,
     filter_type: str = None,
+    sort: str = None,
+    fields: str = None,
+    cursor: str = None,
     db: Session = Depends(get_db)
 ):
+    """
+    Paginated news feed. Items use the compact LIST_FIELDS schema by default;
+    pass fields=a,b,c to pick fields or fields=all for whole articles.
+    Full bodies are available per article from /news/{id}.
+
+    Pagination is by page/limit, or by keyset: pass the `next_cursor` of the
+    previous response as `cursor` to get the items right after it, which
+    stays stable while new articles are published (not for sort=relevance
+    or sort=trending).
+
+    sort=trending ranks by time-decayed views plus recency; filter_type=trending
+    keeps only articles with real recent views, in that order.
+
+    Responses are cached per dataset generation and carry a strong ETag,
+    so repeat polls with If-None-Match get a 304 until something changes.
+    """
+    cursor_key = None
+    if cursor:
+        try:
+            cursor_key = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
 
     try:
-        all_news = get_latest_news() 
-        if not all_news:
-            return {"items": [], "total": 0, "page": page, "pages": 1}
-
-        # 0. Inject Views from Database
-        # Optimization: Only fetch views for links in current dataset (or all if dataset is small enough)
-        # For simplicity with sorting, we need views for ALL items first.
-        try:
-            analytics = db.query(NewsAnalytics).all()
-            views_map = {item.news_link: item.views for item in analytics}
-            
-            # Update all_news with views
-            for item in all_news:
-                item["views"] = views_map.get(item["link"], 0)
-        except Exception as e:
-            print(f"Error merging views: {e}")
-            # Continue without views if DB fails, defaulting to 0
-
-
-        # 1. Apply Filters before sorting/pagination
-        
-        # Category Filter
-        if categories:
-            cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()]
-            if cat_list:
-                all_news = [item for item in all_news if str(item.get("category") or "").lower() in cat_list]
-
-        # Stock/Watchlist Filter (Strict Headline Match)
-        if stocks:
-            import re
-            requested_symbols = {s.strip().lower() for s in stocks.split(",") if s.strip()}
-            if requested_symbols:
-                # Build a set of keywords (Names, Aliases, Symbols) for the requested stocks
-                # Optimization: In a real app, this mapping should be pre-computed.
-                target_keywords = set()
-                
-                # Add the symbols themselves first
-                for s in requested_symbols:
-                    target_keywords.add(s)
-
-                # Look up rich data from NSE_STOCKS global
-                for stock_obj in NSE_STOCKS:
-                    if stock_obj.get('symbol', '').lower() in requested_symbols:
-                        # Add Company Name
-                        if stock_obj.get('name'):
-                            name_clean = stock_obj['name'].lower()
-                            # Filter out very short names if any (unlikely for full names)
-                            if len(name_clean) >= 3:
-                                target_keywords.add(name_clean)
-                        
-                        # Add Aliases (Strict Filtering)
-                        if stock_obj.get('aliases'):
-                            for alias in stock_obj['aliases']:
-                                alias_clean = alias.lower().strip()
-                                # Rule: Must be >= 3 chars OR contain a digit (e.g. "3m", "20m")
-                                if len(alias_clean) >= 3 or any(c.isdigit() for c in alias_clean):
-                                    target_keywords.add(alias_clean)
-                
-                # Strict Filter: Must appear in HEADLINE using WORD BOUNDARIES
-                if target_keywords:
-                    # Create a massive regex OR pattern: \b(term1|term2|term3)\b
-                    # Sort by length descending to match longest phrases first (though regex engine handles this, it's safer)
-                    sorted_keywords = sorted(target_keywords, key=len, reverse=True)
-                    escaped_keywords = [re.escape(k) for k in sorted_keywords]
-                    pattern_str = r'\b(' + '|'.join(escaped_keywords) + r')\b'
-                    
-                    try:
-                        regex = re.compile(pattern_str, re.IGNORECASE)
-                        
-                        final_news = []
-                        for item in all_news:
-                            headline = str(item.get("headline") or "")
-                            if regex.search(headline):
-                                final_news.append(item)
-                        
-                        all_news = final_news
-                    except Exception as e:
-                        print(f"Regex error: {e}")
-                        # Fallback to empty if regex fails
-                        all_news = []
-                else:
-                    all_news = []
-
-        # Global Search
-        if q:
-            query = q.lower().strip()
-            all_news = [
-                item for item in all_news 
-                if query in str(item.get("headline") or "").lower() or 
-                   query in str(item.get("description") or "").lower() or
-                   query in str(item.get("category") or "").lower()
-            ]
+        # Staleness check first: a refresh may publish a new generation
+        news_index = None
+        if NEWS_BACKEND == "sql":
+            refresh_if_stale()
+        else:
+            news_index = get_news_index()
 
-        # Filter Type (Trending, Week, etc.)
-        now = datetime.now()
-        if filter_type == 'trending':
-            all_news = [item for item in all_news if (item.get("views") or 0) > 15]
-        elif filter_type == 'week':
-            all_news = [item for item in all_news if item.get("timestamp") and (now - datetime.strptime(item["timestamp"], "%d %b %Y, %I:%M %p")).days <= 7]
+        since = week_cutoff() if filter_type == 'week' else None
         # ... more time filters can be added here ...
+        # Who clears the trending bar changes as scores decay, even without new views
+        decay_bucket = int(time.time() // 60) if filter_type == 'trending' else None
+
+        # The index carries its own generation, so the key always matches the data it describes
+        news_generation = get_news_generation() if news_index is None else news_index.generation
+        generation = (news_generation, TRENDING.version, VIEW_COUNTER.generation)
+        cache_key = (NEWS_BACKEND, page, limit, q, categories, stocks, filter_type, sort, fields, since, cursor, decay_bucket)
+        entry = NEWS_RESPONSE_CACHE.get(generation, cache_key)
+        if entry is None:
+            if NEWS_BACKEND == "sql":
+                result = read_news_sql(db, page, limit, q, categories, stocks, since, filter_type, sort, fields, cursor_key)
+            else:
+                result = query_news_index(news_index, db, page, limit, q, categories, stocks, since, filter_type, sort, fields, cursor_key)
+            entry = NEWS_RESPONSE_CACHE.put(generation, cache_key, serialize_response(result))
+        return cached_json_response(request, entry)
 
-        # 2. Sorting - CRITICAL: Sort by timestamp descending
-        def get_timestamp(x):
-            ts = x.get("timestamp")
-            if not ts: return datetime.min
-            try:
-                # Handle formatted strings from our JSON
-                return datetime.strptime(ts, "%d %b %Y, %I:%M %p")
-            except:
-                try:
-                    # Fallback for ISO strings if any still exist
-                    return datetime.fromisoformat(ts.replace('Z', '+00:00'))
-                except:
-                    return datetime.min
-
-        all_news.sort(key=get_timestamp, reverse=True)
+    except Exception as e:
+        print(f"Error fetching news: {e}")
+        return {"items": [], "total": 0, "page": 1, "pages": 1}
 
-        # 3. Pagination
-        total_count = len(all_news)
+def query_news_index(news_index, db: Session, page, limit, q, categories, stocks, since, filter_type, sort, fields, cursor_key):
+    if not len(news_index):
+        return {"items": [], "total": 0, "page": page, "pages": 1}
+
+    # Views come from the trending engine's in-memory counts, not a news_analytics scan
+
+    # 1. Apply Filters before pagination
+    # Category and time filters are answered by the index, already sorted newest first
+    cat_list = None
+    if categories:
+        cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()] or None
+
+    # Stock/Watchlist Filter (Strict Headline Match)
+    # Articles are tagged at scrape time with the symbols their headline mentions.
+    requested_symbols = None
+    unknown_regex = None
+    if stocks:
+        requested_symbols = {s.strip().lower() for s in stocks.split(",") if s.strip()} or None
+        # Symbols the tagger doesn't know (not in stocks.json) can still match literally
+        unknown = requested_symbols - get_tagger().symbols if requested_symbols else None
+        if unknown:
+            pattern_str = r'\b(' + '|'.join(re.escape(k) for k in sorted(unknown, key=len, reverse=True)) + r')\b'
+            unknown_regex = re.compile(pattern_str, re.IGNORECASE)
+
+    def mentions_requested(item):
+        if requested_symbols & {s.lower() for s in item.get("symbols") or ()}:
+            return True
+        return bool(unknown_regex and unknown_regex.search(str(item.get("headline") or "")))
+
+    # Global Search: the inverted index yields the matching links, so only hits are filtered further
+    search_hits = None
+    # Prefixes too common to expand fully (see SearchIndex.search)
+    truncated = []
+    ranked = sort == 'trending' or filter_type == 'trending'
+    unfiltered = not (q and q.strip()) and not requested_symbols and cat_list is None and since is None
+    if ranked and unfiltered:
+        # Straight off the trending heap: only the top of the ranking is touched
+        if filter_type == 'trending':
+            links = TRENDING.top(min_score=TRENDING_MIN_SCORE)
+        else:
+            links = TRENDING.top(k=page * limit)
+        all_news = [news_index.by_link[link][2] for link in links if link in news_index.by_link and link not in news_index.hidden]
+        if filter_type != 'trending' and len(all_news) < page * limit:
+            # The page reaches past every scored article; rank the whole dataset
+            all_news = TRENDING.sort(news_index.query())
+        total_override = None if filter_type == 'trending' else len(news_index)
+    elif q and q.strip():
+        search_hits = search_news(q, truncated)
+        all_news = news_index.select(search_hits, categories=cat_list, since=since)
+        if requested_symbols:
+            all_news = [item for item in all_news if mentions_requested(item)]
+    elif requested_symbols:
+        # The watchlist feed is a union of symbol postings merged by time
+        all_news = news_index.query_symbols(requested_symbols, categories=cat_list, since=since)
+        if unknown_regex:
+            seen = {item["link"] for item in all_news}
+            extra = [
+                item for item in news_index.query(categories=cat_list, since=since)
+                if item["link"] not in seen and mentions_requested(item)
+            ]
+            if extra:
+                all_news = news_index.select([item["link"] for item in all_news + extra])
+    else:
+        all_news = news_index.query(categories=cat_list, since=since)
+
+    # 2. Sorting - the index already returns items by timestamp descending
+    by_time = not ranked
+    if ranked and not unfiltered:
+        # Filter Type (Trending): articles with real recent views, hottest first
+        if filter_type == 'trending':
+            hot = set(TRENDING.top(min_score=TRENDING_MIN_SCORE))
+            all_news = [item for item in all_news if item["link"] in hot]
+        all_news = TRENDING.sort(all_news)
+    elif sort == 'relevance' and search_hits is not None:
+        all_news.sort(key=lambda item: search_hits.get(item["link"], 0.0), reverse=True)
+        by_time = False
+
+    # 3. Pagination: keyset (timestamp, link) when a cursor is given, offset otherwise
+    total_count = len(all_news)
+    if ranked and unfiltered and total_override is not None:
+        total_count = total_override
+    if cursor_key is not None and by_time:
+        offset = news_index.start_after(all_news, cursor_key)
+    else:
         offset = (page - 1) * limit
-        paginated_items = all_news[offset : offset + limit]
-        
-        return {
-            "items": paginated_items,
-            "total": total_count,
-            "page": page,
-            "pages": (total_count + limit - 1) // limit if limit > 0 else 1
-        }
+    page_items = all_news[offset : offset + limit]
+
+    next_cursor = None
+    if by_time and page_items and offset + limit < total_count:
+        next_cursor = news_index.cursor_for(page_items[-1])
+
+    selected_fields = parse_fields(fields)
+    paginated_items = []
+    for item in page_items:
+        row = project(item, selected_fields)
+        if selected_fields is None or "views" in selected_fields:
+            # As of the last sync_views plus pending views, so the cached payload changes with
+            # TRENDING.version and VIEW_COUNTER.generation
+            row["views"] = TRENDING.views.get(item["link"], 0) + VIEW_COUNTER.pending(item["link"])
+        paginated_items.append(row)
+    
+    result = {
+        "items": paginated_items,
+        "total": total_count,
+        "page": page,
+        "pages": page_count(total_count, limit),
+        "next_cursor": next_cursor
+    }
+    if truncated:
+        # The search may have missed rare completions of these
+        result["truncated_prefixes"] = [prefix for prefix, _, _ in truncated]
+    return result
+
+def read_news_sql(db: Session, page, limit, q, categories, stocks, since, filter_type, sort, fields, cursor_key):
+    cat_list = [c.strip().lower() for c in categories.split(",") if c.strip()] if categories else None
+    symbols = [s.strip().lower() for s in stocks.split(",") if s.strip()] if stocks else None
+    return get_paginated_news(
+        db, page, limit, q=q, categories=cat_list, symbols=symbols,
+        since=since, trending=(filter_type == 'trending'), fields=parse_fields(fields),
+        cursor_key=cursor_key, ranked=(sort == 'trending' or filter_type == 'trending')
+    )
+
+# bm25 column weights for (title, description, full_content)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+# Private-use characters FTS5 puts around matches; swapped for <mark> once the text is escaped
+MATCH_OPEN, MATCH_CLOSE = "\ue000", "\ue001"
+
+def marked_html(value):
+    """
+    Scraped article text with its FTS matches in <mark> tags, safe to render
+    as HTML: everything else is escaped, and the only tags are ours.
+    """
+    if value is None:
+        return None
+    return html.escape(value).replace(MATCH_OPEN, "<mark>").replace(MATCH_CLOSE, "</mark>")
+
+@app.get("/news/search")
+def search_news_fts(q: str, page: int = 1, limit: int = 24, fields: str = None, db: Session = Depends(get_db)):
+    """
+    Ranked full-text search over stored articles, including their bodies.
+    Backed by the news_fts FTS5 index, so it stays fast as history grows.
+    """
+    match = to_fts_query(q)
+    if not match or page < 1 or limit < 1:
+        return {"items": [], "total": 0, "page": page, "pages": 1}
 
+    try:
+        total_count = db.execute(
+            text("SELECT count(*) FROM news_fts WHERE news_fts MATCH :match"), {"match": match}
+        ).scalar()
+        rows = db.execute(text(f"""
+            SELECT news_fts.rowid AS id, bm25(news_fts, {', '.join(map(str, FTS_WEIGHTS))}) AS rank,
+                   highlight(news_fts, 0, :open, :close) AS headline_highlight,
+                   snippet(news_fts, -1, :open, :close, '…', 32) AS snippet
+            FROM news_fts
+            WHERE news_fts MATCH :match
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """), {"match": match, "limit": limit, "offset": (page - 1) * limit,
+               "open": MATCH_OPEN, "close": MATCH_CLOSE}).all()
     except Exception as e:
-        print(f"Error fetching news: {e}")
-        return {"items": [], "total": 0, "page": 1, "pages": 1}
+        print(f"Error searching news: {e}")
+        return {"items": [], "total": 0, "page": page, "pages": 1}
+
+    selected_fields = parse_fields(fields)
+    ids = [row.id for row in rows]
+    items_by_id = {}
+    if ids:
+        views = func.coalesce(NewsAnalytics.views, 0)
+        query = db.query(NewsItem, views).outerjoin(
+            NewsAnalytics, NewsAnalytics.news_link == NewsItem.link
+        ).filter(NewsItem.id.in_(ids))
+        if selected_fields is not None and "full_content" not in selected_fields:
+            query = query.options(defer(NewsItem.full_content))
+        for news_item, item_views in query:
+            items_by_id[news_item.id] = project(news_item_to_dict(news_item, item_views), selected_fields)
+
+    items = []
+    for row in rows:
+        item = items_by_id.get(row.id)
+        if not item:
+            continue
+        # bm25() is lower-is-better; flip it so higher scores rank higher
+        item["score"] = round(-row.rank, 4)
+        item["headline_highlight"] = marked_html(row.headline_highlight)
+        item["snippet"] = marked_html(row.snippet)
+        items.append(item)
+
+    return {
+        "items": items,
+        "total": total_count,
+        "page": page,
+        "pages": page_count(total_count, limit)
+    }
+
+# One fan-out for every /news/stream client, fed by the scraper on each publish
+NEWS_STREAM = NewsBroadcaster()
+add_publish_listener(NEWS_STREAM.publish)
+
+@app.get("/news/stream")
+async def stream_news(request: Request, categories: str = None, stocks: str = None, cursor: str = None):
+    """
+    Server-Sent Events feed of newly published articles (slim projection).
+    Filters are the same as /news. Every event id is a cursor: pass it as
+    `cursor` (or let the browser send Last-Event-ID) to resume after it.
+    """
+    resume = cursor or request.headers.get("last-event-id")
+    cursor_key = None
+    if resume:
+        try:
+            cursor_key = decode_cursor(resume)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    cat_set = {c.strip().lower() for c in categories.split(",") if c.strip()} if categories else None
+    symbols = {s.strip().lower() for s in stocks.split(",") if s.strip()} if stocks else None
+    subscriber = Subscriber(
+        asyncio.get_running_loop(),
+        categories=cat_set or None,
+        matcher=symbol_matcher(symbols) if symbols else None
+    )
+    # Subscribe before reading the backlog so nothing published in between is lost
+    NEWS_STREAM.subscribe(subscriber)
+    backlog = NEWS_STREAM.backlog(current_news_index(), cursor_key, subscriber) if cursor_key else []
+
+    async def events():
+        try:
+            yield f"retry: {RETRY_MS}\n\n".encode("utf-8")
+            for body in backlog:
+                yield body
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keeps the dataset fresh for streaming-only clients; the
+                    # scrape lock makes this one scrape no matter how many are connected
+                    refresh_if_stale()
+                    yield b": heartbeat\n\n"
+                    continue
+                if event is None:
+                    break
+                link, body = event
+                if link not in subscriber.replayed:
+                    yield body
+        finally:
+            NEWS_STREAM.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/news/{article_id}")
+def read_news_article(article_id: str, db: Session = Depends(get_db)):
+    """Full article, including full_content, for the detail view."""
+    if NEWS_BACKEND == "sql":
+        views = func.coalesce(NewsAnalytics.views, 0)
+        row = db.query(NewsItem, views).outerjoin(
+            NewsAnalytics, NewsAnalytics.news_link == NewsItem.link
+        ).filter(NewsItem.article_id == article_id).first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Article not found")
+        news_item, views = row
+        return project(news_item_to_dict(news_item, views), None)
+
+    item = get_news_index().by_id.get(article_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Article not found")
+    return dict(project(item, None), views=TRENDING.views.get(item["link"], 0) + VIEW_COUNTER.pending(item["link"]))
 
 class ViewRequest(BaseModel):
     link: str
@@ -312,14 +722,10 @@ class ViewRequest(BaseModel):
 @app.post("/news/view")
 def increment_view(request: ViewRequest, db: Session = Depends(get_db)):
     try:
-        item = db.query(NewsAnalytics).filter(NewsAnalytics.news_link == request.link).first()
-        if not item:
-            item = NewsAnalytics(news_link=request.link, views=1)
-            db.add(item)
-        else:
-            item.views += 1
-        db.commit()
-        return {"views": item.views}
+        # Buffered; written by the periodic flush, not on every click
+        VIEW_COUNTER.record(request.link)
+        persisted = db.query(NewsAnalytics.views).filter(NewsAnalytics.news_link == request.link).scalar()
+        return {"views": (persisted or 0) + VIEW_COUNTER.pending(request.link)}
     except Exception as e:
         print(f"Error incrementing view: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -469,5 +875,39 @@ def trigger_notifications_manual():
         return {"message": "Notification check triggered manually."}
     return {"message": "Notification manager not initialized."}
 
+@app.get("/debug/scrape-stats")
+def scrape_stats(db: Session = Depends(get_db)):
+    """
+    Per-category listing change detection (hits: unchanged or 304, misses:
+    re-processed) and adaptive polling: learned publish rate (new articles/hour),
+    current poll interval and next poll.
+    """
+    return {name: dict(state, publish_rate=publish_rate(state)) for name, state in get_listing_states(db).items()}
+
+@app.get("/debug/jobs")
+def job_statuses(db: Session = Depends(get_db)):
+    """Background jobs across all processes: state, owner, last/max/average run time, runs, failures, skipped ticks."""
+    return {
+        job.name: {
+            "state": job.state,
+            "owner": job.owner,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "last_duration": job.last_duration,
+            "max_duration": job.max_duration,
+            "avg_duration": round(job.total_duration / job.runs, 3) if job.runs else None,
+            "runs": job.runs,
+            "failures": job.failures,
+            "skipped": job.skipped,
+            "last_error": job.last_error,
+        }
+        for job in db.query(JobStatus).order_by(JobStatus.name)
+    }
+
+@app.get("/debug/pipeline-stats")
+def scrape_pipeline_stats():
+    """Per-stage workers, queue depth (now and max), items processed and items/second of the current or last scrape."""
+    return pipeline_stats() or {"running": False, "stages": {}}
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,24 +1,52 @@
 import yfinance as yf
-from datetime import datetime
+from datetime import datetime, time as dtime
 import concurrent.futures
+import os
 import time
 from live_scraper import get_live_price
+from shared_state import SharedCache
+from timestamps import IST
 
-# In-memory cache for market data
+# Quotes fetched by any worker process are reused by the others until they expire
+SHARED_CACHE = SharedCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared_cache.db"))
+
+# In-memory cache for market data (this process's copy of the shared entry)
 MARKET_CACHE = None
 LAST_MARKET_FETCH = 0
 MARKET_CACHE_TTL = 10 # 10 seconds cache for overall market data
 
-def get_market_data():
+# NSE/BSE cash session, IST (exchange holidays aren't known here)
+MARKET_OPEN = dtime(9, 15)
+MARKET_CLOSE = dtime(15, 30)
+
+def market_open(now=None):
+    """True during the Indian equity session, when quotes actually move."""
+    local = datetime.fromtimestamp(now or time.time(), IST)
+    return local.weekday() < 5 and MARKET_OPEN <= local.time() <= MARKET_CLOSE
+
+def requested_quotes(since):
+    """(market overview asked for, [stock symbols asked for]) by readers since `since` (epoch)."""
+    keys = SHARED_CACHE.requested_since(since)
+    return "market" in keys, sorted(key.split(":", 1)[1] for key in keys if key.startswith("stock:"))
+
+def get_market_data(max_age=MARKET_CACHE_TTL, prefetch=False):
     """
     Fetches live (delayed) data for Nifty 50, Sensex, and commodities in parallel.
-    Uses in-memory caching for 60 seconds.
+    Cached for MARKET_CACHE_TTL seconds, shared by all worker processes
+    (the prefetch job passes prefetch=True, which isn't counted as a request).
     """
     global MARKET_CACHE, LAST_MARKET_FETCH
-    
-    if MARKET_CACHE and (time.time() - LAST_MARKET_FETCH < MARKET_CACHE_TTL):
+    if not prefetch:
+        SHARED_CACHE.note_request("market")
+
+    if MARKET_CACHE and (time.time() - LAST_MARKET_FETCH < max_age):
         return MARKET_CACHE
 
+    MARKET_CACHE, LAST_MARKET_FETCH = SHARED_CACHE.get_or_fetch("market", max_age, fetch_market_data)
+    return MARKET_CACHE
+
+def fetch_market_data():
+    """One round of upstream requests behind get_market_data."""
     indices_tickers = {
         "Nifty 50": "^NSEI",
         "Sensex": "^BSESN"
@@ -136,27 +164,31 @@ def get_market_data():
         "commodities": commodities_data
     }
     
-    MARKET_CACHE = result
-    LAST_MARKET_FETCH = time.time()
     return result
 
-# Simple in-memory cache: {symbol: {"data": data, "timestamp": timestamp}}
+# Simple in-memory cache: {symbol: {"data": data, "timestamp": epoch}}, in front of the shared one
 STOCK_CACHE = {}
+STOCK_CACHE_TTL = 10 # 10 Seconds Cache
 
-def get_stock_details(symbol):
+def get_stock_details(symbol, max_age=STOCK_CACHE_TTL, prefetch=False):
     """
     Fetches detailed data for a specific stock.
-    Results are cached for 30 seconds to prevent slow repeated fetching.
+    Results are cached for STOCK_CACHE_TTL seconds, shared by all worker processes.
     """
-    try:
-        # Check Cache
-        if symbol in STOCK_CACHE:
-            cached = STOCK_CACHE[symbol]
-            age = (datetime.now() - cached["timestamp"]).total_seconds()
-            if age < 10: # 10 Seconds Cache
-                # print(f"Serving {symbol} from cache")
-                return cached["data"]
+    if not prefetch:
+        SHARED_CACHE.note_request(f"stock:{symbol}")
+    cached = STOCK_CACHE.get(symbol)
+    if cached and time.time() - cached["timestamp"] < max_age:
+        return cached["data"]
+
+    result, fetched_at = SHARED_CACHE.get_or_fetch(f"stock:{symbol}", max_age, lambda: fetch_stock_details(symbol))
+    if result is not None:
+        STOCK_CACHE[symbol] = {"data": result, "timestamp": fetched_at}
+    return result
 
+def fetch_stock_details(symbol):
+    """Upstream fetch behind get_stock_details; None on failure."""
+    try:
         # Append .NS for NSE stocks if not present (heuristic)
         # But let's assume valid symbol is passed or handle generically
         search_symbol = symbol
@@ -217,12 +249,6 @@ def get_stock_details(symbol):
             "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
-        # Update Cache
-        STOCK_CACHE[symbol] = {
-            "data": result,
-            "timestamp": datetime.now()
-        }
-        
         return result
     except Exception as e:
         print(f"Error fetching details for {symbol}: {e}")
@@ -0,0 +1,216 @@
+import base64
+import bisect
+import hashlib
+import heapq
+import json
+from timestamps import format_timestamp, published_at
+
+# Default /news list schema: what the dashboard cards render. Bodies are served by /news/{id}.
+LIST_FIELDS = ("id", "category", "headline", "link", "image_url", "timestamp", "sentiment", "sentiment_score", "views")
+
+def article_id(link):
+    """Stable short id for an article, derived from its link."""
+    return hashlib.sha1(link.encode("utf-8")).hexdigest()[:16]
+
+def parse_fields(fields):
+    """
+    Resolves the `fields=` query parameter to a tuple of keys.
+    None -> LIST_FIELDS, "all" -> None (no projection). The id is always included.
+    """
+    if not fields:
+        return LIST_FIELDS
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    if "all" in requested:
+        return None
+    return ("id",) + tuple(f for f in dict.fromkeys(requested) if f != "id")
+
+def project(item, fields):
+    """
+    Copies only `fields` out of an article dict (all of it if fields is None).
+    This is the API edge: "timestamp" is rendered here from the canonical
+    published_at, nowhere earlier.
+    """
+    if fields is None:
+        row = dict(item)
+        row["timestamp"] = format_timestamp(item.get("published_at"))
+        return row
+    row = {field: item.get(field) for field in fields}
+    if "timestamp" in row:
+        row["timestamp"] = format_timestamp(item.get("published_at"))
+    return row
+
+def encode_cursor(epoch, link):
+    """Opaque keyset cursor for the position right after (epoch, link)."""
+    raw = json.dumps([None if epoch == float("-inf") else epoch, link], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor):
+    """Returns (epoch, link); undated positions use -inf. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        epoch, link = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        epoch = float("-inf") if epoch is None else float(epoch)
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(link, str):
+        raise ValueError("Invalid cursor")
+    return epoch, link
+
+def _collapse(entries):
+    """Drops near-duplicates (see dedup) whose canonical article is among `entries`."""
+    links = {e[1] for e in entries}
+    return [e for e in entries if e[2].get("duplicate_of") not in links]
+
+class _Partition:
+    """A slice of the dataset kept in ascending (epoch, link) order."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.epochs = [e[0] for e in entries]
+        # Undated items sort first (epoch -inf), so they come out last, as before
+        self.first_dated = bisect.bisect_right(self.epochs, float("-inf"))
+
+    def range(self, since=None, until=None):
+        """Returns entries with since < epoch <= until, newest first."""
+        if since is None and until is None:
+            return self.entries[::-1]
+        # Time-bounded queries never include undated items
+        lo = self.first_dated
+        if since is not None:
+            lo = max(lo, bisect.bisect_right(self.epochs, since))
+        hi = bisect.bisect_right(self.epochs, until) if until is not None else len(self.entries)
+        return self.entries[lo:hi][::-1]
+
+class NewsIndex:
+    """
+    Read-only index over one published news dataset.
+
+    Items carry their publish time as an epoch (published_at). They are kept
+    in a time-sorted array plus one partition per category, so category,
+    time-range and `since` filters are answered with bisection instead of a
+    full scan and sort on every request.
+
+    A duplicate is listed only where its canonical article isn't (e.g. in
+    its own category), but stays reachable by link and id.
+    """
+
+    def __init__(self, news_items=None):
+        self.generation = 0  # set by the publisher
+        entries = []
+        for item in news_items or []:
+            epoch = published_at(item)
+            entries.append((epoch if epoch is not None else float("-inf"), item.get("link") or "", item))
+        entries.sort(key=lambda e: (e[0], e[1]))
+
+        self.all = _Partition(_collapse(entries))
+        # Links collapsed out of the full feed
+        self.hidden = {e[1] for e in entries} - {e[1] for e in self.all.entries}
+        self.by_link = {entry[1]: entry for entry in entries}
+        self.by_id = {entry[2]["id"]: entry[2] for entry in entries if entry[2].get("id")}
+        by_category = {}
+        for entry in entries:
+            key = str(entry[2].get("category") or "").lower()
+            by_category.setdefault(key, []).append(entry)
+        self.categories = {key: _Partition(_collapse(group)) for key, group in by_category.items()}
+
+        # Symbol -> articles posting map, from the tags attached at scrape time
+        by_symbol = {}
+        for entry in entries:
+            for symbol in entry[2].get("symbols") or ():
+                by_symbol.setdefault(symbol.lower(), []).append(entry)
+        self.symbols = {key: _Partition(_collapse(group)) for key, group in by_symbol.items()}
+
+    def __len__(self):
+        return len(self.all.entries)
+
+    def __iter__(self):
+        return (e[2] for e in self.all.entries)
+
+    def key(self, item):
+        """The (epoch, link) sort key of a published item."""
+        return self.by_link[item["link"]][:2]
+
+    def cursor_for(self, item):
+        return encode_cursor(*self.key(item))
+
+    def start_after(self, items, cursor_key):
+        """
+        Position of the first item strictly after `cursor_key` in a list sorted
+        newest first. Keyset pagination: stable when new articles are published.
+        """
+        lo, hi = 0, len(items)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key(items[mid]) < cursor_key:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def _matches(self, entry, categories, since, until):
+        if categories is not None and str(entry[2].get("category") or "").lower() not in categories:
+            return False
+        if since is not None and entry[0] <= since:
+            return False
+        if until is not None and entry[0] > until:
+            return False
+        return True
+
+    def select(self, links, categories=None, since=None, until=None):
+        """
+        Like query(), but restricted to `links` (e.g. search hits).
+        Cost depends on len(links), not on the size of the dataset.
+        """
+        if categories is not None:
+            categories = set(categories)
+        entries = [self.by_link[link] for link in links if link in self.by_link]
+        entries = _collapse([e for e in entries if self._matches(e, categories, since, until)])
+        entries.sort(key=lambda e: (e[0], e[1]), reverse=True)
+        return [e[2] for e in entries]
+
+    def query(self, categories=None, since=None, until=None):
+        """
+        Returns matching items sorted newest first.
+        `categories` is an iterable of lowercase category names (None = all).
+        `since` is exclusive and `until` inclusive, both epoch seconds.
+        """
+        if categories is None:
+            return [e[2] for e in self.all.range(since, until)]
+
+        partitions = [self.categories[c] for c in set(categories) if c in self.categories]
+        return [e[2] for e in self._merge(partitions, since, until)]
+
+    def query_symbols(self, symbols, categories=None, since=None, until=None):
+        """
+        Articles tagged with any of `symbols` (lowercase), newest first.
+        A set union over the symbol postings plus a merge by time.
+        """
+        partitions = [self.symbols[s] for s in set(symbols) if s in self.symbols]
+        if categories is not None:
+            categories = set(categories)
+        return [
+            e[2] for e in self._merge(partitions, since, until)
+            if categories is None or str(e[2].get("category") or "").lower() in categories
+        ]
+
+    def _merge(self, partitions, since, until):
+        if not partitions:
+            return []
+        if len(partitions) == 1:
+            return partitions[0].range(since, until)
+
+        # Each partition is already sorted, so a k-way merge keeps the global order
+        merged = heapq.merge(
+            *(p.range(since, until) for p in partitions),
+            key=lambda e: (e[0], e[1]),
+            reverse=True
+        )
+        # An article can be in several symbol partitions
+        result = []
+        last = None
+        for entry in merged:
+            if entry is not last:
+                result.append(entry)
+            last = entry
+        # A story can also sit in two partitions under different links
+        return _collapse(result)
@@ -0,0 +1,181 @@
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+
+from shared_state import FileLock
+
+MAGIC = b"MPSNAP\x00\x01"
+# marshal's format is only stable within one Python version, so snapshots record it
+FORMAT = [1, marshal.version, *sys.version_info[:2]]
+# Publishes arrive in batches during a scrape; write at most this often (other workers see a
+# scrape's batches this much later)
+WRITE_INTERVAL_SECONDS = 10
+
+class NewsSnapshot:
+    """
+    The published dataset and its derived indexes in one binary file, so a
+    restart can serve right away instead of re-parsing the JSON store and
+    re-tokenizing every article.
+
+    Layout: MAGIC, a 4-byte header length, a JSON header (format, the
+    NewsStore.version() the data was loaded/saved at, scrape time and
+    where each section is), then marshal-encoded sections. load() maps
+    the file and decodes the sections straight from the mapping. At
+    startup a snapshot is only used while the store on disk is still at
+    the version it records; anything else falls back to the JSON load.
+
+    schedule() queues a write; a background thread writes the latest
+    queued state at most every WRITE_INTERVAL_SECONDS, via a temp file
+    and rename so readers never see a partial snapshot.
+
+    The file is also how worker processes share the published dataset:
+    each write carries a generation one above the file's previous one
+    (under an flock), a write older than what is on disk is dropped, and
+    changed() tells the other processes, with one stat, that there is a
+    newer generation to load.
+    """
+
+    def __init__(self, path, interval=WRITE_INTERVAL_SECONDS):
+        self.path = path
+        self.interval = interval
+        self._pending = None
+        self._cond = threading.Condition()
+        self._thread = None
+        self._last_write = 0.0
+        self.lock_path = path + ".lock"
+        # Generation this process last wrote or loaded, and the file as it was then
+        self.generation = 0
+        self._seen = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def changed(self):
+        """True if the file on disk is not the one this process last wrote or loaded."""
+        sig = self._stat()
+        return sig is not None and sig != self._seen
+
+    def schedule(self, capture):
+        """capture() -> (header fields, {section: value}), called on the writer thread."""
+        with self._cond:
+            self._pending = capture
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="news-snapshot", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def flush(self):
+        """Writes a queued snapshot now (shutdown, benchmarks)."""
+        with self._cond:
+            capture, self._pending = self._pending, None
+        if capture is not None:
+            self._write(capture)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                delay = self._last_write + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._cond:
+                capture, self._pending = self._pending, None
+            if capture is not None:
+                self._write(capture)
+
+    def _write(self, capture):
+        start = time.perf_counter()
+        self._last_write = time.monotonic()
+        try:
+            fields, sections = capture()
+            blobs, offsets, offset = [], {}, 0
+            for name, value in sections.items():
+                blob = marshal.dumps(value)
+                offsets[name] = [offset, len(blob)]
+                blobs.append(blob)
+                offset += len(blob)
+            with FileLock(self.lock_path):
+                current = self._read_header()
+                if current and current.get("scrape_time", 0) >= fields["scrape_time"]:
+                    # Another process already wrote this dataset or a newer one
+                    return
+                generation = max(self.generation, current.get("generation", 0) if current else 0) + 1
+                header = json.dumps({
+                    "format": FORMAT, **fields, "generation": generation, "sections": offsets,
+                }).encode("utf-8")
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(MAGIC + struct.pack("<I", len(header)) + header)
+                    for blob in blobs:
+                        f.write(blob)
+                os.replace(tmp, self.path)
+                self.generation = generation
+                self._seen = self._stat()
+        except (OSError, ValueError) as e:
+            print(f"News snapshot: write failed: {e}")
+            return
+        print(f"News snapshot: wrote generation {generation}, {offset // 1024} KB in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    def _read_header(self):
+        try:
+            with open(self.path, "rb") as f:
+                head = f.read(len(MAGIC) + 4)
+                if len(head) < len(MAGIC) + 4 or head[:len(MAGIC)] != MAGIC:
+                    return None
+                (size,) = struct.unpack_from("<I", head, len(MAGIC))
+                header = json.loads(f.read(size))
+        except (OSError, ValueError):
+            return None
+        return header if header.get("format") == FORMAT else None
+
+    def load(self, store_version=None, newer_than=None):
+        """
+        (header, {section: value}), or None if there is no usable snapshot.
+        With `store_version`, only a snapshot taken at that NewsStore.version()
+        is used (startup); without, a generation newer than ours whose data
+        is newer than `newer_than` (workers following the process that scrapes).
+        """
+        try:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                st = os.fstat(f.fileno())
+                sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+                view = memoryview(mm)
+                try:
+                    if bytes(view[:len(MAGIC)]) != MAGIC:
+                        return None
+                    (size,) = struct.unpack_from("<I", view, len(MAGIC))
+                    base = len(MAGIC) + 4 + size
+                    header = json.loads(bytes(view[len(MAGIC) + 4:base]))
+                    if header.get("format") != FORMAT:
+                        return None
+                    if store_version is not None and header.get("store_version") != store_version:
+                        return None
+                    if store_version is None and (
+                        header.get("generation", 0) <= self.generation
+                        or (newer_than is not None and header.get("scrape_time", 0) <= newer_than)
+                    ):
+                        self._seen = sig
+                        return None
+                    sections = {
+                        name: marshal.loads(view[base + offset:base + offset + length])
+                        for name, (offset, length) in header["sections"].items()
+                    }
+                finally:
+                    view.release()
+        except (OSError, ValueError, EOFError, TypeError, KeyError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"News snapshot: unreadable {self.path}: {e}")
+            return None
+        self.generation = header.get("generation", 0)
+        self._seen = sig
+        return header, sections
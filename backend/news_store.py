@@ -0,0 +1,191 @@
+import json
+import os
+import threading
+import time
+
+from shared_state import FileLock
+
+# Compact once the log passes this fraction of the snapshot size (and COMPACT_MIN_BYTES), which
+# bounds load time at about 1.5 snapshot parses
+COMPACT_RATIO = 0.5
+COMPACT_MIN_BYTES = 256 * 1024
+
+class NewsStore:
+    """
+    The article dataset on disk as a snapshot plus an append-only log.
+
+    The snapshot is a plain JSON list (moneycontrol_news.json, so existing
+    files load as-is). Every save appends only the articles that changed,
+    and {"del": link} for those that went away, to <snapshot>.log as
+    JSON lines; loading replays the log over the snapshot. When the log
+    outgrows the snapshot it is folded in: a new snapshot is written to a
+    temp file and renamed over the old one, then the log is emptied.
+    Replaying is idempotent, so a crash between the two steps loses nothing.
+
+    Several processes can share a store (the server and analysis.py): an
+    flock serialises writers, and each store replays whatever other
+    processes appended before it writes. Articles are keyed by link.
+    """
+
+    def __init__(self, path, log_path=None):
+        self.path = path
+        self.log_path = log_path or path + ".log"
+        self.lock_path = path + ".lock"
+        self._lock = threading.Lock()
+        self._items = {}  # link -> copy of the article as last written/read
+        self._loaded = False
+        self._snapshot_sig = None
+        self._log_offset = 0
+
+    def exists(self):
+        return os.path.exists(self.path) or os.path.exists(self.log_path)
+
+    def last_modified(self):
+        """mtime of the newest write (snapshot or log), 0 if there is nothing on disk."""
+        return max((os.path.getmtime(p) for p in (self.path, self.log_path) if os.path.exists(p)), default=0)
+
+    def version(self):
+        """
+        Identifies the bytes on disk (snapshot inode/mtime/size and log length):
+        anything derived from a load is current while this is unchanged.
+        """
+        sig = self._signature()
+        return [list(sig) if sig else None, self._log_size()]
+
+    def load(self):
+        """The current dataset: snapshot order, then articles added since. Callers get their own copies."""
+        with self._lock, self._file_lock():
+            self._sync()
+            return [dict(item) for item in self._items.values()]
+
+    def save(self, news_list):
+        """
+        Makes the stored dataset equal to news_list, writing only the
+        difference. Returns the number of log records written.
+        """
+        with self._lock, self._file_lock():
+            self._sync()
+            current = {item["link"]: item for item in news_list if item.get("link")}
+            records = [{"del": link} for link in self._items if link not in current]
+            records += [{"put": item} for link, item in current.items() if self._items.get(link) != item]
+            if records:
+                self._append(records)
+            # Keep the caller's order for the next snapshot
+            self._items = {link: dict(item) for link, item in current.items()}
+            self._maybe_compact()
+            return len(records)
+
+    def upsert(self, items):
+        """Writes just these articles (new or changed), leaving the rest alone."""
+        with self._lock, self._file_lock():
+            self._sync()
+            records = [{"put": item} for item in items if item.get("link") and self._items.get(item["link"]) != item]
+            if records:
+                self._append(records)
+            for record in records:
+                self._items[record["put"]["link"]] = dict(record["put"])
+            self._maybe_compact()
+            return len(records)
+
+    def compact(self):
+        with self._lock, self._file_lock():
+            self._sync()
+            self._compact()
+
+    def _file_lock(self):
+        return FileLock(self.lock_path)
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_ino, st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _log_size(self):
+        try:
+            return os.path.getsize(self.log_path)
+        except FileNotFoundError:
+            return 0
+
+    def _sync(self):
+        # Catch up with what is on disk: a full reload if the snapshot was replaced
+        # (compaction here or elsewhere), else just the log records appended since
+        sig = self._signature()
+        if not self._loaded or sig != self._snapshot_sig or self._log_size() < self._log_offset:
+            self._items = {}
+            if sig is not None:
+                with open(self.path, "rb") as f:
+                    data = f.read()
+                try:
+                    snapshot = json.loads(data) if data.strip() else []
+                except json.JSONDecodeError as e:
+                    print(f"News store: unreadable snapshot {self.path}: {e}")
+                    snapshot = []
+                self._items = {item["link"]: item for item in snapshot if isinstance(item, dict) and item.get("link")}
+            self._snapshot_sig = sig
+            self._log_offset = 0
+            self._loaded = True
+        self._replay()
+
+    def _replay(self):
+        if not os.path.exists(self.log_path):
+            self._log_offset = 0
+            return
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            data = f.read()
+        # Anything after the last newline is a write still in progress (or torn by a crash)
+        end = data.rfind(b"\n") + 1
+        if not end:
+            return
+        lines = data[:end].splitlines()
+        try:
+            # One parse for the whole tail; line by line only if something in it is damaged
+            records = json.loads(b"[" + b",".join(lines) + b"]")
+        except json.JSONDecodeError:
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        self._log_offset += end
+        for record in records:
+            if "put" in record:
+                self._items[record["put"]["link"]] = record["put"]
+            elif "del" in record:
+                self._items.pop(record["del"], None)
+
+    def _append(self, records):
+        data = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records).encode("utf-8")
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size > self._log_offset:
+                # Unterminated tail from a crashed writer (we hold the lock, so nobody is mid-write)
+                os.ftruncate(fd, self._log_offset)
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._log_offset += len(data)
+
+    def _maybe_compact(self):
+        snapshot_size = self._snapshot_sig[2] if self._snapshot_sig else 0
+        if self._log_size() > max(snapshot_size * COMPACT_RATIO, COMPACT_MIN_BYTES):
+            self._compact()
+
+    def _compact(self):
+        start = time.perf_counter()
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(list(self._items.values()), f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        # The snapshot now holds everything the log did
+        with open(self.log_path, "wb"):
+            pass
+        self._snapshot_sig = self._signature()
+        self._log_offset = 0
+        print(f"News store: compacted {len(self._items)} articles in {(time.perf_counter() - start) * 1000:.0f} ms.")
@@ -0,0 +1,105 @@
+import asyncio
+import bisect
+import json
+import threading
+
+from news_index import LIST_FIELDS, project
+
+# Idle connections get a comment line this often so proxies don't cut them
+HEARTBEAT_SECONDS = 15
+# Events buffered per client before it is considered too slow and disconnected
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Browsers reconnect after this many ms, resuming from the Last-Event-ID
+RETRY_MS = 5000
+
+def format_event(event_id, item):
+    """One SSE `news` event carrying the slim list projection of an article."""
+    data = json.dumps(project(item, LIST_FIELDS), ensure_ascii=False, default=str)
+    return f"id: {event_id}\nevent: news\ndata: {data}\n\n".encode("utf-8")
+
+class Subscriber:
+    """One connected client: its filters and a queue owned by its event loop."""
+
+    def __init__(self, loop, categories=None, matcher=None):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.categories = categories  # lowercase category names, None = all
+        self.matcher = matcher        # watchlist predicate, None = all
+        self.replayed = set()         # links already sent from the resume backlog
+
+    def wants(self, item):
+        if self.categories is not None and str(item.get("category") or "").lower() not in self.categories:
+            return False
+        if self.matcher is not None and not self.matcher(item):
+            return False
+        return True
+
+    def offer(self, events):
+        """Runs on the subscriber's loop. None in the queue ends the stream."""
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too slow to keep up: drop what's buffered and close, the
+                # client reconnects and resumes from its last event id
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(None)
+                return
+
+class NewsBroadcaster:
+    """
+    Shared fan-out of newly published articles to stream subscribers.
+
+    The scraper calls publish() once per dataset; each new article is
+    serialized once and handed to every subscriber whose filters match,
+    so the number of clients never changes how often we scrape.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def events_for(self, index, items):
+        """(item, link, event bytes) oldest first, so event ids only move forward."""
+        items = sorted(items, key=index.key)
+        return [(item, item["link"], format_event(index.cursor_for(item), item)) for item in items]
+
+    def publish(self, index, new_items):
+        """Publish listener; called from the scraper thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        if not subscribers or not new_items:
+            return
+        events = self.events_for(index, new_items)
+        for subscriber in subscribers:
+            matching = [(link, body) for item, link, body in events if subscriber.wants(item)]
+            if not matching:
+                continue
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, matching)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(subscriber)
+
+    def backlog(self, index, cursor_key, subscriber):
+        """Articles published after `cursor_key` that the subscriber wants, for resuming."""
+        start = bisect.bisect_left(index.all.epochs, cursor_key[0])
+        items = [
+            entry[2] for entry in index.all.entries[start:]
+            if (entry[0], entry[1]) > cursor_key and subscriber.wants(entry[2])
+        ]
+        events = self.events_for(index, items)
+        subscriber.replayed = {link for _, link, _ in events}
+        return [body for _, _, body in events]
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from database import User, SentNotification, NewsAnalytics
 from scraper import get_latest_news_raw 
 from email_service import EmailService
+from timestamps import format_timestamp
 from datetime import datetime
 import logging
 import re
@@ -118,7 +119,7 @@ class NotificationManager:
             snippet = raw_desc[:280] + "..." if len(raw_desc) > 280 else raw_desc
             
             # Metadata
-            timestamp = article.get("timestamp", "Just now")
+            timestamp = format_timestamp(article.get("published_at")) or "Just now"
             sentiment = article.get("sentiment", "Neutral").capitalize()
             sentiment = article.get("sentiment", "Neutral").capitalize()
             
@@ -3,6 +3,7 @@ import chromadb
 from chromadb.utils import embedding_functions
 import pandas as pd
 import datetime
+from timestamps import format_timestamp
 
 # --- Configuration ---
 VECTOR_DB_PATH = "./chroma_db"
@@ -313,7 +314,7 @@ def ingest_news_articles(news_items):
             continue
             
         headline = item.get("headline", "No Title")
-        timestamp = item.get("timestamp", "Unknown Date")
+        timestamp = format_timestamp(item.get("published_at")) or "Unknown Date"
         content = item.get("full_content", "")
         
         # If content is empty/short, use description or headline
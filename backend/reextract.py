@@ -0,0 +1,102 @@
+"""
+Re-runs article extraction over the raw-HTML archive, with no network
+access: parsing and timestamp normalization in a pool of worker
+processes, then headline sentiment in batches, then the updated articles
+are written back to moneycontrol_news.json and news_items.
+
+Stop the server first: it keeps its own copy of the dataset in memory
+and writes that back on its next scrape.
+
+Usage: python reextract.py [--workers N] [--since-days D] [--limit N] [--dry-run]
+"""
+import argparse
+import concurrent.futures
+import os
+import time
+from datetime import datetime, timedelta
+
+from article_extractor import extract_article
+from database import init_db
+from html_archive import HtmlArchive
+from timestamps import parse_timestamp
+
+# Fields a re-extraction can change
+FIELDS = ("image_url", "published_at", "description", "full_content", "sentiment", "sentiment_score")
+
+def reparse(task):
+    """Runs in a worker process: (root, url, digest) -> (url, extracted fields or None, error)."""
+    root, url, digest = task
+    try:
+        page = extract_article(HtmlArchive(root).read(digest))
+    except Exception as e:
+        return url, None, str(e)
+    epoch = parse_timestamp(page.pop("timestamp"))
+    page["published_at"] = int(epoch) if epoch is not None else None
+    return url, page, None
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract archived article pages without touching the network.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--since-days", type=float, help="only pages fetched in the last D days")
+    parser.add_argument("--limit", type=int, help="at most N articles, most recently fetched first")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change, write nothing")
+    args = parser.parse_args()
+
+    init_db()
+    archive = HtmlArchive()
+    since = datetime.now() - timedelta(days=args.since_days) if args.since_days else None
+    pages = archive.latest(since=since, limit=args.limit)
+    if not pages:
+        print("HTML archive is empty, nothing to re-extract.")
+        return
+
+    # Only the parent needs these (the scraper pulls in the vector store, sentiment the model)
+    import scraper
+    from sentiment import analyze_sentiments
+
+    news = scraper.load_existing_news()
+    by_link = {item["link"]: item for item in news if item.get("link")}
+    tasks = [(archive.root, url, digest) for url, _, digest in pages if url in by_link]
+    print(f"Re-extracting {len(tasks)} archived articles with {args.workers} workers "
+          f"({len(pages) - len(tasks)} archived pages are no longer in the dataset)...")
+
+    start = time.perf_counter()
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for url, page, error in executor.map(reparse, tasks, chunksize=8):
+            if page is None:
+                print(f"Could not re-extract {url}: {error}")
+            else:
+                results[url] = page
+    parsed = time.perf_counter()
+
+    # Sentiment is scored on the headline, as in the live pipeline
+    links = list(results)
+    sentiments = analyze_sentiments(by_link[link].get("headline") or "" for link in links)
+    scored = time.perf_counter()
+
+    changed = 0
+    for link, sentiment in zip(links, sentiments):
+        item, page = by_link[link], results[link]
+        updated = {
+            "image_url": page["image_url"] or item.get("image_url"),
+            "published_at": page["published_at"] or item.get("published_at"),
+            "description": page["description"] or item.get("description"),
+            "full_content": page["full_content"] or item.get("full_content"),
+            "sentiment": sentiment["label"],
+            "sentiment_score": sentiment["score"],
+        }
+        if any(item.get(field) != updated[field] for field in FIELDS):
+            changed += 1
+            item.update(updated)
+
+    print(f"Re-extracted {len(results)}/{len(tasks)} articles: parse {parsed - start:.1f}s, "
+          f"sentiment {scored - parsed:.1f}s; {changed} changed.")
+    if args.dry_run or not changed:
+        return
+    scraper.save_news(news)
+    scraper.persist_news(news)
+    print(f"Saved {len(news)} articles.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    Bounded LRU of serialized responses, scoped to one dataset generation.
+
+    Entries are (body, etag) pairs. The first put() for a newer generation
+    drops everything cached for older ones, so a publish invalidates the
+    whole cache at once.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.generation = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, generation, key):
+        with self._lock:
+            if generation != self.generation:
+                self.misses += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, generation, key, body):
+        """Stores a serialized body and returns (body, etag)."""
+        entry = (body, make_etag(body))
+        with self._lock:
+            if self.generation is not None and generation < self.generation:
+                # A slow request finished after a newer publish; don't cache stale data
+                return entry
+            if generation != self.generation:
+                self._entries.clear()
+                self.generation = generation
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+def make_etag(body):
+    """Strong ETag: identical bytes, identical tag."""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def etag_matches(if_none_match, etag):
+    """Checks an If-None-Match header value against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
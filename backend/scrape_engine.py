@@ -0,0 +1,134 @@
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+from curl_cffi.requests import AsyncSession
+
+# Concurrent requests to any one host
+MAX_PER_HOST = 8
+# Token bucket per host: sustained requests/second and burst size
+RATE_PER_HOST = 10.0
+BURST_PER_HOST = 20
+# Attempts per URL, with full-jitter exponential backoff in between
+MAX_ATTEMPTS = 3
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_CAP_SECONDS = 8.0
+# Hard budget for one whole scrape cycle; whatever isn't fetched by then is left for the next one
+CYCLE_DEADLINE_SECONDS = 120.0
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """Async token bucket. Only used from one event loop, so no locking."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ScrapeEngine:
+    """
+    Fetches pages for one scrape cycle over a single pooled async session.
+
+    The curl_cffi session keeps connections alive and negotiates HTTP/2
+    where the server offers it, so a cycle opens a handful of connections
+    instead of one per request. Each host gets a concurrency cap and a
+    token bucket; failed requests are retried with jittered backoff; and
+    nothing is started once the cycle deadline has passed.
+    """
+
+    def __init__(self, headers=None, max_per_host=MAX_PER_HOST, rate=RATE_PER_HOST, burst=BURST_PER_HOST,
+                 attempts=MAX_ATTEMPTS, deadline=CYCLE_DEADLINE_SECONDS, timeout=REQUEST_TIMEOUT_SECONDS,
+                 impersonate="chrome"):
+        self.headers = headers or {}
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.burst = burst
+        self.attempts = attempts
+        self.deadline_seconds = deadline
+        self.timeout = timeout
+        self.impersonate = impersonate
+        self.session = None
+        self.deadline = None
+        self._hosts = {}  # host -> (semaphore, bucket)
+        self.stats = {}
+
+    async def __aenter__(self):
+        self.session = AsyncSession(
+            impersonate=self.impersonate,
+            headers=self.headers,
+            max_clients=self.max_per_host * 4
+        )
+        self.deadline = time.monotonic() + self.deadline_seconds
+        self._hosts = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "skipped": 0, "started": time.monotonic()}
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+        self.stats["elapsed"] = time.monotonic() - self.stats.pop("started")
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def _limits(self, url):
+        host = urlsplit(url).netloc
+        limits = self._hosts.get(host)
+        if limits is None:
+            limits = self._hosts[host] = (asyncio.Semaphore(self.max_per_host), TokenBucket(self.rate, self.burst))
+        return limits
+
+    async def fetch(self, url):
+        """Returns the body of a 200 response, or None (error, non-200, or out of time)."""
+        response = await self.request(url)
+        return response.text if response is not None and response.status_code == 200 else None
+
+    async def request(self, url, headers=None):
+        """
+        GET with limits, retries and the deadline applied. Returns the
+        response if it is a 200 or a 304 (for conditional requests), else None.
+        """
+        semaphore, bucket = self._limits(url)
+        for attempt in range(self.attempts):
+            if attempt:
+                delay = random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                if delay >= self.remaining():
+                    break
+                self.stats["retries"] += 1
+                await asyncio.sleep(delay)
+
+            async with semaphore:
+                await bucket.acquire()
+                if self.expired():
+                    self.stats["skipped"] += 1
+                    return None
+                self.stats["requests"] += 1
+                try:
+                    response = await self.session.get(url, headers=headers, timeout=min(self.timeout, self.remaining()))
+                except Exception as e:
+                    print(f"Fetch failed ({attempt + 1}/{self.attempts}) {url}: {e}")
+                    continue
+            if response.status_code in (200, 304):
+                return response
+            if response.status_code not in RETRY_STATUSES:
+                print(f"Fetch {url}: HTTP {response.status_code}")
+                break
+        self.stats["failures"] += 1
+        return None
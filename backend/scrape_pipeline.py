@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+# Items waiting in front of each stage; a full inbox makes the stage before it wait
+QUEUE_SIZE = 64
+
+_STOP = object()
+
+class Stage:
+    """
+    One step of a Pipeline. `workers` tasks take items from a bounded inbox
+    and call fn(batch) -> list of items for the next stage. With batch > 1
+    a worker takes whatever else is already queued, up to that many, so
+    batch-friendly steps (the sentiment model, vector upserts, publishing)
+    run once per batch. Blocking functions run in threads.
+    """
+
+    def __init__(self, name, fn, workers=1, batch=1, blocking=False, queue_size=QUEUE_SIZE):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch = batch
+        self.blocking = blocking
+        self.queue_size = queue_size
+        self.inbox = None
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_depth = 0
+
+    def depth(self):
+        return self.inbox.qsize() if self.inbox is not None else 0
+
+    def stats(self, elapsed):
+        return {
+            "workers": self.workers,
+            "queue_depth": self.depth(),
+            "max_queue_depth": self.max_depth,
+            "processed": self.processed,
+            "emitted": self.emitted,
+            "errors": self.errors,
+            "busy_seconds": round(self.busy, 3),
+            "per_second": round(self.processed / elapsed, 1) if elapsed > 0 else None,
+        }
+
+class Pipeline:
+    """
+    Stages connected by bounded asyncio queues. Every item moves on as
+    soon as its stage is done with it, so the first results come out of
+    the last stage while later items are still being fetched. Whatever
+    the last stage returns is collected in `results`.
+    """
+
+    def __init__(self, stages):
+        self.stages = stages
+        self.results = []
+        self.started = None
+        self.finished = None
+
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    def stats(self):
+        elapsed = self.elapsed()
+        return {
+            "running": self.started is not None and self.finished is None,
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {stage.name: stage.stats(elapsed) for stage in self.stages},
+        }
+
+    def summary(self):
+        return ", ".join(
+            f"{s.name} {s.processed} ({s.processed / max(self.elapsed(), 1e-9):.1f}/s, max queue {s.max_depth})"
+            for s in self.stages
+        )
+
+    async def run(self, sources):
+        self.started, self.finished = time.monotonic(), None
+        for stage in self.stages:
+            stage.inbox = asyncio.Queue(stage.queue_size)
+        workers = [
+            [asyncio.create_task(self._work(i, stage)) for _ in range(stage.workers)]
+            for i, stage in enumerate(self.stages)
+        ]
+        for item in sources:
+            await self.stages[0].inbox.put(item)
+        # Shut down front to back: a stage stops once everything before it has drained into it
+        for stage, tasks in zip(self.stages, workers):
+            for _ in tasks:
+                await stage.inbox.put(_STOP)
+            await asyncio.gather(*tasks)
+        self.finished = time.monotonic()
+        return self.results
+
+    async def _work(self, i, stage):
+        outbox = self.stages[i + 1].inbox if i + 1 < len(self.stages) else None
+        while True:
+            item = await stage.inbox.get()
+            stage.max_depth = max(stage.max_depth, stage.inbox.qsize() + 1)
+            if item is _STOP:
+                return
+            batch, stop = [item], False
+            while len(batch) < stage.batch and not stage.inbox.empty():
+                extra = stage.inbox.get_nowait()
+                if extra is _STOP:
+                    stop = True
+                    break
+                batch.append(extra)
+
+            start = time.monotonic()
+            try:
+                if stage.blocking:
+                    out = await asyncio.to_thread(stage.fn, batch)
+                else:
+                    out = await stage.fn(batch)
+            except Exception as e:
+                print(f"Pipeline stage {stage.name} failed on {len(batch)} items: {e}")
+                stage.errors += len(batch)
+                out = []
+            stage.busy += time.monotonic() - start
+            stage.processed += len(batch)
+            stage.emitted += len(out)
+
+            for result in out:
+                if outbox is None:
+                    self.results.append(result)
+                else:
+                    await outbox.put(result)
+            if stop:
+                return
+
+def configured_workers(defaults, spec):
+    """Worker counts per stage: `defaults` overridden by a "fetch=32,parse=8" style spec."""
+    workers = dict(defaults)
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        name, _, count = part.partition("=")
+        if name.strip() in workers and count.strip().isdigit() and int(count) > 0:
+            workers[name.strip()] = int(count)
+        else:
+            print(f"Ignoring pipeline worker setting '{part}'")
+    return workers
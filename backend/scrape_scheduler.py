@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+# Bounds on how often one category listing is polled
+MIN_POLL_SECONDS = 120
+MAX_POLL_SECONDS = 1800
+# Until a category has some history it is polled at the old fixed refresh interval
+DEFAULT_POLL_SECONDS = 300
+# Expected new articles per poll: well under 1, so most articles are picked up soon after
+# they appear, while quiet categories still stretch out to MAX_POLL_SECONDS
+TARGET_NEW_PER_POLL = 0.2
+# Observations lose half their weight after this long, so rates follow the news day
+RATE_HALF_LIFE_HOURS = 6.0
+# A listing only shows its newest entries, so gaps longer than this can't be measured
+MAX_OBSERVED_HOURS = 2 * MAX_POLL_SECONDS / 3600
+# Listing requests per hour across all categories; intervals are stretched to fit
+POLL_BUDGET_PER_HOUR = 240
+# How often the scheduler looks for due categories
+TICK_SECONDS = 30
+
+def publish_rate(state):
+    """Estimated new articles per hour for one category, None without history."""
+    exposure = state.get("exposure_hours") or 0
+    return (state.get("arrivals") or 0) / exposure if exposure > 0 else None
+
+def observe(state, new_links, now):
+    """Folds one poll's count of new links into the category's decayed rate estimate."""
+    last = state.get("last_polled")
+    if last is not None and now > last:
+        hours = min((now - last).total_seconds() / 3600, MAX_OBSERVED_HOURS)
+        decay = 0.5 ** (hours / RATE_HALF_LIFE_HOURS)
+        state["arrivals"] = (state.get("arrivals") or 0) * decay + new_links
+        state["exposure_hours"] = (state.get("exposure_hours") or 0) * decay + hours
+    state["new_links"] = new_links
+    state["last_polled"] = now
+
+def poll_interval(state):
+    """Seconds between polls that should find about TARGET_NEW_PER_POLL new articles, within bounds."""
+    rate = publish_rate(state)
+    if rate is None:
+        return DEFAULT_POLL_SECONDS
+    if rate <= 0:
+        return MAX_POLL_SECONDS
+    return min(MAX_POLL_SECONDS, max(MIN_POLL_SECONDS, TARGET_NEW_PER_POLL * 3600 / rate))
+
+def plan(states, polled, categories, now):
+    """
+    After a scrape cycle: `polled` is {category: new links found, or None if
+    its listing couldn't be fetched}. Updates the estimates of the polled
+    categories and schedules their next poll. If the intervals of all
+    `categories` together would exceed POLL_BUDGET_PER_HOUR, every interval
+    is stretched by the same factor, so quiet categories keep their share.
+    """
+    for name, new_links in polled.items():
+        if new_links is not None:
+            observe(states[name], new_links, now)
+    intervals = {name: poll_interval(states.get(name, {})) for name in categories}
+    scale = max(1.0, sum(3600 / seconds for seconds in intervals.values()) / POLL_BUDGET_PER_HOUR)
+    for name in polled:
+        seconds = min(MAX_POLL_SECONDS, intervals.get(name, DEFAULT_POLL_SECONDS) * scale)
+        states[name]["poll_interval"] = seconds
+        states[name]["next_poll"] = now + timedelta(seconds=seconds)
+
+def due_categories(states, categories, now):
+    """{name: url} of the categories whose next poll has come (or that were never polled)."""
+    return {
+        name: url for name, url in categories.items()
+        if states.get(name, {}).get("next_poll") is None or states[name]["next_poll"] <= now
+    }
@@ -1,12 +1,29 @@
 from curl_cffi import requests
-from bs4 import BeautifulSoup
 import json
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
+import asyncio
 import concurrent.futures
+import hashlib
 import threading
-from sentiment import analyze_sentiment
+from sentiment import analyze_sentiments
+from news_index import NewsIndex, article_id
+from article_cache import ArticleCache, intern_labels
+from search_index import SearchIndex
+from entity_tagger import tag_article
+from article_extractor import extract_article
+from dedup import DuplicateIndex, canonical_url, fingerprint
+from timestamps import parse_timestamp, format_timestamp, normalize_article, age_cutoff, to_db
+from html_backend import listing_entries
+from html_archive import ARCHIVE, ARCHIVE_ENABLED
+from news_store import NewsStore
+from news_snapshot import NewsSnapshot
+from shared_state import FileLock
+from scrape_scheduler import plan, due_categories
+from scrape_pipeline import Pipeline, Stage, configured_workers
+from scrape_engine import ScrapeEngine
+from database import SessionLocal, upsert_news_items, count_news_items, get_listing_states, save_listing_states
 
 from rag_engine import ingest_news_articles
 
@@ -36,6 +53,9 @@ CATEGORY_URLS = {
     
 }
 
+# Listing links outside this site (ads, partner pages) are skipped
+ARTICLE_HOST = "moneycontrol.com"
+
 JSON_FILE = "moneycontrol_news.json"
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
@@ -43,205 +63,137 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
     "Referer": "https://www.google.com/"
 }
+# One request per article serves both the metadata (was a 5 s fetch) and the body (was a
+# 10 s fetch in scrape_article_content): the longer one, so slow pages still yield a body
+ARTICLE_TIMEOUT_SECONDS = 10
+
+# Snapshot + append-only log; saves write only the articles that changed
+NEWS_STORE = NewsStore(JSON_FILE)
+# Binary copy of the published dataset and its indexes, loaded at startup (NEWS_SNAPSHOT=0 turns it off)
+SNAPSHOT_FILE = "moneycontrol_news.snapshot"
+NEWS_SNAPSHOT = NewsSnapshot(SNAPSHOT_FILE) if os.getenv("NEWS_SNAPSHOT", "1") != "0" else None
+# Held by whichever process is scraping; the other workers (uvicorn --workers N) follow its snapshots
+SCRAPE_LOCK_FILE = "moneycontrol_news.scrape.lock"
 
 def load_existing_news():
-    if os.path.exists(JSON_FILE):
-        try:
-            with open(JSON_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    return []
+    # Datasets written before published_at existed are converted as they load
+    return [normalize_article(item) for item in NEWS_STORE.load()]
 
 def save_news(news_list):
-    with open(JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(news_list, f, indent=4, ensure_ascii=False)
+    NEWS_STORE.save(news_list)
 
 # Global Cache for article details to avoid re-fetching
-# This will be populated from existing JSON on startup
-ARTICLE_CACHE = {}
+# This will be populated from existing JSON on startup. Bounded LRU, bodies compressed
+# (ARTICLE_CACHE_MB, default 32)
+ARTICLE_CACHE = ArticleCache(int(float(os.getenv("ARTICLE_CACHE_MB", "32")) * 1024 * 1024))
+# Fields a duplicate takes over from its canonical article instead of fetching/scoring its own
+INHERITED_FIELDS = ("image_url", "published_at", "sentiment", "sentiment_score", "description", "full_content")
+
+# Canonical articles by story id and SimHash; copies of them skip the fetch, the model and the embedding
+DUPLICATES = DuplicateIndex()
+
+# Scrape pipeline: workers per stage (override with e.g. SCRAPE_WORKERS="fetch=32,parse=8")
+PIPELINE_WORKERS = configured_workers(
+    {"listing": 6, "fetch": 16, "parse": 4, "sentiment": 1, "tag_embed": 1, "publish": 1},
+    os.getenv("SCRAPE_WORKERS")
+)
+# Most items the batch-friendly stages take at once
+SENTIMENT_BATCH = 16
+EMBED_BATCH = 32
+PUBLISH_BATCH = 100
+# Batches out of the pipeline are collected and published (merge, store, index, generation,
+# snapshot) at most this often, and once more at the end of the cycle
+PUBLISH_INTERVAL_SECONDS = 5
+# The current (or last) scrape pipeline, for /debug/pipeline-stats
+PIPELINE = None
 
 def populate_cache(news_items):
-    global ARTICLE_CACHE
-    for item in news_items:
-        if "link" in item:
-            ARTICLE_CACHE[item["link"]] = {
-                "image_url": item.get("image_url"),
-                "timestamp": item.get("timestamp"),
-                "sentiment": item.get("sentiment"),
-                "sentiment_score": item.get("sentiment_score"),
-                "full_content": item.get("full_content")
-            }
-
-def fetch_details_single(link, basic_data):
-    """Fetches details for a single article link."""
-    image_url = basic_data.get("image_url")
-    timestamp = basic_data.get("timestamp") # Preserve existing timestamp if available
-    
-    try:
-         article_res = requests.get(link, headers=HEADERS, timeout=5, impersonate="chrome")
-         if article_res.status_code == 200:
-             a_soup = BeautifulSoup(article_res.text, "html.parser")
-             
-             # Extract high-quality image from OG tag
-             og_image = a_soup.find("meta", property="og:image")
-             if og_image and og_image.get("content"):
-                 image_url = og_image.get("content")
-
-             # Try JSON-LD for data (most reliable for MoneyControl)
-             scripts = a_soup.find_all("script", type="application/ld+json")
-             for script in scripts:
-                if script.string:
-                    try:
-                        data = json.loads(script.string)
-                        if isinstance(data, list):
-                            for item in data:
-                                if "datePublished" in item and not timestamp:
-                                    timestamp = item["datePublished"]
-                                if "image" in item and not image_url:
-                                    if isinstance(item["image"], dict) and "url" in item["image"]:
-                                        image_url = item["image"]["url"]
-                                    elif isinstance(item["image"], str):
-                                        image_url = item["image"]
-                                
-                        elif isinstance(data, dict):
-                            if "datePublished" in data and not timestamp:
-                                timestamp = data["datePublished"]
-                            if "image" in data and not image_url:
-                                if isinstance(data["image"], dict) and "url" in data["image"]:
-                                    image_url = data["image"]["url"]
-                                elif isinstance(data["image"], str):
-                                    image_url = data["image"]
-                    except:
-                        continue
-                if timestamp:
-                    break
-             
-             # Fallback 1: Meta tag for article published time
-             if not timestamp:
-                 meta_date = a_soup.find("meta", property="article:published_time") or \
-                            a_soup.find("meta", property="og:article:published_time") or \
-                            a_soup.find("meta", attrs={"name": "datePublished"})
-                 if meta_date and meta_date.get("content"):
-                     timestamp = meta_date.get("content")
-             
-             # Fallback 2: OG published time
-             if not timestamp:
-                 og_date = a_soup.find("meta", property="og:published_time")
-                 if og_date and og_date.get("content"):
-                     timestamp = og_date.get("content")
-             
-             # Fallback 3: Look for timestamp in article body (MoneyControl specific)
-             if not timestamp:
-                 # MoneyControl often has publish time in span with class "article_schedule"
-                 time_span = a_soup.find("span", class_="article_schedule")
-                 if time_span:
-                     timestamp = time_span.get_text(strip=True)
-                 else:
-                     # Try to find time element
-                     time_elem = a_soup.find("time")
-                     if time_elem:
-                         timestamp = time_elem.get("datetime") or time_elem.get_text(strip=True)
-
-    except Exception as e:
-        print(f"Error fetching article details for {link}: {e}")
-
-    # Format timestamp
-    try:
-        if timestamp and isinstance(timestamp, str):
-            # Try parsing ISO format (from JSON-LD)
-            try:
-                dt_obj = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-                timestamp = dt_obj.strftime("%d %b %Y, %I:%M %p")
-            except:
-                # Try parsing other common formats
-                # MoneyControl sometimes uses formats like "January 27, 2026 13:06 IST"
-                for fmt in [
-                    "%B %d, %Y %H:%M IST",
-                    "%d %B %Y, %I:%M %p",
-                    "%d %b %Y, %I:%M %p",
-                    "%Y-%m-%d %H:%M:%S",
-                    "%d-%m-%Y %H:%M:%S"
-                ]:
-                    try:
-                        dt_obj = datetime.strptime(timestamp, fmt)
-                        timestamp = dt_obj.strftime("%d %b %Y, %I:%M %p")
-                        break
-                    except:
-                        continue
-        
-        # Only use current time if we absolutely couldn't find a timestamp AND didn't have one before
-        if not timestamp and not basic_data.get("timestamp"):
-             print(f"Warning: No timestamp found for {link}. Marking for removal.")
-             timestamp = None 
-             
-    except Exception as e:
-        print(f"Error formatting timestamp for {link}: {e}")
-        # Don't overwrite if we have something valid
-        if not timestamp:
-             timestamp = basic_data.get("timestamp") or None
+    """
+    Fills ARTICLE_CACHE from a dataset. Only scrapes read the cache, so this
+    runs when one starts rather than on load; unchanged entries cost a CRC.
+    """
+    ARTICLE_CACHE.update(news_items)
 
-    # Analyze Sentiment
-    sentiment_result = {"label": "neutral", "score": 0.0}
+def link_duplicate(item):
+    """
+    Listing-time check, before anything is fetched: a new URL for a story
+    we already have (same article id) becomes a duplicate of it and takes
+    over its details.
+    """
+    canonical = DUPLICATES.canonical_link(item["link"])
+    cached = ARTICLE_CACHE.get(canonical) if canonical else None
+    if cached and cached.has_body:
+        item.update({field: cached.get(field) for field in INHERITED_FIELDS})
+        item["duplicate_of"] = canonical
+        item.pop("needs_deep_fetch", None)
+    return item
+
+def inherit_sentiment(item):
+    """A duplicate's sentiment is its canonical article's; False if that hasn't been scored yet."""
+    canonical = ARTICLE_CACHE.get(item.get("duplicate_of"))
+    if not canonical or canonical.sentiment is None:
+        return False
+    item["sentiment"] = canonical.sentiment
+    item["sentiment_score"] = canonical.sentiment_score
+    return True
+
+def archive_page(link, html):
+    """Keeps the raw page in the HTML archive, for offline re-extraction (see reextract.py)."""
+    if html is None or not ARCHIVE_ENABLED:
+        return
     try:
-        # Use headline for faster initial sentiment, but full_content is better if we have it
-        # However, for deep_fetch, headline is already available in basic_data
-        sentiment_result = analyze_sentiment(basic_data.get("headline", ""))
+        ARCHIVE.put(link, html)
     except Exception as e:
-        print(f"Sentiment analysis failed for {link}: {e}")
+        print(f"Could not archive {link}: {e}")
 
-    # Fetch Full Content
+def page_details(link, basic_data, html):
+    """Image, publish time, description and full text from an article page (no sentiment)."""
+    image_url = basic_data.get("image_url")
+    published_at = basic_data.get("published_at") # Preserve existing publish time if available
+    description = basic_data.get("description")
     full_content = None
-    try:
-        full_content = scrape_article_content(link)
-    except Exception as e:
-        print(f"Error fetching content for {link}: {e}")
+
+    if html is not None:
+        try:
+            page = extract_article(html)
+            image_url = page["image_url"] or image_url
+            # The page's own time beats the listing's, which is at best a date
+            published_at = parse_timestamp(page["timestamp"]) or published_at
+            description = description or page["description"]
+            full_content = page["full_content"]
+        except Exception as e:
+            print(f"Error extracting article details for {link}: {e}")
+
+    if published_at is None:
+        print(f"Warning: No timestamp found for {link}. Marking for removal.")
 
     return {
         "image_url": image_url,
-        "timestamp": timestamp,
-        "sentiment": sentiment_result['label'],
-        "sentiment_score": sentiment_result['score'],
+        "published_at": int(published_at) if published_at is not None else None,
+        "description": description,
         "full_content": full_content
     }
 
-def extract_listing_timestamp(article_element):
+def listing_timestamp_from_text(time_text):
     """
-    Extract timestamp from article listing element on category pages.
-    MoneyControl often shows relative times or dates on listing pages.
+    Listing publish time (epoch) from the text of the entry's first <span>:
+    relative ("2 hours ago") or a date.
     """
-    try:
-        # Look for span with time/date info
-        time_span = article_element.find("span")
-        if time_span:
-            time_text = time_span.get_text(strip=True)
-            
-            # Handle relative times (e.g., "2 hours ago", "1 day ago")
-            if "ago" in time_text.lower():
-                from datetime import timedelta
-                now = datetime.now()
-                
-                if "hour" in time_text.lower():
-                    hours = int(''.join(filter(str.isdigit, time_text)) or 1)
-                    return now - timedelta(hours=hours)
-                elif "day" in time_text.lower():
-                    days = int(''.join(filter(str.isdigit, time_text)) or 1)
-                    return now - timedelta(days=days)
-                elif "minute" in time_text.lower():
-                    return now  # Recent enough
-                    
-            # Try to parse absolute dates
-            # MoneyControl formats: "Jan 27, 2026" or "27 Jan 2026"
-            for fmt in ["%b %d, %Y", "%d %b %Y", "%B %d, %Y", "%d %B %Y"]:
-                try:
-                    return datetime.strptime(time_text, fmt)
-                except:
-                    continue
-                    
-    except Exception as e:
-        pass
-    
-    return None
+    if not time_text:
+        return None
+    lowered = time_text.lower()
+    # Handle relative times (e.g., "2 hours ago", "1 day ago")
+    if "ago" in lowered:
+        count = int(''.join(filter(str.isdigit, time_text)) or 1)
+        if "hour" in lowered:
+            return time.time() - count * 3600
+        elif "day" in lowered:
+            return time.time() - count * 86400
+        elif "minute" in lowered:
+            return time.time()  # Recent enough
+        return None
+    # MoneyControl formats: "Jan 27, 2026" or "27 Jan 2026" (IST midnight)
+    return parse_timestamp(time_text)
 
 def scrape_category(url, category_name):
     print(f"Scraping [{category_name}] Headlines...")
@@ -252,94 +204,78 @@ def scrape_category(url, category_name):
         print(f"Error scraping {url}: {e}")
         return []
 
-    soup = BeautifulSoup(response.text, "html.parser")
-    articles = soup.find_all("li", class_="clearfix")
-    
-    results = []
-    cutoff_date = datetime.now() - timedelta(days=7)  # Only articles from last 7 days
-    
+    return parse_category_page(response.text, category_name)
+
+def parse_category_page(html, category_name):
+    """Headline records from a category listing page (cached details filled in)."""
+    return build_category_items(parse_listing(html), category_name)
+
+def parse_listing(html):
+    """(headline, link, listing_timestamp) for each article on a listing page."""
+    entries = []
     # Fast Scrape: Only get headlines and links
-    for article in articles[:24]:
-        title_tag = article.find("h2")
-        link_tag = article.find("a")
-        if not title_tag or not link_tag: continue
-        
-        headline = title_tag.text.strip()
-        link = link_tag.get("href")
-        if not link or "moneycontrol.com" not in link: continue
-        
+    for title, link, time_text in listing_entries(html):
+        if title is None or not link or ARTICLE_HOST not in link: continue
+        link = canonical_url(link)
+
         # Try to extract preliminary timestamp from listing page
-        listing_timestamp = extract_listing_timestamp(article)
-        
+        entries.append((title.strip(), link, listing_timestamp_from_text(time_text)))
+    return entries
+
+def listing_hash(entries):
+    """Content hash of a parsed listing: changes only when its headlines or links do."""
+    digest = hashlib.sha1()
+    for headline, link, _ in entries:
+        digest.update(f"{headline}\n{link}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def build_category_items(entries, category_name):
+    results = []
+    cutoff = age_cutoff(7)  # Only articles from last 7 days
+
+    for headline, link, listing_timestamp in entries:
         # Filter out old articles based on listing timestamp
-        if listing_timestamp and listing_timestamp < cutoff_date:
-            print(f"Skipping old article: {headline[:50]}... (Date: {listing_timestamp.strftime('%d %b %Y')})")
+        if listing_timestamp is not None and listing_timestamp < cutoff:
+            print(f"Skipping old article: {headline[:50]}... (Date: {format_timestamp(int(listing_timestamp))})")
             continue
 
         # Initial minimal record
-        if link in ARTICLE_CACHE and ARTICLE_CACHE[link].get("full_content"):
-            cached = ARTICLE_CACHE[link]
-            # Also check cached timestamp
-            cached_time = cached.get("timestamp")
-            if cached_time:
-                try:
-                    cached_dt = datetime.strptime(cached_time, "%d %b %Y, %I:%M %p")
-                    if cached_dt < cutoff_date:
-                        print(f"Skipping cached old article: {headline[:50]}...")
-                        continue
-                except:
-                    pass
-                    
-            results.append({
+        cached = ARTICLE_CACHE.get(link)
+        if cached is None or not cached.has_body:
+            published = _published(link)
+            if published is not None and published.get("full_content"):
+                # Evicted from the cache but still published: take it back in rather than fetch it again
+                ARTICLE_CACHE[link] = published
+                cached = ARTICLE_CACHE.get(link)
+        if cached is not None and cached.has_body:
+            # Also check cached publish time
+            cached_time = cached.get("published_at")
+            if cached_time is not None and cached_time < cutoff:
+                print(f"Skipping cached old article: {headline[:50]}...")
+                continue
+
+            results.append(tag_article({
                 "category": category_name,
                 "headline": headline,
                 "link": link,
-                **cached
-            })
+                **cached.as_dict()
+            }))
         else:
             # Placeholder for deep fetch (either brand new or missing full_content)
-            results.append({
+            results.append(tag_article({
                 "category": category_name,
                 "headline": headline,
                 "link": link,
                 "image_url": ARTICLE_CACHE.get(link, {}).get("image_url"),
                 # Use listing timestamp if available, otherwise checks cache, or leaves as None to be filled by deep fetch
-                "timestamp": ARTICLE_CACHE.get(link, {}).get("timestamp") or (listing_timestamp.strftime("%d %b %Y, %I:%M %p") if listing_timestamp else None),
+                "published_at": ARTICLE_CACHE.get(link, {}).get("published_at") or (int(listing_timestamp) if listing_timestamp is not None else None),
                 "sentiment": ARTICLE_CACHE.get(link, {}).get("sentiment") or "neutral",
                 "sentiment_score": ARTICLE_CACHE.get(link, {}).get("sentiment_score") or 0.0,
                 "needs_deep_fetch": True 
-            })
+            }))
 
     return results
 
-def deep_fetch_metadata(news_list):
-    """
-    Takes a list of news items and fills in missing metadata (images, real dates, sentiment) in parallel.
-    """
-    to_fetch = [item for item in news_list if item.get("needs_deep_fetch")]
-    if not to_fetch:
-        return news_list
-
-    print(f"Starting deep fetch for {len(to_fetch)} articles...")
-    
-    # Limit workers to avoid overloading sentiment model/network
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_item = {executor.submit(fetch_details_single, item['link'], item): item for item in to_fetch}
-        
-        for future in concurrent.futures.as_completed(future_to_item):
-            item = future_to_item[future]
-            try:
-                details = future.result()
-                # Update item in place
-                item.update(details)
-                item.pop("needs_deep_fetch", None)
-                # Update cache
-                ARTICLE_CACHE[item['link']] = details
-            except Exception as e:
-                print(f"Deep fetch failed for {item['link']}: {e}")
-    
-    return news_list
-
 def scrape_moneycontrol():
     all_scraped_news = []
     
@@ -362,168 +298,490 @@ def scrape_moneycontrol():
                 
     return all_scraped_news
 
+def _published(link):
+    # Looked up in the published dataset, not ARTICLE_CACHE: the cache is bounded, so an evicted article would read as new
+    entry = NEWS_INDEX.by_link.get(link)
+    return entry[2] if entry is not None else None
+
+def _current(entries):
+    # Listing entries build_category_items keeps (older ones are skipped)
+    cutoff = age_cutoff(7)
+    return [link for _, link, listing_timestamp in entries if listing_timestamp is None or listing_timestamp >= cutoff]
+
+def _listing_complete(entries):
+    # Every article already published with its body: nothing downstream to do for this listing
+    for link in _current(entries):
+        item = _published(link)
+        if item is None or item.get("needs_deep_fetch"):
+            return False
+    return True
+
+async def _scrape_cycle(engine, categories, states, publish=None):
+    # Links already taken by a listing this cycle: a story in several categories is processed once
+    listed = set()
+
+    async def listing(batch):
+        name, url = batch[0]
+        print(f"Scraping [{name}] Headlines...")
+        state = states.setdefault(name, {"hits": 0, "not_modified": 0, "misses": 0})
+        if state.get("url") != url:
+            # New or moved listing: stored validators don't apply
+            state.update(url=url, etag=None, last_modified=None, content_hash=None)
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        response = await engine.request(url, headers=headers)
+        if response is None:
+            return []
+        state["last_checked"] = datetime.now()
+        if response.status_code == 304:
+            state["fresh"] = 0
+            state["outcome"] = "not modified"
+            state["hits"] = (state.get("hits") or 0) + 1
+            state["not_modified"] = (state.get("not_modified") or 0) + 1
+            return []
+        entries = await asyncio.to_thread(parse_listing, response.text)
+        # Validators are only kept once every article on the listing has its body: a 304 skips the
+        # listing, so one whose deep fetch was cut short or failed would otherwise never be retried
+        complete = _listing_complete(entries)
+        state["etag"] = response.headers.get("ETag") if complete else None
+        state["last_modified"] = response.headers.get("Last-Modified") if complete else None
+        # Links we have never seen: what the scheduler learns each category's publish rate from
+        state["fresh"] = sum(1 for link in _current(entries) if _published(link) is None)
+        content_hash = listing_hash(entries)
+        if content_hash == state.get("content_hash") and complete:
+            # Same headlines as last cycle: skip building records and the deep fetch
+            state["outcome"] = "unchanged"
+            state["hits"] = (state.get("hits") or 0) + 1
+            return []
+        state["content_hash"] = content_hash
+        state["outcome"] = "changed"
+        state["misses"] = (state.get("misses") or 0) + 1
+        items = await asyncio.to_thread(build_category_items, entries, name)
+        fresh = [item for item in items if item["link"] not in listed]
+        listed.update(item["link"] for item in fresh)
+        return [link_duplicate(item) for item in fresh]
+
+    async def fetch(batch):
+        item = batch[0]
+        if not item.get("needs_deep_fetch"):
+            return [(item, None, False)]
+        html = await engine.fetch(item["link"])
+        if html is None and engine.expired():
+            # Out of time: keep needs_deep_fetch so the next cycle picks it up
+            return [(item, None, False)]
+        return [(item, html, True)]
+
+    def parse(batch):
+        out = []
+        for item, html, fetched in batch:
+            if fetched:
+                archive_page(item["link"], html)
+                item.update(page_details(item["link"], item, html))
+                item.pop("needs_deep_fetch", None)
+                # Near-duplicate check on headline + body, before the model and the embedding
+                item["simhash"] = fingerprint(item)
+                item["duplicate_of"] = DUPLICATES.claim(item)
+            out.append((item, fetched))
+        return out
+
+    def sentiment(batch):
+        fetched = [item for item, was_fetched in batch if was_fetched]
+        # Duplicates take their canonical article's score
+        unscored = [item for item in fetched if not (item.get("duplicate_of") and inherit_sentiment(item))]
+        if unscored:
+            # Scored on the headline, as before, but one model call per batch
+            for item, result in zip(unscored, analyze_sentiments(item.get("headline", "") for item in unscored)):
+                item["sentiment"] = result["label"]
+                item["sentiment_score"] = result["score"]
+        for item in fetched:
+            ARTICLE_CACHE[item["link"]] = item
+        return batch
+
+    def tag_and_embed(batch):
+        fetched = [tag_article(item) for item, was_fetched in batch if was_fetched]
+        # Only articles with new content need (re-)embedding; duplicates are found through their canonical
+        embed = [item for item in fetched if not item.get("duplicate_of")]
+        if embed:
+            ingest_news_articles(embed)
+        return [item for item, _ in batch]
+
+    def publish_batch(batch):
+        if publish is not None:
+            publish(batch)
+        return batch
+
+    global PIPELINE
+    PIPELINE = Pipeline([
+        Stage("listing", listing, workers=PIPELINE_WORKERS["listing"]),
+        Stage("fetch", fetch, workers=PIPELINE_WORKERS["fetch"]),
+        Stage("parse", parse, workers=PIPELINE_WORKERS["parse"], blocking=True),
+        Stage("sentiment", sentiment, workers=PIPELINE_WORKERS["sentiment"], batch=SENTIMENT_BATCH, blocking=True),
+        Stage("tag_embed", tag_and_embed, workers=PIPELINE_WORKERS["tag_embed"], batch=EMBED_BATCH, blocking=True),
+        Stage("publish", publish_batch, workers=PIPELINE_WORKERS["publish"], batch=PUBLISH_BATCH, blocking=True),
+    ])
+    return await PIPELINE.run(categories.items())
+
+def scrape_cycle(categories=None, engine=None, states=None, publish=None):
+    """
+    One scrape of the given categories (default: all) as a streaming
+    pipeline: listing -> fetch -> parse -> sentiment -> tag/embed -> publish,
+    stages joined by bounded queues (see scrape_pipeline). Articles reach
+    publish(batch) as soon as they clear the stages before it, while other
+    pages are still downloading. Returns every article that came through.
+
+    Fetching shares one pooled session with per-host limits and a deadline
+    for the cycle. Listings that haven't changed since the last cycle (304,
+    or the same headlines) are skipped; `states` defaults to
+    category_listing_state. Each polled category's next poll is planned
+    from the new links it showed (see scrape_scheduler).
+    """
+    engine = engine or ScrapeEngine(headers=HEADERS)
+    categories = categories or CATEGORY_URLS
+    persist_states = states is None
+    if persist_states:
+        states = load_listing_states()
+
+    async def run():
+        async with engine:
+            return await _scrape_cycle(engine, categories, states, publish)
+
+    news_list = asyncio.run(run())
+    # Learn from what this cycle found and schedule each category's next poll
+    plan(states, {name: states[name].pop("fresh", None) for name in categories if name in states}, CATEGORY_URLS, datetime.now())
+    if persist_states:
+        store_listing_states(states)
+    stats = engine.stats
+    outcomes = [state.pop("outcome", "failed") for name, state in states.items() if name in categories]
+    duplicates = sum(1 for item in news_list if item.get("duplicate_of"))
+    print(f"Scrape cycle: {len(news_list)} articles ({duplicates} duplicates) in {stats['elapsed']:.1f}s "
+          f"({stats['requests']} requests, {stats['retries']} retries, {stats['failures']} failed, {stats['skipped']} past deadline; "
+          f"listings: {outcomes.count('changed')} changed, {outcomes.count('unchanged')} unchanged, {outcomes.count('not modified')} not modified)")
+    print(f"Scrape pipeline: {PIPELINE.summary()}")
+    return news_list
+
+def load_listing_states():
+    """Per-category conditional GET state, {} if the table isn't there (scraper used standalone)."""
+    db = SessionLocal()
+    try:
+        return get_listing_states(db)
+    except Exception as e:
+        print(f"Could not load listing state: {e}")
+        return {}
+    finally:
+        db.close()
+
+def store_listing_states(states):
+    db = SessionLocal()
+    try:
+        save_listing_states(db, states)
+    except Exception as e:
+        db.rollback()
+        print(f"Could not save listing state: {e}")
+    finally:
+        db.close()
+
 def scrape_article_content(url):
     """
     Scrapes the full text content of a news article.
     """
     try:
-        response = requests.get(url, headers=HEADERS, timeout=10, impersonate="chrome")
+        response = requests.get(url, headers=HEADERS, timeout=ARTICLE_TIMEOUT_SECONDS, impersonate="chrome")
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        # Method 1: Try JSON-LD (Most reliable for Moneycontrol)
-        scripts = soup.find_all("script", type="application/ld+json")
-        for script in scripts:
-            if script.string:
-                try:
-                    data = json.loads(script.string)
-                    # JSON-LD can be a list or direct object
-                    if isinstance(data, list):
-                        for item in data:
-                            if "articleBody" in item:
-                                text = item["articleBody"]
-                                if len(text) > 100:
-                                    return text
-                    elif isinstance(data, dict):
-                        if "articleBody" in data:
-                            text = data["articleBody"]
-                            if len(text) > 100:
-                                return text
-                except json.JSONDecodeError:
-                    continue
-        
-        # Method 2: Fallback to scraping paragraphs
-        # Common text containers on Moneycontrol
-        content_div = soup.find("div", class_="content_wrapper") or \
-                      soup.find("div", class_="arti-flow") or \
-                      soup.find("div", id="article-main")
-                      
-        if content_div:
-            # aggressive cleaning
-            for tag in content_div(["script", "style", "aside", "div.ads", "div.related_news"]):
-                tag.decompose()
-            
-            paragraphs = content_div.find_all("p")
-            clean_text = []
-            for p in paragraphs:
-                text = p.get_text(strip=True)
-                
-                # Filter out garbage commonly causing hallucinations
-                if len(text) < 30: continue # Skip tiny fragments
-                
-                text_lower = text.lower()
-                # Stop phrases that indicate the end of the article
-                if "disclaimer" in text_lower and len(text) < 100: break
-                if "copyright" in text_lower and "all rights reserved" in text_lower: break
-
-                # Skip promotional/link noise
-                noise_phrases = ["read also", "click here", "read more", "follow us on", "download", "whatsapp channel"]
-                if any(phrase in text_lower for phrase in noise_phrases):
-                    continue
-                    
-                clean_text.append(text)
-                
-            return "\n\n".join(clean_text)
-
-        return "Could not extract article content."
+        archive_page(url, response.text)
+        return extract_article(response.text)["full_content"]
 
     except Exception as e:
         print(f"Error scraping article content: {e}")
         return None
 
-def remove_duplicates(existing_news, new_news):
-    existing_links = {item["link"] for item in existing_news}
-    unique_news = []
-    for item in new_news:
-        if item["link"] not in existing_links:
-            unique_news.append(item)
-    return unique_news
-
 # Global background thread lock
-import threading
 scrape_lock = threading.Lock()
+sync_lock = threading.Lock()
 
-def background_scrape_and_save(existing_news):
+def merge_news(existing_news, new_news):
+    """
+    existing + freshly scraped articles (same link: updated in place), minus
+    undated or month-old ones, newest first, capped at 1000.
+    """
+    # Merge logic: Use a map to handle duplicates and updates
+    # new_news contains the freshest data (including full_content)
+    merged_map = {item["link"]: item for item in existing_news}
+    for item in new_news:
+        if item["link"] in merged_map:
+            # Update existing item with new details if it was missing something
+            merged_map[item["link"]].update(item)
+        else:
+            # New item
+            merged_map[item["link"]] = item
+
+    # Convert back to list
+    updated_news = list(merged_map.values())
+
+    # Filter out articles older than 30 days (User requested "this month")
+    cutoff = age_cutoff(30)
+    filtered_news = []
+    for article in updated_news:
+        published_at = article.get("published_at")
+        # STRICT FILTER: Drop if no timestamp, undated ones break the sorting
+        if published_at is None:
+            print(f"Dropping undated article: {article.get('headline', '')[:50]}...")
+            continue
+        if published_at >= cutoff:
+            filtered_news.append(article)
+        else:
+            print(f"Filtering out old article: {article.get('headline', '')[:50]}... (Date: {format_timestamp(published_at)})")
+
+    # Sort by publish time (most recent first)
+    filtered_news.sort(key=lambda x: x["published_at"], reverse=True)
+
+    # Keep only last 1000 items
+    return filtered_news[:1000]
+
+def background_scrape_and_save(existing_news, categories=None):
     if scrape_lock.locked():
         print("Scrape already in progress. Skipping.")
         return
-
-    with scrape_lock:
+    if existing_news is None:
+        # Merge into the latest dataset, whichever process published it
+        sync_shared_news()
+
+    with scrape_lock, FileLock(SCRAPE_LOCK_FILE, blocking=False) as owner:
+        if not owner.acquired:
+            print("Another worker process is scraping. Skipping.")
+            return
         print("Starting background scrape...")
         try:
-            # Phase 1: Fast Headlines Scrape
-            new_scraped_news = scrape_moneycontrol()
+            if existing_news is None:
+                existing_news = NEWS_CACHE
+                if not existing_news:
+                    existing_news = load_existing_news()
+            populate_cache(existing_news)
+
+            dataset = {"news": existing_news, "batches": 0, "pending": [], "published": 0.0}
+            publish_lock = threading.Lock()
+
+            def publish_pending():
+                if not dataset["pending"]:
+                    return
+                batch, dataset["pending"] = dataset["pending"], []
+                dataset["news"] = merge_news(dataset["news"], batch)
+                dataset["batches"] += 1
+                dataset["published"] = time.monotonic()
+                save_news(dataset["news"])
+                # The merged dicts, which publish_news completes (id, symbols) before they are written
+                links = {item["link"] for item in batch}
+                changed = [item for item in dataset["news"] if item["link"] in links]
+                publish_news(dataset["news"], time.time(), changed=changed)
+
+            def publish(batch):
+                # Batches trickle in while fetches complete; each publish rebuilds the index and
+                # clears the response cache, so they are coalesced
+                with publish_lock:
+                    dataset["pending"].extend(batch)
+                    if time.monotonic() - dataset["published"] >= PUBLISH_INTERVAL_SECONDS:
+                        publish_pending()
+
+            # Headlines, deep fetch (Images/Content), sentiment, tagging/embedding and publishing, streamed
+            try:
+                new_scraped_news = scrape_cycle(categories, publish=publish)
+            finally:
+                with publish_lock:
+                    publish_pending()
             if new_scraped_news:
-                # Phase 2: Deep Metadata Fetch (Images/Sentiment/Content)
-                new_scraped_news = deep_fetch_metadata(new_scraped_news)
-                
-                # Merge logic: Use a map to handle duplicates and updates
-                # new_scraped_news contains the freshest data (including full_content)
-                merged_map = {item["link"]: item for item in existing_news}
-                for item in new_scraped_news:
-                    if item["link"] in merged_map:
-                        # Update existing item with new details if it was missing something
-                        merged_map[item["link"]].update(item)
-                    else:
-                        # New item
-                        merged_map[item["link"]] = item
-                
-                # Convert back to list
-                updated_news = list(merged_map.values())
-                
-                # Filter out articles older than 30 days (User requested "this month")
-                cutoff_date = datetime.now() - timedelta(days=30)
-                filtered_news = []
-                for article in updated_news:
-                    try:
-                        timestamp_str = article.get("timestamp")
-                        # STRICT FILTER: Drop if no timestamp
-                        if not timestamp_str:
-                            print(f"Dropping undated article: {article.get('headline', '')[:50]}...")
-                            # REVERT: If user wants old articles, we might need to keep them?
-                            # But undated ones break the sorting.
-                            # Let's keep them but with a default very old date if we want to preserve them?
-                            # No, for now let's just log.
-                            continue
-
-                        article_date = datetime.strptime(timestamp_str, "%d %b %Y, %I:%M %p")
-                        if article_date >= cutoff_date:
-                            filtered_news.append(article)
-                        else:
-                            print(f"Filtering out old article: {article.get('headline', '')[:50]}... (Date: {timestamp_str})")
-                            # If we want to keep them: filtered_news.append(article)
-                    except:
-                        # If we can't parse the date, DROP IT to avoid crashes.
-                        print(f"Dropping article with invalid date: {article.get('headline', '')} ({article.get('timestamp')})")
-                        continue
-                
-                # Sort by timestamp (most recent first)
-                try:
-                    filtered_news.sort(key=lambda x: datetime.strptime(x.get("timestamp", ""), "%d %b %Y, %I:%M %p") if x.get("timestamp") else datetime.min, reverse=True)
-                except:
-                    pass
-
-                # Keep only last 1000 items
-                filtered_news = filtered_news[:1000] 
-                save_news(filtered_news)
-                
-                # Ingest into Vector DB
-                ingest_news_articles(filtered_news)
-                
-                # Update in-memory cache
-                global NEWS_CACHE, LAST_SCRAPE_TIME
-                NEWS_CACHE = filtered_news
-                LAST_SCRAPE_TIME = time.time()
-                
-                print(f"Background scrape finished. Dataset now has {len(filtered_news)} recent articles (filtered from {len(updated_news)} total).")
+                print(f"Background scrape finished. Dataset now has {len(dataset['news'])} recent articles "
+                      f"({len(new_scraped_news)} scraped, published in {dataset['batches']} batches).")
             else:
                 print("Background scrape finished. No articles found.")
         except Exception as e:
             print(f"Background scrape failed: {e}")
+        # The other workers see the finished dataset before anyone else may scrape
+        flush_snapshot()
 
 # In-memory news cache
 NEWS_CACHE = []
+NEWS_INDEX = NewsIndex()
+SEARCH_INDEX = SearchIndex()
 LAST_SCRAPE_TIME = 0
+# Set once the scrape scheduler runs (see scheduled_scrape); reads then stop triggering refreshes
+SCHEDULED_REFRESH = False
+# Set in API-only processes (see use_worker_process): worker.py does all the scraping
+WORKER_SCRAPES = False
+# Bumped on every publish; lets readers cache anything derived from a dataset
+NEWS_GENERATION = 0
+# Called as listener(index, new_items) after every publish (e.g. the live stream)
+PUBLISH_LISTENERS = []
+
+def to_news_row(item):
+    """Maps a scraped article dict onto NewsItem columns."""
+    return {
+        "article_id": item.get("id") or article_id(item["link"]),
+        "title": item.get("headline"),
+        "description": item.get("description"),
+        "link": item["link"],
+        "image_url": item.get("image_url"),
+        "timestamp": to_db(item.get("published_at")),
+        "category": item.get("category"),
+        "sentiment": item.get("sentiment"),
+        "sentiment_score": item.get("sentiment_score"),
+        "full_content": item.get("full_content"),
+        "symbols": item.get("symbols") or [],
+        "duplicate_of": item.get("duplicate_of"),
+    }
+
+def persist_news(news_list):
+    """Upserts articles into news_items. Unchanged rows are not rewritten."""
+    db = SessionLocal()
+    try:
+        written = upsert_news_items(db, [to_news_row(item) for item in news_list if item.get("link")])
+        if written:
+            print(f"Persisted {written} new/changed articles to news_items.")
+    except Exception as e:
+        print(f"Error persisting news to database: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+def backfill_news_items(news_list):
+    """
+    Writes the whole dataset to news_items if any of it is missing there:
+    a database newer than the dataset, or a JSON store from before
+    news_items was filled. Publishes after that only write what changed.
+    """
+    links = {item["link"] for item in news_list if item.get("link")}
+    if not links:
+        return
+    db = SessionLocal()
+    try:
+        stored = count_news_items(db, links)
+    except Exception as e:
+        print(f"Error counting news_items: {e}")
+        return
+    finally:
+        db.close()
+    if stored < len(links):
+        print(f"news_items has {stored} of {len(links)} published articles; backfilling.")
+        persist_news(news_list)
+
+def publish_news(news_list, scrape_time, persist=True, changed=None):
+    """
+    Swaps in a new dataset. The index is built here, once per dataset,
+    so readers never have to re-parse or re-sort timestamps.
+    persist=False for a dataset restored from the snapshot, which is
+    already in the database and on disk. `changed`, when known, are the
+    articles added or updated since the last publish: only those are
+    written to news_items.
+    """
+    global NEWS_CACHE, NEWS_INDEX, LAST_SCRAPE_TIME, NEWS_GENERATION
+    # Fresh scrapes are tagged in scrape_category; this covers data loaded from older files
+    for item in news_list:
+        if "published_at" not in item:
+            normalize_article(item)
+        intern_labels(item)
+        if "duplicate_of" not in item:
+            item["simhash"] = fingerprint(item)
+            item["duplicate_of"] = DUPLICATES.claim(item)
+        if "symbols" not in item:
+            tag_article(item)
+        if "id" not in item and item.get("link"):
+            item["id"] = article_id(item["link"])
+    # After a restart the canonical articles have to be known again before the next scrape
+    DUPLICATES.update(news_list)
+    index = NewsIndex(news_list)
+    # The search index is maintained incrementally: only new or changed articles are tokenized
+    indexed = SEARCH_INDEX.update(news_list)
+    if indexed:
+        print(f"Search index: tokenized {indexed} articles ({len(SEARCH_INDEX)} indexed).")
+    if persist:
+        persist_news(news_list if changed is None else changed)
+        schedule_snapshot(news_list, scrape_time)
+    previous = NEWS_INDEX
+    NEWS_CACHE = news_list
+    NEWS_GENERATION += 1
+    index.generation = NEWS_GENERATION
+    NEWS_INDEX = index
+    LAST_SCRAPE_TIME = scrape_time
+
+    # Nothing is new to a process that had no dataset yet (startup, a cold start with no data,
+    # an API_ONLY process's first sync): otherwise every stream subscriber would get all of it
+    new_items = [item for item in index if item.get("link") not in previous.by_link] if previous.by_link else []
+    for listener in PUBLISH_LISTENERS:
+        try:
+            listener(index, new_items)
+        except Exception as e:
+            print(f"Publish listener failed: {e}")
+
+def schedule_snapshot(news_list, scrape_time):
+    """Queues a snapshot of this dataset; the indexes are exported when it is written."""
+    if NEWS_SNAPSHOT is None:
+        return
+    # Copied now: merge_news updates the published dicts in place on the next batch
+    items = [dict(item) for item in news_list]
+    store_version = NEWS_STORE.version()
+
+    def capture():
+        header = {"store_version": store_version, "scrape_time": scrape_time}
+        return header, {"items": items, "search": SEARCH_INDEX.export(), "duplicates": DUPLICATES.export()}
+
+    NEWS_SNAPSHOT.schedule(capture)
+
+def load_snapshot(follow=False):
+    """
+    Startup: publishes the last snapshot if the store on disk hasn't
+    changed since it was taken. follow=True: publishes any newer
+    generation (another process scraped). Returns True if it did.
+    """
+    if NEWS_SNAPSHOT is None:
+        return False
+    start = time.perf_counter()
+    if follow:
+        snapshot = NEWS_SNAPSHOT.load(newer_than=LAST_SCRAPE_TIME)
+    else:
+        snapshot = NEWS_SNAPSHOT.load(NEWS_STORE.version())
+    if snapshot is None:
+        return False
+    header, sections = snapshot
+    news_list = sections["items"]
+    SEARCH_INDEX.restore(sections["search"])
+    DUPLICATES.restore(sections["duplicates"])
+    # Items are already tagged and fingerprinted; the search update only reconciles signatures
+    publish_news(news_list, header["scrape_time"], persist=False)
+    print(f"Loaded {len(news_list)} articles from snapshot generation {header['generation']} "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms.")
+    return True
+
+def sync_shared_news():
+    """
+    Publishes the dataset another worker process scraped, if the shared
+    snapshot has a newer generation than ours: no JSON parsing, no
+    re-tokenizing. A single stat when nothing changed.
+    """
+    if NEWS_SNAPSHOT is None or scrape_lock.locked() or not NEWS_SNAPSHOT.changed():
+        return False
+    # One thread loads it; the others keep serving the current dataset meanwhile
+    if not sync_lock.acquire(blocking=False):
+        return False
+    try:
+        return load_snapshot(follow=True)
+    finally:
+        sync_lock.release()
+
+def warm_news():
+    """
+    Startup, before traffic: the dataset from the snapshot, else from the
+    JSON store. With nothing on disk the first read still waits for a scrape.
+    """
+    if not load_snapshot() and NEWS_STORE.exists():
+        get_latest_news()
+    # news_items has to hold the same articles for NEWS_BACKEND=sql
+    backfill_news_items(NEWS_CACHE)
+
+def flush_snapshot():
+    if NEWS_SNAPSHOT is not None:
+        NEWS_SNAPSHOT.flush()
 
 def get_latest_news():
     """
@@ -532,6 +790,9 @@ def get_latest_news():
     If no data exists, waits for a scrape (blocking).
     """
     global NEWS_CACHE, LAST_SCRAPE_TIME
+
+    # 0. Another worker process may have published a newer dataset
+    sync_shared_news()
     
     # 1. Check in-memory cache first
     if NEWS_CACHE and (time.time() - LAST_SCRAPE_TIME < 300):
@@ -539,22 +800,27 @@ def get_latest_news():
 
     # 2. Load Existing from Disk if memory cache is empty/stale
     existing_news = []
-    if os.path.exists(JSON_FILE):
-        existing_news = load_existing_news()
-        
-        # Populate Cache for faster scraping
-        populate_cache(existing_news)
-        
-        last_modified = os.path.getmtime(JSON_FILE)
-        
-        # Update memory cache
-        NEWS_CACHE = existing_news
-        LAST_SCRAPE_TIME = last_modified
+    if NEWS_STORE.exists():
+        last_modified = NEWS_STORE.last_modified()
+
+        if NEWS_CACHE and (last_modified <= LAST_SCRAPE_TIME or FileLock(SCRAPE_LOCK_FILE).held_elsewhere()):
+            # Memory already holds this file's contents (or newer), skip the re-parse.
+            # While a scrape is running its snapshots bring the changes instead
+            existing_news = NEWS_CACHE
+        else:
+            existing_news = load_existing_news()
+
+            # Update memory cache
+            publish_news(existing_news, last_modified)
 
         # 300 seconds = 5 minutes cache life
         if time.time() - last_modified < 300 and existing_news: 
             return existing_news
         
+        # The scrape scheduler keeps the data fresh; reads don't need to trigger anything
+        if existing_news and SCHEDULED_REFRESH:
+            return existing_news
+
         # Cache is expired, but we have data to show while updating
         if existing_news:
             print("Cache expired. Serving stale data and triggering background refresh...")
@@ -564,19 +830,31 @@ def get_latest_news():
             thread.start()
             return existing_news
 
+    if WORKER_SCRAPES:
+        # Nothing scraped yet; the worker's first scrape shows up through the shared snapshot
+        return []
+
     # 2. No Data (or empty file) - Must Block
-    print("No existing data. Blocking for initial FAST scrape...")
-    new_scraped_news = scrape_moneycontrol() # Only headlines
+    with FileLock(SCRAPE_LOCK_FILE):
+        # Another worker process may have done the initial scrape while we waited
+        if NEWS_STORE.exists() and not NEWS_CACHE:
+            existing_news = load_existing_news()
+            if existing_news:
+                publish_news(existing_news, NEWS_STORE.last_modified())
+                return existing_news
+        print("No existing data. Blocking for initial FAST scrape...")
+        new_scraped_news = scrape_moneycontrol() # Only headlines
+        if new_scraped_news:
+            save_news(new_scraped_news)
+            publish_news(new_scraped_news, time.time())
+
     if new_scraped_news:
-        save_news(new_scraped_news)
-        
         # Trigger background deep fetch for details
         print("Initial fast scrape complete. Starting background deep fetch for details...")
         thread = threading.Thread(target=background_scrape_and_save, args=(new_scraped_news,))
         thread.daemon = True
         thread.start()
         
-        NEWS_CACHE = new_scraped_news
         return new_scraped_news
     
     return []
@@ -585,5 +863,62 @@ def get_latest_news():
 def get_latest_news_raw():
     return get_latest_news()
 
+def refresh_if_stale():
+    """
+    Triggers a background refresh when the data is older than 5 mins,
+    without loading the dataset on the calling thread (used by the SQL path).
+    """
+    last_update = max(LAST_SCRAPE_TIME, NEWS_STORE.last_modified())
+    if SCHEDULED_REFRESH or time.time() - last_update < 300 or scrape_lock.locked():
+        return
+    thread = threading.Thread(target=background_scrape_and_save, args=(None,))
+    thread.daemon = True
+    thread.start()
+
+def use_scheduled_refresh():
+    """Hands refreshing over to scheduled_scrape: stale reads no longer start a scrape."""
+    global SCHEDULED_REFRESH
+    SCHEDULED_REFRESH = True
+
+def use_worker_process():
+    """API-only process: never scrapes, not even when there is no data yet; follows worker.py's snapshots."""
+    global WORKER_SCRAPES
+    use_scheduled_refresh()
+    WORKER_SCRAPES = True
+
+def scheduled_scrape():
+    """
+    One scheduler tick (every TICK_SECONDS): scrapes just the categories
+    whose adaptive poll interval has run out, whatever the request traffic.
+    """
+    sync_shared_news()
+    due = due_categories(load_listing_states(), CATEGORY_URLS, datetime.now())
+    if due:
+        print(f"Scheduled scrape: {', '.join(due)}")
+        background_scrape_and_save(None, categories=due)
+
+def get_news_index():
+    """Same refresh semantics as get_latest_news, but returns the index."""
+    get_latest_news()
+    return NEWS_INDEX
+
+def add_publish_listener(listener):
+    PUBLISH_LISTENERS.append(listener)
+
+def current_news_index():
+    """The published index as-is, without the staleness check."""
+    return NEWS_INDEX
+
+def pipeline_stats():
+    """Queue depths and per-stage throughput of the running (or last) scrape, None before the first."""
+    return PIPELINE.stats() if PIPELINE is not None else None
+
+def get_news_generation():
+    return NEWS_GENERATION
+
+def search_news(q, truncated=None):
+    """Full-text search over the published dataset. Returns {link: score} (see SearchIndex.search)."""
+    return SEARCH_INDEX.search(q, truncated)
+
 if __name__ == "__main__":
     print(get_latest_news())
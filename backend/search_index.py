@@ -0,0 +1,324 @@
+import bisect
+import hashlib
+import heapq
+import math
+import re
+import threading
+from array import array
+
+# Field weights for ranking, in half-points so they fit in the postings array.
+# Headlines matter most, bodies least.
+FIELD_WEIGHTS = (
+    ("headline", 6),
+    ("description", 4),
+    ("category", 3),
+    ("full_content", 2),
+)
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Prefix terms shorter than this only match exactly (one letter would expand to half the vocabulary)
+MIN_PREFIX_LEN = 2
+# A prefix matching more terms than this keeps the ones in the most documents (see search)
+MAX_PREFIX_EXPANSIONS = 64
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text or "").lower())
+
+def signature(item):
+    """Digest of the indexed fields; stable across processes so a saved index can be checked against items."""
+    text = "\x1f".join(str(item.get(field) or "") for field, _ in FIELD_WEIGHTS)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+
+def encode_postings(plist):
+    """One term's postings as flat bytes: doc_id, entry length, entry, ... (see decode_postings)."""
+    flat = array("I")
+    for doc_id, entry in plist.items():
+        flat.append(doc_id)
+        flat.append(len(entry))
+        flat.extend(entry)
+    return flat.tobytes()
+
+def decode_postings(data):
+    flat = array("I")
+    flat.frombytes(data)
+    plist, i = {}, 0
+    while i < len(flat):
+        size = flat[i + 1]
+        plist[flat[i]] = flat[i + 2:i + 2 + size]
+        i += 2 + size
+    return plist
+
+def parse_query(q):
+    """
+    Splits a query into clauses. Every clause must match (AND).
+      "exact phrase"  -> ("phrase", [terms])
+      tata*           -> ("prefix", "tata")
+      tata            -> ("term", "tata")
+    The last bare word is treated as a prefix so search-as-you-type keeps working.
+    """
+    clauses = []
+    for phrase, word in QUERY_RE.findall(q or ""):
+        if phrase:
+            terms = tokenize(phrase)
+            if len(terms) > 1:
+                clauses.append(("phrase", terms))
+            elif terms:
+                clauses.append(("term", terms[0]))
+            continue
+        is_prefix = word.endswith("*")
+        for term in tokenize(word):
+            clauses.append(("prefix" if is_prefix else "term", term))
+
+    if clauses and clauses[-1][0] == "term" and not q.rstrip().endswith('"'):
+        clauses[-1] = ("prefix", clauses[-1][1])
+    return clauses
+
+class SearchIndex:
+    """
+    Positional inverted index over headline, description, category and body.
+
+    Postings map term -> {doc_id: array([weighted_tf, pos, pos, ...])}; one
+    flat array per posting keeps ~1000 articles with bodies at a few tens of
+    MB. Documents are added, replaced and removed incrementally as datasets
+    are published, so a query only touches the postings of its own terms.
+    An index restored from a snapshot keeps each term's postings as bytes
+    until the term is first used (_plist).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.postings = {}
+        self.vocab = []        # sorted, for prefix lookups
+        self.doc_ids = {}      # link -> doc_id
+        self.links = {}        # doc_id -> link
+        self.doc_terms = {}    # doc_id -> terms, used to retract postings
+        self.doc_len = {}
+        self.signatures = {}   # doc_id -> signature() of indexed text
+        self.df = {}           # term -> number of documents, without decoding postings
+        self.total_len = 0
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def update(self, news_items):
+        """
+        Brings the index in line with a published dataset.
+        Only new or changed articles are tokenized; dropped ones are retracted.
+        """
+        added = 0
+        with self._lock:
+            seen = set()
+            for item in news_items:
+                link = item.get("link")
+                if not link:
+                    continue
+                seen.add(link)
+                digest = signature(item)
+                doc_id = self.doc_ids.get(link)
+                if doc_id is not None:
+                    if self.signatures[doc_id] == digest:
+                        continue
+                    self._remove(doc_id)
+                self._add(link, item, digest)
+                added += 1
+
+            for link in [l for l in self.doc_ids if l not in seen]:
+                self._remove(self.doc_ids[link])
+        return added
+
+    def export(self):
+        """The index as plain values for a snapshot (marshal-able; postings as encoded bytes)."""
+        with self._lock:
+            postings = {
+                term: plist if isinstance(plist, bytes) else encode_postings(plist)
+                for term, plist in self.postings.items()
+            }
+            return {
+                "postings": postings,
+                "doc_ids": dict(self.doc_ids),
+                "doc_terms": dict(self.doc_terms),
+                "doc_len": dict(self.doc_len),
+                "signatures": dict(self.signatures),
+                "df": dict(self.df),
+                "total_len": self.total_len,
+                "next_id": self._next_id,
+            }
+
+    def restore(self, state):
+        """Replaces the index with an export(); postings are decoded lazily."""
+        with self._lock:
+            self.postings = dict(state["postings"])
+            self.vocab = sorted(self.postings)
+            self.doc_ids = dict(state["doc_ids"])
+            self.links = {doc_id: link for link, doc_id in self.doc_ids.items()}
+            self.doc_terms = dict(state["doc_terms"])
+            self.doc_len = dict(state["doc_len"])
+            self.signatures = dict(state["signatures"])
+            if "df" in state:
+                self.df = dict(state["df"])
+            else:
+                # Snapshots written before document frequencies were exported
+                self.df = {}
+                for terms in self.doc_terms.values():
+                    for term in terms:
+                        self.df[term] = self.df.get(term, 0) + 1
+            self.total_len = state["total_len"]
+            self._next_id = state["next_id"]
+
+    def _plist(self, term):
+        plist = self.postings[term]
+        if isinstance(plist, bytes):
+            plist = self.postings[term] = decode_postings(plist)
+        return plist
+
+    def _add(self, link, item, signature):
+        doc_id = self._next_id
+        self._next_id += 1
+
+        terms = {}
+        pos = 0
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(item.get(field)):
+                entry = terms.get(token)
+                if entry is None:
+                    entry = terms[token] = array("I", (0,))
+                entry[0] += weight
+                entry.append(pos)
+                pos += 1
+            # Leave a gap so phrases never match across field boundaries
+            pos += 1
+
+        for term, entry in terms.items():
+            if term in self.postings:
+                plist = self._plist(term)
+            else:
+                plist = self.postings[term] = {}
+                bisect.insort(self.vocab, term)
+            plist[doc_id] = entry
+            self.df[term] = self.df.get(term, 0) + 1
+
+        self.doc_ids[link] = doc_id
+        self.links[doc_id] = link
+        self.doc_terms[doc_id] = tuple(terms)
+        self.doc_len[doc_id] = pos
+        self.signatures[doc_id] = signature
+        self.total_len += pos
+
+    def _remove(self, doc_id):
+        for term in self.doc_terms.pop(doc_id):
+            plist = self._plist(term)
+            del plist[doc_id]
+            self.df[term] -= 1
+            if not plist:
+                del self.postings[term]
+                del self.df[term]
+                del self.vocab[bisect.bisect_left(self.vocab, term)]
+        link = self.links.pop(doc_id)
+        del self.doc_ids[link]
+        self.total_len -= self.doc_len.pop(doc_id)
+        del self.signatures[doc_id]
+
+    def _expand(self, prefix):
+        """(terms the prefix stands for, how many it matched before the MAX_PREFIX_EXPANSIONS cut)."""
+        if len(prefix) < MIN_PREFIX_LEN:
+            terms = [prefix] if prefix in self.postings else []
+            return terms, len(terms)
+        lo = bisect.bisect_left(self.vocab, prefix)
+        hi = bisect.bisect_left(self.vocab, prefix + "\uffff", lo)
+        terms = self.vocab[lo:hi]
+        if len(terms) > MAX_PREFIX_EXPANSIONS:
+            return heapq.nlargest(MAX_PREFIX_EXPANSIONS, terms, key=self.df.__getitem__), len(terms)
+        return terms, len(terms)
+
+    def _bm25(self, term, doc_ids, scores):
+        plist = self._plist(term)
+        n = len(self.doc_ids)
+        idf = math.log(1 + (n - len(plist) + 0.5) / (len(plist) + 0.5))
+        avg_len = self.total_len / n if n else 1.0
+        for doc_id in doc_ids:
+            wtf = plist[doc_id][0] / 2
+            norm = K1 * (1 - B + B * self.doc_len[doc_id] / avg_len)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * wtf * (K1 + 1) / (wtf + norm)
+
+    def _phrase_docs(self, terms, candidates):
+        plists = [self._plist(t) for t in terms]
+        matched = set()
+        for doc_id in candidates:
+            later = [set(p[doc_id][1:]) for p in plists[1:]]
+            for start in plists[0][doc_id][1:]:
+                if all(start + i + 1 in positions for i, positions in enumerate(later)):
+                    matched.add(doc_id)
+                    break
+        return matched
+
+    def search(self, q, truncated=None):
+        """
+        Returns {link: score} for documents matching every clause of `q`.
+        Cost depends on the postings of the query terms, not corpus size.
+
+        A prefix matching more than MAX_PREFIX_EXPANSIONS terms only stands
+        for the ones in the most documents, so rare completions of a short
+        prefix can be missed. Such prefixes are appended to `truncated` as
+        (prefix, terms kept, terms matched).
+        """
+        clauses = parse_query(q)
+        if not clauses:
+            return {}
+
+        with self._lock:
+            # Resolve each clause to the terms whose postings it unions
+            resolved = []
+            for kind, value in clauses:
+                if kind == "phrase":
+                    if not all(t in self.postings for t in value):
+                        return {}
+                    resolved.append((kind, value, value))
+                else:
+                    if kind == "prefix":
+                        terms, matched = self._expand(value)
+                        if truncated is not None and matched > len(terms):
+                            truncated.append((value, len(terms), matched))
+                    else:
+                        terms = [value] if value in self.postings else []
+                    if not terms:
+                        return {}
+                    resolved.append((kind, value, terms))
+
+            def clause_docs(entry):
+                kind, value, terms = entry
+                if kind == "phrase":
+                    plists = sorted((self._plist(t) for t in terms), key=len)
+                    return set(plists[0]).intersection(*plists[1:])
+                docs = set()
+                for t in terms:
+                    docs.update(self._plist(t))
+                return docs
+
+            # Intersect smallest clause first
+            doc_sets = sorted((clause_docs(entry) for entry in resolved), key=len)
+            candidates = set(doc_sets[0])
+            for docs in doc_sets[1:]:
+                candidates.intersection_update(docs)
+                if not candidates:
+                    return {}
+
+            for kind, value, terms in resolved:
+                if kind == "phrase":
+                    candidates = self._phrase_docs(terms, candidates)
+                    if not candidates:
+                        return {}
+
+            scores = {}
+            for kind, value, terms in resolved:
+                for t in terms:
+                    plist = self._plist(t)
+                    self._bm25(t, [d for d in candidates if d in plist], scores)
+
+            return {self.links[doc_id]: score for doc_id, score in scores.items()}
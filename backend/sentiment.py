@@ -42,6 +42,21 @@ def analyze_sentiment(text):
     
     return {"label": "neutral", "score": 0.0}
 
+def analyze_sentiments(texts, batch_size=32):
+    """analyze_sentiment for many texts, run through the model in batches."""
+    texts = list(texts)
+    if nlp is None:
+        init_model()
+    if nlp is None:
+        return [{"label": "neutral", "score": 0.0} for _ in texts]
+
+    try:
+        return nlp(texts, batch_size=batch_size)
+    except Exception as e:
+        print(f"Error in batch sentiment analysis: {e}")
+
+    return [analyze_sentiment(text) for text in texts]
+
 if __name__ == "__main__":
     init_model()
     print(analyze_sentiment("Stocks match records as investors continue to confirm"))
@@ -0,0 +1,177 @@
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+# Keys of a SharedCache share this many cross-process fetch locks
+FETCH_LOCK_SLOTS = 64
+# A process records a reader's interest in a key at most this often (see note_request)
+REQUEST_NOTE_SECONDS = 60
+
+class FileLock:
+    """
+    Exclusive flock on a side file, shared by every process (uvicorn
+    workers, analysis.py) that opens the same path. With blocking=False,
+    check `acquired` inside the with block. A no-op that always acquires
+    where fcntl isn't available (Windows).
+    """
+
+    def __init__(self, path, blocking=True):
+        self.path = path
+        self.blocking = blocking
+        self.fd = None
+        self.acquired = False
+
+    def __enter__(self):
+        if not HAS_FCNTL:
+            self.acquired = True
+            return self
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX if self.blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self.acquired = True
+        except BlockingIOError:
+            os.close(self.fd)
+            self.fd = None
+        return self
+
+    def __exit__(self, *exc):
+        if self.fd is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+            os.close(self.fd)
+            self.fd = None
+        self.acquired = False
+
+    def held_elsewhere(self):
+        """True if another process (or another FileLock) holds the lock right now."""
+        with FileLock(self.path, blocking=False) as probe:
+            return not probe.acquired
+
+class SharedCache:
+    """
+    Small JSON values with a fetch time, in an SQLite file every worker
+    process opens, so an upstream (yfinance, the live quote scraper) is
+    asked once per TTL instead of once per worker.
+
+    get_or_fetch() is single-flight across processes: on a miss the key's
+    slot in a byte-range lock file is taken, the cache re-checked, and only
+    then is fetch() called. Readers never wait on a fetch of another key
+    (unless it hashes to the same slot).
+
+    note_request()/requested_since() track which keys readers actually
+    ask for, so a prefetch can stick to those.
+    """
+
+    def __init__(self, path, slots=FETCH_LOCK_SLOTS):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.slots = slots
+        self._local = threading.local()
+        self._thread_locks = [threading.Lock() for _ in range(slots)]
+        self._schema_ready = False
+        self._lock_fd = None
+        self._noted = {}  # key -> when this process last recorded a request for it
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE TABLE IF NOT EXISTS requests (key TEXT PRIMARY KEY, requested_at REAL NOT NULL)")
+                self._schema_ready = True
+        return conn
+
+    def get(self, key, max_age):
+        """(value, fetched_at) if `key` was fetched less than max_age seconds ago, else None."""
+        try:
+            row = self._conn().execute("SELECT value, fetched_at FROM cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Shared cache: read failed for {key}: {e}")
+            return None
+        if row is None or time.time() - row[1] >= max_age:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def put(self, key, value, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache (key, value, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, default=_plain), fetched_at),
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Shared cache: write failed for {key}: {e}")
+        return fetched_at
+
+    def get_or_fetch(self, key, max_age, fetch):
+        """
+        (value, fetched_at): the cached value if fresh, else fetch()'s,
+        stored for the other processes. None results are not cached.
+        """
+        entry = self.get(key, max_age)
+        if entry is not None:
+            return entry
+        slot = zlib.crc32(key.encode("utf-8")) % self.slots
+        # Record locks don't exclude threads of the same process, hence the thread lock too
+        with self._thread_locks[slot], self._slot_lock(slot):
+            entry = self.get(key, max_age)
+            if entry is not None:
+                return entry
+            value = fetch()
+            if value is None:
+                return None, time.time()
+            return value, self.put(key, value)
+
+    def note_request(self, key):
+        """Records that a reader asked for `key` (one write per key per REQUEST_NOTE_SECONDS per process)."""
+        now = time.time()
+        if now - self._noted.get(key, 0) < REQUEST_NOTE_SECONDS:
+            return
+        self._noted[key] = now
+        try:
+            self._conn().execute("INSERT OR REPLACE INTO requests (key, requested_at) VALUES (?, ?)", (key, now))
+        except sqlite3.Error as e:
+            print(f"Shared cache: request note failed for {key}: {e}")
+
+    def requested_since(self, since):
+        """Keys a reader asked for since `since` (epoch), give or take REQUEST_NOTE_SECONDS."""
+        try:
+            rows = self._conn().execute("SELECT key FROM requests WHERE requested_at >= ?", (since,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Shared cache: request lookup failed: {e}")
+            return []
+        return [key for (key,) in rows]
+
+    @contextlib.contextmanager
+    def _slot_lock(self, slot):
+        # lockf on one byte of the lock file per slot. Record locks belong to the process and
+        # closing any descriptor of the file drops them all, so one descriptor stays open
+        if not HAS_FCNTL:
+            yield
+            return
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, slot)
+        try:
+            yield
+        finally:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, slot)
+
+def _plain(value):
+    # numpy scalars out of yfinance/pandas
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
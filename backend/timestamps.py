@@ -0,0 +1,117 @@
+import functools
+import re
+import time
+from datetime import date, datetime, timedelta, timezone
+
+# MoneyControl publishes in Indian time; values without a zone are read as IST
+IST = timezone(timedelta(hours=5, minutes=30), "IST")
+IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+
+# How the API, emails and RAG documents show a publish time
+DISPLAY_FORMAT = "%d %b %Y, %I:%M %p"
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+_MONTHS = {name: i for i, name in enumerate(
+    ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+
+# Optional ", 01:06 PM" / " 13:06" / " 13:06 IST" after the date
+_TIME = r"(?:,?\s+(?P<H>\d{1,2}):(?P<M>\d{2})(?::\d{2})?(?:\s*(?P<ap>[AaPp][Mm]))?)?(?:\s+IST)?\s*$"
+# "27 Jan 2026, 01:06 PM" (the old stored format), "27 January 2026", "27 Jan 2026"
+_DAY_FIRST = re.compile(r"^\s*(?P<d>\d{1,2})\s+(?P<mon>[A-Za-z]{3,9})\.?,?\s+(?P<y>\d{4})" + _TIME)
+# "January 27, 2026 13:06 IST", "Jan 27, 2026"
+_MONTH_FIRST = re.compile(r"^\s*(?P<mon>[A-Za-z]{3,9})\.?\s+(?P<d>\d{1,2}),?\s+(?P<y>\d{4})" + _TIME)
+# "27-01-2026 13:06:00"
+_NUMERIC_DAY_FIRST = re.compile(r"^\s*(?P<d>\d{1,2})-(?P<mon>\d{1,2})-(?P<y>\d{4})" + _TIME)
+
+def _ist_epoch(year, month, day, hour=0, minute=0):
+    return (date(year, month, day).toordinal() - _EPOCH_ORDINAL) * 86400 + hour * 3600 + minute * 60 - IST_OFFSET_SECONDS
+
+def _from_match(match):
+    mon = match.group("mon")
+    month = int(mon) if mon.isdigit() else _MONTHS.get(mon[:3].lower())
+    if month is None:
+        return None
+    hour = int(match.group("H") or 0)
+    minute = int(match.group("M") or 0)
+    ap = match.group("ap")
+    if ap:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if ap[0] in "Pp" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    try:
+        return float(_ist_epoch(int(match.group("y")), month, int(match.group("d")), hour, minute))
+    except ValueError:
+        return None
+
+def parse_timestamp(value):
+    """
+    Epoch seconds for a publish time in any of the forms the source uses
+    (ISO from JSON-LD, MoneyControl's display and listing formats), an
+    epoch number or a datetime. Naive values are IST. None if unparseable.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, datetime):
+        return (value if value.tzinfo else value.replace(tzinfo=IST)).timestamp()
+    if not isinstance(value, str):
+        return None
+    # Precompiled patterns first: no strptime locale/format machinery on the hot path
+    for pattern in (_DAY_FIRST, _MONTH_FIRST, _NUMERIC_DAY_FIRST):
+        match = pattern.match(value)
+        if match:
+            return _from_match(match)
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return (dt if dt.tzinfo else dt.replace(tzinfo=IST)).timestamp()
+
+@functools.lru_cache(maxsize=8192)
+def format_timestamp(epoch):
+    """Display form of an epoch ("27 Jan 2026, 01:06 PM", IST); None stays None."""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, IST).strftime(DISPLAY_FORMAT)
+
+def to_ist(epoch):
+    """Timezone-aware IST datetime for an epoch."""
+    return datetime.fromtimestamp(epoch, IST)
+
+def to_db(epoch):
+    """Column value for an epoch: naive UTC, the convention for every stored DateTime of article times."""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None)
+
+def from_db(dt):
+    """Epoch for a naive-UTC column value (see to_db)."""
+    if dt is None:
+        return None
+    return dt.replace(tzinfo=timezone.utc).timestamp()
+
+def published_at(item):
+    """An article's canonical publish time, falling back to a legacy display string."""
+    epoch = item.get("published_at")
+    if epoch is not None:
+        return epoch
+    return parse_timestamp(item.get("timestamp"))
+
+def normalize_article(item):
+    """
+    Ingest step: sets the canonical "published_at" (epoch seconds, or None)
+    and drops the display-string "timestamp" that older datasets stored.
+    Returns the item.
+    """
+    epoch = published_at(item)
+    item["published_at"] = int(epoch) if epoch is not None else None
+    item.pop("timestamp", None)
+    return item
+
+def age_cutoff(days, now=None):
+    """Epoch `days` before now."""
+    return (now if now is not None else time.time()) - days * 86400
@@ -0,0 +1,154 @@
+import heapq
+import math
+import threading
+import time
+
+# A view loses half its weight every 6 hours
+HALF_LIFE_SECONDS = 6 * 3600
+# An article published just now scores like this many fresh views
+RECENCY_WEIGHT = 2.0
+# filter_type=trending: more than recency alone can give, i.e. real recent views
+TRENDING_MIN_SCORE = 5.0
+# Rebase stored scores before exp() gets anywhere near overflow
+MAX_EXPONENT = 300
+# Views older than this weigh under 1/1000 of a fresh one: replayed at startup, then pruned
+HORIZON_SECONDS = 10 * HALF_LIFE_SECONDS
+# Scores decayed below one view from the horizon are forgotten
+SCORE_FLOOR = 2.0 ** -(HORIZON_SECONDS / HALF_LIFE_SECONDS)
+
+class TrendingEngine:
+    """
+    Time-decayed popularity, updated one view at a time.
+
+    score = RECENCY_WEIGHT * 2^-(age of article / half-life)
+          + sum over views of 2^-(age of view / half-life)
+
+    Every term decays at the same rate, so scores are stored scaled to a
+    fixed reference time and the ranking only changes when a view arrives
+    or an article is published. A max-heap with lazy invalidation serves
+    top-K without touching the rest.
+
+    Views arrive through apply_views() from the shared view log, not per
+    click, so every worker process computes the same scores and counts.
+    """
+
+    def __init__(self, half_life=HALF_LIFE_SECONDS, recency_weight=RECENCY_WEIGHT):
+        self.rate = math.log(2) / half_life
+        self.recency_weight = recency_weight
+        self.reference = time.time()
+        self.scores = {}   # link -> score as of self.reference
+        self.views = {}    # link -> total views, as of the last apply_views
+        self._heap = []    # (-score, link); stale when the score has moved on
+        self.last_view_id = 0  # view log entries up to here are applied
+        self._dated = set()    # links whose recency is in their score
+        # Bumped whenever views change counts or scores, since both are part of the /news payload
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _scale(self, t):
+        exponent = self.rate * (t - self.reference)
+        if exponent > MAX_EXPONENT:
+            self._rebase(t)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def _rebase(self, t):
+        factor = math.exp(-self.rate * (t - self.reference))
+        self.reference = t
+        self.scores = {link: score * factor for link, score in self.scores.items()}
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(-score, link) for link, score in self.scores.items()]
+        heapq.heapify(self._heap)
+
+    def _bump(self, link, amount):
+        old = self.scores.get(link)
+        score = (old or 0.0) + amount
+        if score == old:
+            # Nothing moved (e.g. the recency of an old article underflows to 0): a second
+            # heap entry with the same score would not read as stale, and list the link twice
+            return
+        self.scores[link] = score
+        heapq.heappush(self._heap, (-score, link))
+        # Stale entries pile up with every bump; compact once they dominate
+        if len(self._heap) > 2 * len(self.scores) + 64:
+            self._rebuild()
+
+    def apply_views(self, entries, totals):
+        """
+        Applies view log entries [(id, link, views, epoch)] past last_view_id
+        to the scores, and {link: total views} to the counts.
+        """
+        with self._lock:
+            changed = False
+            for entry_id, link, views, epoch in entries:
+                if entry_id <= self.last_view_id:
+                    continue
+                self._bump(link, views * self._scale(epoch))
+                self.last_view_id = entry_id
+                changed = True
+            for link, views in totals.items():
+                if self.views.get(link) != views:
+                    self.views[link] = views or 0
+                    changed = True
+            if changed:
+                self.version += 1
+
+    def publish(self, index, new_items):
+        """
+        Publish listener: adds recency for articles not seen before and
+        forgets scores that have decayed to nothing. Goes by the index rather
+        than new_items, which is empty on a process's first publish. Articles
+        that leave the index keep their scores: NEWS_BACKEND=sql still serves
+        them from news_items.
+        """
+        with self._lock:
+            for link, (epoch, _, _) in index.by_link.items():
+                if link in self._dated:
+                    continue
+                self._dated.add(link)
+                if epoch != float("-inf"):
+                    self._bump(link, self.recency_weight * self._scale(epoch))
+            self._dated.intersection_update(index.by_link)
+            floor = SCORE_FLOOR * math.exp(self.rate * (time.time() - self.reference))
+            dropped = [link for link, score in self.scores.items() if score < floor]
+            for link in dropped:
+                del self.scores[link]
+            if dropped:
+                self._rebuild()
+
+    def score(self, link, now=None):
+        """Current decayed score."""
+        with self._lock:
+            stored = self.scores.get(link, 0.0)
+            return stored * math.exp(-self.rate * ((now or time.time()) - self.reference))
+
+    def top(self, k=None, min_score=None, now=None):
+        """
+        Links by descending score: at most k, and only those scoring at
+        least min_score right now. Costs O(k log n), not a full sort.
+        """
+        with self._lock:
+            threshold = None
+            if min_score is not None:
+                threshold = min_score * math.exp(self.rate * ((now or time.time()) - self.reference))
+            result = []
+            popped = []
+            while self._heap and (k is None or len(result) < k):
+                neg_score, link = heapq.heappop(self._heap)
+                if self.scores.get(link) != -neg_score:
+                    continue  # stale entry, drop it for good
+                popped.append((neg_score, link))
+                if threshold is not None and -neg_score < threshold:
+                    break
+                result.append(link)
+            for entry in popped:
+                heapq.heappush(self._heap, entry)
+            return result
+
+    def sort(self, items, link=lambda item: item["link"]):
+        """Sorts a filtered list of articles by score (stable, so ties keep their order)."""
+        with self._lock:
+            scores = dict(self.scores)
+        return sorted(items, key=lambda item: scores.get(link(item), 0.0), reverse=True)
@@ -0,0 +1,87 @@
+import threading
+
+from database import add_views
+from trending import HORIZON_SECONDS
+
+# Flush once this many views are pending, even before the interval job runs
+FLUSH_THRESHOLD = 200
+FLUSH_INTERVAL_SECONDS = 5
+
+class ViewCounter:
+    """
+    Write-behind accumulator for article views.
+
+    Clicks only bump an in-memory delta; flush() writes all pending deltas
+    in one atomic batched upsert, which also feeds the shared view log
+    (TrendingEngine.apply_views). Readers add pending() on top: uncached
+    ones (the article view, POST /news/view) show a view immediately,
+    cached lists once `generation` moves at the next flush. on_flush runs
+    after each successful write, so the persisted counts catch up right
+    after the flushed deltas stop counting as pending.
+    """
+
+    def __init__(self, session_factory, threshold=FLUSH_THRESHOLD, on_flush=None):
+        self.session_factory = session_factory
+        self.threshold = threshold
+        self.on_flush = on_flush
+        self._pending = {}
+        self._pending_total = 0
+        self._flushing = {}    # deltas being written, still counted by readers
+        self.generation = 0    # bumped whenever a flush takes the pending deltas
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def record(self, link):
+        """Counts one view. Returns the number of views still pending for `link`."""
+        with self._lock:
+            pending = self._pending.get(link, 0) + 1
+            self._pending[link] = pending
+            self._pending_total += 1
+            flush_now = self._pending_total >= self.threshold
+        if flush_now:
+            self.flush()
+        return pending
+
+    def pending(self, link):
+        with self._lock:
+            return self._pending.get(link, 0) + self._flushing.get(link, 0)
+
+    def pending_snapshot(self):
+        with self._lock:
+            snapshot = dict(self._flushing)
+            for link, n in self._pending.items():
+                snapshot[link] = snapshot.get(link, 0) + n
+            return snapshot
+
+    def flush(self):
+        """Writes pending deltas. On failure they are put back for the next flush."""
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._pending, self._pending_total = self._pending, {}, 0
+                self._flushing = deltas
+                if deltas:
+                    self.generation += 1
+            if not deltas:
+                return 0
+            db = self.session_factory()
+            try:
+                add_views(db, deltas, keep_seconds=HORIZON_SECONDS)
+            except Exception as e:
+                db.rollback()
+                print(f"Error flushing views: {e}")
+                with self._lock:
+                    for link, n in deltas.items():
+                        self._pending[link] = self._pending.get(link, 0) + n
+                        self._pending_total += n
+                    self._flushing = {}
+                return 0
+            finally:
+                db.close()
+            with self._lock:
+                self._flushing = {}
+            if self.on_flush is not None:
+                try:
+                    self.on_flush()
+                except Exception as e:
+                    print(f"Error after flushing views: {e}")
+            return sum(deltas.values())
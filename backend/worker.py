@@ -0,0 +1,39 @@
+"""
+Background worker: owns scraping (with sentiment scoring and embeddings),
+watchlist notifications and the quote cache prefetch, so the API
+processes (API_ONLY=1) only serve requests. They pick up each scraped
+dataset from the shared snapshot; job runs and durations are in the
+job_status table (/debug/jobs).
+
+Usage: python worker.py
+"""
+from dotenv import load_dotenv
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from database import init_db, SessionLocal
+from jobs import schedule_jobs
+from notification_manager import NotificationManager
+from scraper import warm_news, use_scheduled_refresh, flush_snapshot
+from sentiment import init_model as init_sentiment
+
+def main():
+    load_dotenv()
+    init_db()
+    # Loaded up front so the first scrape doesn't wait for the model
+    init_sentiment()
+    use_scheduled_refresh()
+    warm_news()
+
+    scheduler = BlockingScheduler()
+    schedule_jobs(scheduler, NotificationManager(SessionLocal), prefetch=True, start_now=True)
+    print("Worker started: scrape, notifications and market prefetch scheduled.")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        flush_snapshot()
+        print("Worker stopped.")
+
+if __name__ == "__main__":
+    main()